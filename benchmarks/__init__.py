@@ -0,0 +1,5 @@
+"""Performance benchmarks for the bus booking data layer.
+
+Run individual benchmarks from the repository root, e.g.
+``python -m benchmarks.connection_pool``.
+"""
@@ -0,0 +1,85 @@
+"""Multi-process booking stress test against a single route.
+
+Every worker process books one seat at a time on the same route until the
+repository reports that the bus is full. The run fails loudly if the route
+ever ends up with more seats booked than it has.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+
+from bus_booking.database import Database, StoragePragmas
+from bus_booking.exceptions import SeatAvailabilityError
+from bus_booking.models import Booking, Route
+from bus_booking.repository import BusRepository
+
+
+def _book_until_full(db_path: str, route_id: int, worker: int) -> int:
+    database = Database(db_path, pool_size=1, pragmas=StoragePragmas())
+    repository = BusRepository(database)
+    confirmed = 0
+    try:
+        while True:
+            try:
+                repository.add_booking(
+                    Booking(None, route_id, f"Worker {worker}", "+1234567890", 1, datetime.now())
+                )
+            except SeatAvailabilityError:
+                return confirmed
+            confirmed += 1
+    finally:
+        database.close()
+
+
+def run_contention(db_path: Path, workers: int, seats: int) -> Tuple[int, int, float]:
+    """Return ``(confirmed, seats_in_db, seconds)`` for one contention run."""
+    database = Database(db_path, pragmas=StoragePragmas())
+    repository = BusRepository(database)
+    route = repository.add_route(
+        Route(None, f"STRESS{workers}", "Here", "There", datetime(2024, 1, 1, 9, 0), seats, 10.0)
+    )
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.starmap(
+            _book_until_full, [(str(db_path), route.id, worker) for worker in range(workers)]
+        )
+    elapsed = time.perf_counter() - start
+
+    with database.connection() as conn:
+        booked = conn.execute(
+            "SELECT IFNULL(SUM(seats_booked), 0) FROM bookings WHERE route_id = ?", (route.id,)
+        ).fetchone()[0]
+    return sum(results), booked, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seats", type=int, default=2000, help="Seats on the contended route.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    failures: List[int] = []
+    print(f"{'workers':>8} {'confirmed':>10} {'booked':>8} {'bookings/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            confirmed, booked, elapsed = run_contention(
+                Path(tmp) / f"stress-{workers}.sqlite3", workers, args.seats
+            )
+            print(f"{workers:>8} {confirmed:>10} {booked:>8} {confirmed / elapsed:>12,.0f}")
+            if booked > args.seats or confirmed != booked:
+                failures.append(workers)
+    if failures:
+        raise SystemExit(f"Overbooking detected with {failures} workers")
+    print("No overbooking detected.")
+
+
+if __name__ == "__main__":
+    main()
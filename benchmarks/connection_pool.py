@@ -0,0 +1,77 @@
+"""Compare repository throughput with and without the connection pool."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict
+
+from bus_booking.database import Database, StoragePragmas
+from bus_booking.models import Booking, Route
+from bus_booking.repository import BusRepository
+
+
+def _seed(repository: BusRepository, routes: int) -> list[int]:
+    base = datetime(2024, 1, 1, 8, 0)
+    ids = []
+    for index in range(routes):
+        route = repository.add_route(
+            Route(None, f"BN{index:05d}", "Origin", "Destination", base + timedelta(hours=index), 10_000, 19.5)
+        )
+        ids.append(route.id)
+    return ids
+
+
+def _calls_per_second(func: Callable[[], object], calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    elapsed = time.perf_counter() - start
+    return calls / elapsed if elapsed else float("inf")
+
+
+def run(database: Database, calls: int, routes: int) -> Dict[str, float]:
+    repository = BusRepository(database)
+    route_ids = _seed(repository, routes)
+    route_id = route_ids[0]
+    booking = Booking(None, route_id, "Bench", "+1234567890", 1, datetime(2024, 1, 1, 7, 0))
+    try:
+        return {
+            "get_available_seats": _calls_per_second(lambda: repository.get_available_seats(route_id), calls),
+            "list_routes": _calls_per_second(repository.list_routes, calls),
+            "add_booking": _calls_per_second(lambda: repository.add_booking(booking), calls),
+        }
+    finally:
+        database.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000, help="Calls per repository method.")
+    parser.add_argument("--routes", type=int, default=20, help="Routes to seed before timing.")
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    # Both modes use the same pragmas, so only pooling differs.
+    pragmas = StoragePragmas()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            "connect-per-call": run(Database(Path(tmp) / "plain.sqlite3", pragmas=pragmas), args.calls, args.routes),
+            f"pool({args.pool_size})": run(
+                Database(Path(tmp) / "pooled.sqlite3", pool_size=args.pool_size, pragmas=pragmas),
+                args.calls,
+                args.routes,
+            ),
+        }
+
+    methods = next(iter(results.values())).keys()
+    print(f"{'method':<22}" + "".join(f"{mode:>20}" for mode in results))
+    for method in methods:
+        print(f"{method:<22}" + "".join(f"{results[mode][method]:>16,.0f}/s  " for mode in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Deterministic synthetic routes and bookings for benchmarks.
+
+Booking popularity follows a Zipf-like distribution over routes, so a few
+routes collect most of the bookings as they do during real on-sales.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Iterator, List
+
+from bus_booking.repository import BusRepository
+from bus_booking.validators import ISO_DATETIME_FORMAT
+
+CITIES = (
+    "Amsterdam", "Berlin", "Boston", "Chicago", "Denver", "Detroit", "Hamburg", "Houston",
+    "Lisbon", "London", "Los Angeles", "Madrid", "Miami", "New York", "Paris", "Prague",
+    "San Francisco", "Seattle", "Vienna", "Washington",
+)
+FIRST_NAMES = ("Ana", "Ben", "Chen", "Dara", "Eli", "Fatima", "Gus", "Hana", "Ivan", "Jo")
+LAST_NAMES = ("Ito", "Khan", "Lopez", "Meyer", "Novak", "Okafor", "Park", "Rossi", "Silva", "Tan")
+BASE_TIME = datetime(2025, 1, 1, 6, 0)
+
+
+def popularity_weights(routes: int, skew: float = 1.1) -> List[float]:
+    """Cumulative Zipf weights: route ``i`` is ``(i + 1) ** -skew`` as popular as the first."""
+    return list(accumulate((rank + 1) ** -skew for rank in range(routes)))
+
+
+def assign_bookings(routes: int, bookings: int, seed: int = 0, skew: float = 1.1) -> List[int]:
+    """Return the route index (0-based) of every booking, deterministically."""
+    rng = random.Random(seed)
+    weights = popularity_weights(routes, skew)
+    return rng.choices(range(routes), cum_weights=weights, k=bookings)
+
+
+def route_rows(routes: int, seats_needed: List[int], seed: int = 0) -> Iterator[Dict[str, object]]:
+    rng = random.Random(seed)
+    for index in range(routes):
+        origin, destination = rng.sample(CITIES, 2)
+        departure = BASE_TIME + timedelta(minutes=15 * index)
+        yield {
+            "bus_number": f"SYN{index:07d}",
+            "origin": origin,
+            "destination": destination,
+            "departure_time": departure.strftime(ISO_DATETIME_FORMAT),
+            # Leave headroom so write benchmarks can keep booking.
+            "total_seats": max(40, seats_needed[index] * 2 + 1000),
+            "price": round(rng.uniform(5, 150), 2),
+        }
+
+
+def booking_rows(
+    route_ids: List[int], assignment: List[int], seed: int = 0
+) -> Iterator[Dict[str, object]]:
+    rng = random.Random(seed + 1)
+    for number, route_index in enumerate(assignment):
+        booked_at = BASE_TIME - timedelta(minutes=len(assignment) - number)
+        yield {
+            "route_id": route_ids[route_index],
+            "passenger_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "passenger_contact": f"+1{rng.randrange(10**9, 10**10)}",
+            "seats_booked": 1,
+            "booked_at": booked_at.strftime(ISO_DATETIME_FORMAT),
+        }
+
+
+def populate(repository: BusRepository, routes: int, bookings: int, seed: int = 0) -> List[int]:
+    """Fill an empty repository and return route ids ordered by popularity."""
+    assignment = assign_bookings(routes, bookings, seed)
+    seats_needed = [0] * routes
+    for route_index in assignment:
+        seats_needed[route_index] += 1
+    result = repository.add_routes_bulk(route_rows(routes, seats_needed, seed))
+    if result.errors:
+        raise RuntimeError(f"Synthetic routes rejected: {result.errors[:3]}")
+    route_ids = [route.route.id for route in repository.iter_routes()]
+    result = repository.add_bookings_bulk(booking_rows(route_ids, assignment, seed))
+    if result.errors:
+        raise RuntimeError(f"Synthetic bookings rejected: {result.errors[:3]}")
+    return route_ids
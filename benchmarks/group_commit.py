@@ -0,0 +1,89 @@
+"""Booking throughput: one commit per booking vs. group commit.
+
+Several threads book seats concurrently. The baseline calls
+``add_booking`` directly (one transaction and commit each); the group commit
+run sends the same requests through ``GroupCommitQueue``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from bus_booking.database import Database, StoragePragmas
+from bus_booking.group_commit import DEFAULT_MAX_DELAY, GroupCommitQueue
+from bus_booking.models import Booking, Route
+from bus_booking.repository import BusRepository
+
+
+def _hammer(book: Callable[[Booking], Booking], route_id: int, threads: int, per_thread: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        for _ in range(per_thread):
+            book(Booking(None, route_id, f"Thread {index}", "+1234567890", 1, datetime.now()))
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run(db_path: Path, *, group: bool, threads: int, per_thread: int, synchronous: str, max_delay: float) -> float:
+    database = Database(db_path, pool_size=threads, pragmas=StoragePragmas(synchronous=synchronous))
+    repository = BusRepository(database)
+    route = repository.add_route(
+        Route(None, "GROUP" if group else "SERIAL", "A", "B", datetime(2025, 1, 1), threads * per_thread, 1.0)
+    )
+    try:
+        if not group:
+            elapsed = _hammer(repository.add_booking, route.id, threads, per_thread)
+        else:
+            with GroupCommitQueue(repository, max_delay=max_delay) as queue:
+                elapsed = _hammer(queue.book, route.id, threads, per_thread)
+                print(f"  mean batch size: {queue.stats.mean_batch_size:.1f}")
+        assert repository.get_available_seats(route.id) == 0
+    finally:
+        database.close()
+    return threads * per_thread / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--per-thread", type=int, default=100)
+    parser.add_argument(
+        "--synchronous",
+        default=StoragePragmas().synchronous,
+        help="SQLite synchronous pragma (FULL syncs every commit).",
+    )
+    parser.add_argument(
+        "--max-delay", type=float, default=DEFAULT_MAX_DELAY, help="Group commit collection window (s)."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        options = dict(
+            threads=args.threads,
+            per_thread=args.per_thread,
+            synchronous=args.synchronous,
+            max_delay=args.max_delay,
+        )
+        serial = run(Path(tmp) / "serial.sqlite3", group=False, **options)
+        print(f"one commit per booking: {serial:>10,.0f} bookings/s")
+        grouped = run(Path(tmp) / "group.sqlite3", group=True, **options)
+        print(f"group commit:           {grouped:>10,.0f} bookings/s  ({grouped / serial:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Load generator for the HTTP booking API.
+
+Point it at a running ``python -m bus_booking.app serve`` instance, or pass
+``--spawn`` to seed a temporary database and start a server subprocess::
+
+    python -m benchmarks.http_load --spawn --concurrency 32 --duration 10
+    python -m benchmarks.http_load --port 8080 --write-ratio 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from bus_booking.database import Database
+from bus_booking.repository import BusRepository
+
+from .datagen import populate
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host, self.port = host, port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Optional[dict] = None) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        assert self.reader is not None
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode()
+            + payload
+        )
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+        await self.reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection") == "close":
+            self.writer.close()
+            self.writer = None
+        return status
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def worker(
+    client: Client,
+    route_ids: List[int],
+    deadline: float,
+    write_ratio: float,
+    seed: int,
+    latencies: List[float],
+    statuses: Counter,
+) -> None:
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        route_id = rng.choice(route_ids)
+        start = time.perf_counter()
+        try:
+            if rng.random() < write_ratio:
+                status = await client.request(
+                    "POST",
+                    "/bookings",
+                    {"route_id": route_id, "passenger_name": "Load", "passenger_contact": "+1234567890", "seats_booked": 1},
+                )
+            elif rng.random() < 0.2:
+                status = await client.request("GET", "/routes/search?origin=S&limit=20")
+            else:
+                status = await client.request("GET", f"/routes/{route_id}/availability")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            client.close()
+            client.writer = None
+            status = 0
+        latencies.append(time.perf_counter() - start)
+        statuses[status] += 1
+    client.close()
+
+
+async def run_load(
+    host: str, port: int, route_ids: List[int], concurrency: int, duration: float, write_ratio: float
+) -> Tuple[List[float], Counter, float]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(
+        *(
+            worker(Client(host, port), route_ids, deadline, write_ratio, seed, latencies, statuses)
+            for seed in range(concurrency)
+        )
+    )
+    return latencies, statuses, time.perf_counter() - start
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(host: str, port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server on {host}:{port} did not start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--spawn", action="store_true", help="Seed a temporary database and start a server.")
+    parser.add_argument("--routes", type=int, default=500, help="Routes to seed with --spawn.")
+    parser.add_argument("--bookings", type=int, default=5000, help="Bookings to seed with --spawn.")
+    parser.add_argument("--route-ids", type=int, default=100, help="Route ids 1..N to target without --spawn.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server: Optional[subprocess.Popen] = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.spawn:
+            db_path = Path(tmp) / "load.sqlite3"
+            route_ids = populate(BusRepository(Database(db_path)), args.routes, args.bookings)
+            args.port = _free_port()
+            server = subprocess.Popen(
+                [sys.executable, "-m", "bus_booking.app", "--database", str(db_path),
+                 "serve", "--host", args.host, "--port", str(args.port)],
+            )
+            _wait_for_port(args.host, args.port)
+        else:
+            route_ids = list(range(1, args.route_ids + 1))
+        try:
+            latencies, statuses, elapsed = asyncio.run(
+                run_load(args.host, args.port, route_ids, args.concurrency, args.duration, args.write_ratio)
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(f"requests: {len(latencies)}  elapsed: {elapsed:.2f}s  rps: {len(latencies) / elapsed:,.0f}")
+    print(f"p50: {quantiles[49] * 1000:.2f} ms  p99: {quantiles[98] * 1000:.2f} ms  max: {latencies[-1] * 1000:.2f} ms")
+    print("status codes: " + ", ".join(f"{code}={count}" for code, count in sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
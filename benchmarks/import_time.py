@@ -0,0 +1,79 @@
+"""Cold-start import cost of the package, measured with ``python -X importtime``.
+
+Each module is imported in a fresh interpreter. The report shows the median
+cumulative import time and fails (exit status 1) when a module pulls in a
+forbidden dependency such as ``tkinter``, or exceeds ``--max-ms``.
+
+    python -m benchmarks.import_time --max-ms 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MODULES = ("bus_booking", "bus_booking.repository", "bus_booking.app")
+# Headless entry points must never load these.
+FORBIDDEN = ("tkinter", "bus_booking.gui", "asyncio")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def measure(module: str) -> Dict[str, int]:
+    """Return ``{imported module: cumulative microseconds}`` for one cold import."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    timings: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            timings[match.group(4)] = int(match.group(2))
+    return timings
+
+
+def check(module: str, *, repeat: int = 5, max_ms: Optional[float] = None) -> List[str]:
+    """Print the median import time of ``module`` and return any problems found."""
+    samples = [measure(module) for _ in range(repeat)]
+    median_ms = statistics.median(sample[module] for sample in samples) / 1000
+    problems = [f"{module} imports {name}" for name in FORBIDDEN if name in samples[0]]
+    if max_ms is not None and median_ms > max_ms:
+        problems.append(f"{module} took {median_ms:.1f} ms (limit {max_ms:.1f} ms)")
+    slowest = sorted(
+        ((time, name) for name, time in samples[0].items() if name.startswith("bus_booking.")),
+        reverse=True,
+    )[:3]
+    detail = ", ".join(f"{name} {time / 1000:.1f} ms" for time, name in slowest)
+    print(f"{module:<24} {median_ms:>7.1f} ms  {len(samples[0]):>4} modules  {detail}".rstrip())
+    return problems
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, help="Fail when a module's median import time exceeds this.")
+    args = parser.parse_args(argv)
+
+    problems: List[str] = []
+    for module in args.modules:
+        problems.extend(check(module, repeat=args.repeat, max_ms=args.max_ms))
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Listing decode throughput: ``sqlite3.Row`` + ISO text vs. tuples + epoch minutes.
+
+The legacy path is reproduced on copies of the tables with ISO text
+timestamps and decoded the way listings used to be (``sqlite3.Row`` name
+lookups, ``datetime.fromisoformat``, keyword construction). The current path
+is the repository's positional decoder over the integer columns. Both read
+the same rows without sorting, so the numbers isolate row materialization.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, List
+
+from bus_booking.database import Database
+from bus_booking.models import Booking, Route, RouteAvailability
+from bus_booking.repository import (
+    BusRepository,
+    _BOOKING_COLUMNS,
+    _LAPSED_HOLDS,
+    _ROUTE_COLUMNS,
+    _ROUTES,
+    _bookings_from_tuples,
+    _routes_from_tuples,
+    _tuples,
+)
+from bus_booking.seatmap import parse_seat_numbers
+
+from .datagen import populate
+
+_ISO = "strftime('%Y-%m-%dT%H:%M', {0} * 60, 'unixepoch') AS {1}"
+
+
+def _legacy_route(row: sqlite3.Row) -> RouteAvailability:
+    route = Route(
+        id=row["id"],
+        bus_number=row["bus_number"],
+        origin=row["origin"],
+        destination=row["destination"],
+        departure_time=datetime.fromisoformat(row["departure_time"]),
+        total_seats=row["total_seats"],
+        price=row["price"],
+    )
+    return RouteAvailability(route=route, seats_available=row["seats_available"])
+
+
+def _legacy_booking(row: sqlite3.Row) -> Booking:
+    return Booking(
+        id=row["id"],
+        route_id=row["route_id"],
+        passenger_name=row["passenger_name"],
+        passenger_contact=row["passenger_contact"],
+        seats_booked=row["seats_booked"],
+        booked_at=datetime.fromisoformat(row["booked_at"]),
+        seat_numbers=parse_seat_numbers(row["seat_numbers"]),
+    )
+
+
+def create_legacy_copies(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"""
+        CREATE TEMP TABLE legacy_routes AS
+        SELECT id, bus_number, origin, destination, {_ISO.format("departure_time", "departure_time")},
+               total_seats, price, seats_booked, seats_held, seat_map
+        FROM routes
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TEMP TABLE legacy_bookings AS
+        SELECT id, route_id, passenger_name, passenger_contact, seats_booked,
+               {_ISO.format("booked_at", "booked_at")}, seat_numbers
+        FROM bookings
+        """
+    )
+
+
+def _rows_per_second(decode: Callable[[], List[Any]], repeat: int) -> float:
+    samples = []
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(decode())
+        samples.append(time.perf_counter() - start)
+    return count / statistics.median(samples)
+
+
+def run(db_path: Path, *, routes: int, bookings: int, repeat: int) -> None:
+    database = Database(db_path)
+    populate(BusRepository(database), routes, bookings)
+    conn = database.connect()
+    try:
+        create_legacy_copies(conn)
+        cases = {
+            "routes": (
+                lambda: [_legacy_route(row) for row in conn.execute(f"SELECT {_ROUTE_COLUMNS} FROM legacy_routes AS r {_LAPSED_HOLDS}")],
+                lambda: _routes_from_tuples(_tuples(conn.execute(f"SELECT {_ROUTE_COLUMNS} FROM {_ROUTES}"))),
+            ),
+            "bookings": (
+                lambda: [_legacy_booking(row) for row in conn.execute(f"SELECT {_BOOKING_COLUMNS} FROM legacy_bookings")],
+                lambda: _bookings_from_tuples(_tuples(conn.execute(f"SELECT {_BOOKING_COLUMNS} FROM bookings"))),
+            ),
+        }
+        for name, (legacy, current) in cases.items():
+            before = _rows_per_second(legacy, repeat)
+            after = _rows_per_second(current, repeat)
+            print(f"{name:<9} Row + ISO text: {before:>12,.0f} rows/s")
+            print(f"{name:<9} tuples + ints:  {after:>12,.0f} rows/s  ({after / before:.2f}x)")
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--routes", type=int, default=5000)
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run(Path(tmp) / "decode.sqlite3", routes=args.routes, bookings=args.bookings, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Booking throughput: one database file vs. routes sharded across several.
+
+Each thread books seats on its own route. With one file every commit waits
+for the single write lock; with ``--shards`` files the routes are dealt out
+across them and bookings in different shards commit in parallel.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+
+from bus_booking.database import Database, StoragePragmas
+from bus_booking.models import Booking, Route
+from bus_booking.repository import BusRepository
+from bus_booking.sharding import ShardedRepository
+
+
+def _hammer(repository: Union[BusRepository, ShardedRepository], threads: int, per_thread: int) -> float:
+    routes = [
+        repository.add_route(Route(None, f"SH{index}", "A", "B", datetime(2025, 1, 1), per_thread, 1.0))
+        for index in range(threads)
+    ]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(route_id: int) -> None:
+        barrier.wait()
+        for _ in range(per_thread):
+            repository.add_booking(Booking(None, route_id, "Shard", "+1234567890", 1, datetime.now()))
+
+    workers = [threading.Thread(target=worker, args=(route.id,)) for route in routes]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    assert all(repository.get_available_seats(route.id) == 0 for route in routes)
+    return threads * per_thread / elapsed
+
+
+def run(directory: Path, *, shards: int, threads: int, per_thread: int, synchronous: str) -> float:
+    options = dict(pool_size=threads, pragmas=StoragePragmas(synchronous=synchronous))
+    if shards == 1:
+        database = Database(directory / "single.sqlite3", **options)
+        try:
+            return _hammer(BusRepository(database), threads, per_thread)
+        finally:
+            database.close()
+    with ShardedRepository.open(directory / "sharded.sqlite3", shards, **options) as repository:
+        return _hammer(repository, threads, per_thread)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--per-thread", type=int, default=200)
+    parser.add_argument("--synchronous", default="FULL", help="SQLite synchronous pragma (FULL syncs every commit).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        options = dict(threads=args.threads, per_thread=args.per_thread, synchronous=args.synchronous)
+        single = run(Path(tmp), shards=1, **options)
+        print(f"1 file:   {single:>10,.0f} bookings/s")
+        sharded = run(Path(tmp), shards=args.shards, **options)
+        print(f"{args.shards} shards: {sharded:>10,.0f} bookings/s  ({sharded / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
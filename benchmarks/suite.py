@@ -0,0 +1,184 @@
+"""Repository benchmark suite with JSON output and regression comparison.
+
+Examples::
+
+    python -m benchmarks.suite --sizes 100x1000 1000x20000 --output results.json
+    python -m benchmarks.suite --output current.json --compare baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from bus_booking.database import Database, StoragePragmas
+from bus_booking.models import Booking
+from bus_booking.repository import BusRepository
+
+from .datagen import LAST_NAMES, populate
+
+DEFAULT_SIZES = ("100x1000", "1000x10000", "5000x100000")
+DEFAULT_THRESHOLD = 0.2
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    try:
+        routes, bookings = (int(part) for part in value.lower().split("x"))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Size must look like ROUTESxBOOKINGS, got {value!r}") from exc
+    return routes, bookings
+
+
+def _time(operation: Callable[[], Any], ops: int, repeat: int) -> float:
+    """Median seconds per run of ``ops`` calls."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(ops):
+            operation()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def scenarios(repository: BusRepository, route_ids: List[int], seed: int) -> Dict[str, Tuple[Callable[[], Any], int]]:
+    """Name -> (operation, calls per timed run)."""
+    rng = random.Random(seed)
+    lookups = [rng.choice(route_ids) for _ in range(1000)]
+    lookup_iter = iter(lookups * 1000)
+    hot_route = route_ids[0]
+    names = iter([rng.choice(LAST_NAMES) for _ in range(1000)] * 1000)
+
+    def book() -> None:
+        repository.add_booking(Booking(None, hot_route, "Bench", "+1234567890", 1, datetime(2025, 1, 1)))
+
+    return {
+        "list_routes": (repository.list_routes, 3),
+        "list_bookings": (repository.list_bookings, 3),
+        "get_available_seats": (lambda: repository.get_available_seats(next(lookup_iter)), 500),
+        "add_booking": (book, 200),
+        "find_bookings": (lambda: repository.find_bookings(next(names)), 200),
+    }
+
+
+def run_suite(sizes: List[Tuple[int, int]], *, repeat: int, seed: int, pool_size: int) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for routes, bookings in sizes:
+            database = Database(
+                Path(tmp) / f"bench-{routes}x{bookings}.sqlite3",
+                pool_size=pool_size,
+                pragmas=StoragePragmas() if pool_size else None,
+            )
+            repository = BusRepository(database)
+            route_ids = populate(repository, routes, bookings, seed)
+            for name, (operation, ops) in scenarios(repository, route_ids, seed).items():
+                seconds = _time(operation, ops, repeat)
+                results.append(
+                    {
+                        "scenario": name,
+                        "routes": routes,
+                        "bookings": bookings,
+                        "ops": ops,
+                        "seconds": seconds,
+                        "ops_per_sec": ops / seconds if seconds else float("inf"),
+                    }
+                )
+                print(
+                    f"{name:<22} {routes:>7}x{bookings:<9} {results[-1]['ops_per_sec']:>12,.1f} ops/s",
+                    file=sys.stderr,
+                )
+            database.close()
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+            "pool_size": pool_size,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Return one row per scenario present in both runs, flagging regressions.
+
+    A scenario regresses when its throughput drops more than ``threshold``
+    (a fraction) below the baseline.
+    """
+
+    def key(result: Dict[str, Any]) -> Tuple[str, int, int]:
+        return result["scenario"], result["routes"], result["bookings"]
+
+    reference = {key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        previous = reference.get(key(result))
+        if previous is None:
+            continue
+        change = result["ops_per_sec"] / previous["ops_per_sec"] - 1
+        rows.append(
+            {
+                "scenario": result["scenario"],
+                "routes": result["routes"],
+                "bookings": result["bookings"],
+                "baseline_ops_per_sec": previous["ops_per_sec"],
+                "ops_per_sec": result["ops_per_sec"],
+                "change": change,
+                "regression": change < -threshold,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[parse_size(s) for s in DEFAULT_SIZES])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pool-size", type=int, default=4, help="0 benchmarks connect-per-call mode.")
+    parser.add_argument("--output", type=Path, help="Write JSON results here (defaults to stdout).")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON results to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed throughput drop before a scenario counts as a regression (fraction).",
+    )
+    args = parser.parse_args()
+
+    current = run_suite(args.sizes, repeat=args.repeat, seed=args.seed, pool_size=args.pool_size)
+    if args.compare is not None:
+        current["comparison"] = compare(current, json.loads(args.compare.read_text()), args.threshold)
+
+    payload = json.dumps(current, indent=2)
+    if args.output is not None:
+        args.output.write_text(payload + "\n")
+    else:
+        print(payload)
+
+    regressions = [row for row in current.get("comparison", []) if row["regression"]]
+    for row in regressions:
+        print(
+            f"REGRESSION {row['scenario']} {row['routes']}x{row['bookings']}: "
+            f"{row['baseline_ops_per_sec']:,.1f} -> {row['ops_per_sec']:,.1f} ops/s ({row['change']:+.0%})",
+            file=sys.stderr,
+        )
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
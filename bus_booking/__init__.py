@@ -1,5 +1,13 @@
 """Bus booking application package."""
 
-from .app import main
-
 __all__ = ["main"]
+
+
+def __getattr__(name: str):
+    # Resolved on first use so ``import bus_booking`` stays cheap for scripts
+    # that only need the repository.
+    if name == "main":
+        from .app import main
+
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,46 @@
-"""Application entrypoint for the SwiftSeat bus booking GUI."""
+"""Application entrypoint for the SwiftSeat bus booking GUI and command line.
+
+Tkinter and the HTTP server are imported only by the commands that use them,
+so headless commands start without loading either.
+"""
 
 from __future__ import annotations
 
 import argparse
-from datetime import datetime, timedelta
+import csv
+import json
+import logging
+import sys
+import time
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Iterator, List, Mapping, Optional, Sequence
+
+from .cache import CachedBusRepository
+from .database import Database, DEFAULT_DB_PATH, StoragePragmas
+from .exceptions import BookingError
+from .export import FORMATS, open_output, write_rows
+from .instrumentation import Instrumentation
+from .models import Booking, BulkResult, Occupancy
+from .repository import BOOKING_EXPORT_COLUMNS, ROUTE_EXPORT_COLUMNS, BusRepository
+from .seatmap import parse_seat_numbers
+from .snapshot import BackupScheduler, take_snapshot
+from .validators import (
+    ISO_DATETIME_FORMAT,
+    require_positive_int,
+    require_text,
+    validate_contact,
+)
+
 
-from .database import Database, DEFAULT_DB_PATH
-from .models import Route
-from .repository import BusRepository
-from .gui import launch_gui
+def _positive_seconds(value: str) -> float:
+    seconds = float(value)
+    if not seconds > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than zero, got {value!r}")
+    return seconds
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="SwiftSeat bus booking application")
     parser.add_argument(
         "--database",
@@ -26,32 +53,419 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Populate a few demo routes on start-up if the table is empty.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=4,
+        help="Number of pooled SQLite connections (0 opens a connection per call).",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=0,
+        help="Cache seat availability for up to this many routes in memory (0 disables).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record SQL latency statistics and print a summary at exit.",
+    )
+    parser.add_argument(
+        "--slow-query-ms",
+        type=float,
+        help="Log statements slower than this many milliseconds (implies --profile).",
+    )
+    parser.add_argument(
+        "--trace-sql",
+        action="store_true",
+        help="Log every SQL statement at DEBUG level (implies --profile).",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    import_parser = subparsers.add_parser(
+        "import",
+        help="Bulk load routes (CSV) and bookings (JSON lines) without starting the GUI.",
+    )
+    import_parser.add_argument(
+        "--routes",
+        type=Path,
+        help="CSV file with bus_number, origin, destination, departure_time, total_seats, price columns.",
+    )
+    import_parser.add_argument(
+        "--bookings",
+        type=Path,
+        help="JSON lines file with route_id, passenger_name, passenger_contact, seats_booked[, booked_at].",
+    )
+
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Stream bookings or route availability to CSV or JSON lines.",
+    )
+    export_parser.add_argument("dataset", choices=("bookings", "routes"))
+    export_parser.add_argument("--format", choices=FORMATS, default="csv")
+    export_parser.add_argument(
+        "--output",
+        type=Path,
+        help="Destination file (defaults to stdout). A .gz suffix enables gzip.",
+    )
+    export_parser.add_argument("--gzip", action="store_true", help="Gzip-compress the output.")
+    export_parser.add_argument(
+        "--from",
+        dest="departure_from",
+        type=date.fromisoformat,
+        help="Only include departures on or after this date (YYYY-MM-DD).",
+    )
+    export_parser.add_argument(
+        "--to",
+        dest="departure_to",
+        type=date.fromisoformat,
+        help="Only include departures on or before this date (YYYY-MM-DD).",
+    )
+    export_parser.add_argument("--route-id", type=int, help="Only include this route.")
+    export_parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Export from a point-in-time copy of the database instead of the live file.",
+    )
+
+    report_parser = subparsers.add_parser("report", help="Load factor and revenue from the rollup tables.")
+    report_parser.add_argument(
+        "view",
+        choices=("daily", "pairs", "rebuild"),
+        help="daily: per departure day; pairs: per origin/destination; rebuild: recompute rollups.",
+    )
+    report_parser.add_argument(
+        "--from", dest="first_day", type=date.fromisoformat, help="First day for 'daily' (defaults to today)."
+    )
+    report_parser.add_argument(
+        "--to", dest="last_day", type=date.fromisoformat, help="Last day for 'daily' (defaults to two weeks on)."
+    )
+    report_parser.add_argument("--limit", type=int, default=20, help="Pairs to show for 'pairs'.")
+
+    backup_parser = subparsers.add_parser("backup", help="Copy the live database with the SQLite backup API.")
+    backup_parser.add_argument("--output", type=Path, required=True, help="Backup file to write (replaced atomically).")
+    backup_parser.add_argument(
+        "--every",
+        type=_positive_seconds,
+        metavar="SECONDS",
+        help="Keep running and refresh the backup at this interval.",
+    )
+
+    routes_parser = subparsers.add_parser("routes", help="List routes with seats left.")
+    routes_parser.add_argument("--from", dest="origin", help="Origin city prefix.")
+    routes_parser.add_argument("--to", dest="destination", help="Destination city prefix.")
+    routes_parser.add_argument("--min-seats", type=int, help="Only routes with at least this many seats left.")
+    routes_parser.add_argument("--limit", type=int, default=50)
+
+    availability_parser = subparsers.add_parser("availability", help="Show free seats on a route.")
+    availability_parser.add_argument("route_id", type=int)
+
+    book_parser = subparsers.add_parser("book", help="Book seats on a route.")
+    book_parser.add_argument("route_id", type=int)
+    book_parser.add_argument("--name", required=True, help="Passenger name.")
+    book_parser.add_argument("--contact", required=True, help="Passenger phone number.")
+    book_parser.add_argument("--seats", type=int, help="Number of seats (defaults to the count of --seat-numbers, else 1).")
+    book_parser.add_argument(
+        "--seat-numbers",
+        type=parse_seat_numbers,
+        default=(),
+        help="Comma-separated seats to claim, e.g. 3,4. Otherwise seats are assigned.",
+    )
+
+    serve_parser = subparsers.add_parser("serve", help="Run the HTTP/JSON booking API without the GUI.")
+    serve_parser.add_argument("--host", help="Interface to listen on (defaults to 127.0.0.1).")
+    serve_parser.add_argument("--port", type=int, help="Port to listen on (defaults to 8080).")
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Threads running database calls (match --pool-size for best results).",
+    )
+    serve_parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=64,
+        help="In-flight database calls before new requests get 503.",
+    )
+    serve_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=5.0,
+        help="Seconds a request may wait for the database before getting 504.",
+    )
+    return parser.parse_args(argv)
+
+
+def open_database(args: argparse.Namespace) -> Database:
+    instrumentation = None
+    if args.profile or args.slow_query_ms is not None or args.trace_sql:
+        instrumentation = Instrumentation(
+            slow_query_threshold=None if args.slow_query_ms is None else args.slow_query_ms / 1000,
+            trace=args.trace_sql,
+        )
+        logging.basicConfig(
+            level=logging.DEBUG if args.trace_sql else logging.WARNING,
+            format="%(asctime)s %(name)s %(message)s",
+        )
+    if args.pool_size:
+        return Database(
+            args.database,
+            pool_size=args.pool_size,
+            pragmas=StoragePragmas(),
+            instrumentation=instrumentation,
+        )
+    return Database(args.database, instrumentation=instrumentation)
 
 
 def ensure_sample_data(repository: BusRepository) -> None:
-    if repository.list_routes():
+    if repository.list_routes_page(limit=1).items:
         return
     base_time = datetime.now().replace(minute=0, second=0, microsecond=0)
-    demo_routes: Iterable[Route] = (
-        Route(None, "HX101", "New York", "Washington", base_time + timedelta(hours=6), 40, 49.99),
-        Route(None, "HX205", "San Francisco", "Los Angeles", base_time + timedelta(hours=10), 48, 79.99),
-        Route(None, "HX315", "Chicago", "Detroit", base_time + timedelta(hours=4), 36, 39.99),
+
+    def departure(hours: int) -> str:
+        return (base_time + timedelta(hours=hours)).strftime(ISO_DATETIME_FORMAT)
+
+    columns = ("bus_number", "origin", "destination", "departure_time", "total_seats", "price")
+    demo_routes = (
+        ("HX101", "New York", "Washington", departure(6), 40, 49.99),
+        ("HX205", "San Francisco", "Los Angeles", departure(10), 48, 79.99),
+        ("HX315", "Chicago", "Detroit", departure(4), 36, 39.99),
+    )
+    repository.add_routes_bulk(dict(zip(columns, values)) for values in demo_routes)
+
+
+def read_csv_rows(path: Path) -> Iterator[Mapping[str, Any]]:
+    with path.open(newline="", encoding="utf-8") as handle:
+        yield from csv.DictReader(handle)
+
+
+def read_jsonl_rows(path: Path) -> Iterator[Any]:
+    """Yield one decoded value per line; undecodable lines are yielded as text.
+
+    Passing bad lines through keeps row numbers aligned with the file, and the
+    repository reports them as invalid rows.
+    """
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield line
+
+
+def _report(label: str, path: Path, result: BulkResult) -> None:
+    print(f"Imported {result.inserted} {label} from {path} ({len(result.errors)} rejected).")
+    for error in result.errors:
+        print(f"  {path}: row {error.row_number}: {error.message}", file=sys.stderr)
+
+
+def run_import(repository: BusRepository, args: argparse.Namespace) -> int:
+    if args.routes is None and args.bookings is None:
+        print("Nothing to import: pass --routes and/or --bookings.", file=sys.stderr)
+        return 2
+    results: List[BulkResult] = []
+    if args.routes is not None:
+        results.append(repository.add_routes_bulk(read_csv_rows(args.routes)))
+        _report("routes", args.routes, results[-1])
+    if args.bookings is not None:
+        results.append(repository.add_bookings_bulk(read_jsonl_rows(args.bookings)))
+        _report("bookings", args.bookings, results[-1])
+    return 1 if any(result.errors for result in results) else 0
+
+
+def run_export(repository: BusRepository, args: argparse.Namespace) -> int:
+    if args.snapshot:
+        with take_snapshot(repository.database) as snapshot:
+            print(f"Exporting from a snapshot taken at {snapshot.taken_at:%H:%M:%S}.", file=sys.stderr)
+            return _export(snapshot.repository, args)
+    return _export(repository, args)
+
+
+def _export(repository: BusRepository, args: argparse.Namespace) -> int:
+    filters = {
+        "departure_from": args.departure_from,
+        "departure_to": args.departure_to,
+        "route_id": args.route_id,
+    }
+    if args.dataset == "bookings":
+        rows, columns = repository.export_bookings(**filters), BOOKING_EXPORT_COLUMNS
+    else:
+        rows, columns = repository.export_route_availability(**filters), ROUTE_EXPORT_COLUMNS
+    compress = args.gzip or (args.output is not None and args.output.suffix == ".gz")
+    with open_output(args.output, compress=compress) as handle:
+        count = write_rows(rows, columns, handle, args.format)
+    print(f"Exported {count} {args.dataset}.", file=sys.stderr)
+    return 0
+
+
+def _seat_ranges(seats: Sequence[int]) -> str:
+    """Render ``[1, 2, 3, 7]`` as ``1-3, 7``."""
+    ranges: List[List[int]] = []
+    for seat in seats:
+        if ranges and seat == ranges[-1][1] + 1:
+            ranges[-1][1] = seat
+        else:
+            ranges.append([seat, seat])
+    return ", ".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def run_routes(repository: BusRepository, args: argparse.Namespace) -> int:
+    routes = repository.search_routes(
+        origin=args.origin, destination=args.destination, min_seats=args.min_seats, limit=args.limit
+    )
+    for availability in routes:
+        route = availability.route
+        print(
+            f"{route.id:>6}  {route.bus_number:<10} {route.origin} → {route.destination}  "
+            f"{route.departure_time.strftime(ISO_DATETIME_FORMAT)}  "
+            f"{availability.seats_available:>3}/{route.total_seats} seats  ${route.price:,.2f}"
+        )
+    if not routes:
+        print("No matching routes.", file=sys.stderr)
+    return 0
+
+
+def run_availability(repository: BusRepository, args: argparse.Namespace) -> int:
+    try:
+        seat_map = repository.get_seat_map(args.route_id)
+    except BookingError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    free = seat_map.free_seats()
+    print(f"Route {args.route_id}: {len(free)} of {seat_map.capacity} seats free.")
+    if free:
+        print(f"Free seats: {_seat_ranges(free)}")
+    return 0
+
+
+def run_book(repository: BusRepository, args: argparse.Namespace) -> int:
+    seats = args.seats or len(args.seat_numbers) or 1
+    try:
+        booking = repository.add_booking(
+            Booking(
+                id=None,
+                route_id=args.route_id,
+                passenger_name=require_text("Passenger name", args.name),
+                passenger_contact=validate_contact(args.contact),
+                seats_booked=require_positive_int("Seats", str(seats)),
+                booked_at=datetime.now(),
+                seat_numbers=args.seat_numbers,
+            )
+        )
+    except BookingError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(
+        f"Booking {booking.id} confirmed on route {booking.route_id}: "
+        f"seat{'s' if len(booking.seat_numbers) > 1 else ''} {_seat_ranges(booking.seat_numbers)}."
     )
-    for route in demo_routes:
-        repository.add_route(route)
+    return 0
+
+
+def _occupancy_line(label: str, occupancy: Occupancy) -> str:
+    return (
+        f"{label:<32} {occupancy.routes:>5} routes  {occupancy.seats_booked:>7}/{occupancy.seats_total:<7} "
+        f"{occupancy.load_factor:>6.1%}  ${occupancy.revenue:>12,.2f}"
+    )
+
+
+def run_report(repository: BusRepository, args: argparse.Namespace) -> int:
+    if args.view == "rebuild":
+        repository.rebuild_rollups()
+        print("Rollups rebuilt.")
+    elif args.view == "daily":
+        first_day = args.first_day or date.today()
+        last_day = args.last_day or first_day + timedelta(days=13)
+        for day, occupancy in repository.daily_occupancy(first_day, last_day).items():
+            print(_occupancy_line(day.isoformat(), occupancy))
+    else:
+        for origin, destination, occupancy in repository.top_pairs(args.limit):
+            print(_occupancy_line(f"{origin} → {destination}", occupancy))
+    return 0
 
 
-def main() -> None:
-    args = parse_args()
-    database = Database(args.database)
-    repository = BusRepository(database)
+def run_backup(repository: BusRepository, args: argparse.Namespace) -> int:
+    # A one-off backup never waits, so its interval goes unused.
+    interval = args.every if args.every is not None else 1.0
+    scheduler = BackupScheduler(repository.database, args.output, interval=interval)
+    if args.every is None:
+        scheduler.backup_now()
+        print(f"Backed up {scheduler.stats.last_pages} pages to {args.output}.")
+        return 0
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    with scheduler:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 1 if scheduler.stats.failures else 0
 
-    if args.with_sample_data:
-        ensure_sample_data(repository)
 
+def run_serve(repository: BusRepository, args: argparse.Namespace) -> int:
+    from .holds import HoldSweeper
+    from .server import run_server
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    options = {
+        "host": args.host,
+        "port": args.port,
+        "workers": args.workers,
+        "max_pending": args.max_pending,
+        "request_timeout": args.timeout,
+    }
+    with HoldSweeper(repository):
+        run_server(repository, **{name: value for name, value in options.items() if value is not None})
+    return 0
+
+
+def run_gui(repository: BusRepository) -> int:
+    try:
+        from .gui import launch_gui
+    except ImportError as exc:
+        print(f"The GUI needs Tkinter ({exc}); use a subcommand such as 'routes' instead.", file=sys.stderr)
+        return 2
     launch_gui(repository)
+    return 0
+
+
+COMMANDS = {
+    "import": run_import,
+    "export": run_export,
+    "routes": run_routes,
+    "availability": run_availability,
+    "book": run_book,
+    "report": run_report,
+    "backup": run_backup,
+    "serve": run_serve,
+}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    database = open_database(args)
+    repository = (
+        CachedBusRepository(database, capacity=args.cache_size)
+        if args.cache_size
+        else BusRepository(database)
+    )
+
+    try:
+        if args.with_sample_data:
+            ensure_sample_data(repository)
+
+        if args.command is not None:
+            return COMMANDS[args.command](repository, args)
+        return run_gui(repository)
+    finally:
+        # The cache runs on a Database derived from ``database``; close both.
+        repository.database.close()
+        database.close()
+        if database.instrumentation is not None:
+            database.instrumentation.print_summary(sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
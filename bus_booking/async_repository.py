@@ -0,0 +1,77 @@
+"""asyncio front-end for ``BusRepository``."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, TypeVar
+
+from .database import Database, StoragePragmas
+from .models import Booking, Route, RouteAvailability
+from .repository import BusRepository
+
+T = TypeVar("T")
+
+DEFAULT_READERS = 4
+
+
+class AsyncBusRepository:
+    """Awaitable repository operations that never block the event loop.
+
+    SQLite work runs on dedicated threads, each with its own long-lived
+    connection: ``readers`` threads serve reads concurrently, and a single
+    writer thread executes every write in submission order, so writes never
+    contend with each other for the database lock. Concurrent reads next to
+    the writer rely on the WAL journal, which is enabled unless the given
+    database already configures its own pragmas.
+    """
+
+    def __init__(self, database: Database, *, readers: int = DEFAULT_READERS) -> None:
+        if readers <= 0:
+            raise ValueError("At least one reader thread is required.")
+        pragmas = database.pragmas or StoragePragmas()
+        self._writer = BusRepository(database.derive(pool_size=1, pragmas=pragmas))
+        self._reader = BusRepository(database.derive(pool_size=readers, pragmas=pragmas))
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bus-booking-writer")
+        self._read_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="bus-booking-reader")
+
+    # Writes
+    async def add_route(self, route: Route) -> Route:
+        return await self._run(self._write_executor, self._writer.add_route, route)
+
+    async def add_booking(self, booking: Booking) -> Booking:
+        return await self._run(self._write_executor, self._writer.add_booking, booking)
+
+    # Reads
+    async def list_routes(self) -> List[RouteAvailability]:
+        return await self._run(self._read_executor, self._reader.list_routes)
+
+    async def list_bookings(self) -> List[Booking]:
+        return await self._run(self._read_executor, self._reader.list_bookings)
+
+    async def get_available_seats(self, route_id: int) -> int:
+        return await self._run(self._read_executor, self._reader.get_available_seats, route_id)
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._shutdown)
+
+    async def __aenter__(self) -> "AsyncBusRepository":
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.close()
+
+    def _shutdown(self) -> None:
+        self._write_executor.shutdown(wait=True)
+        self._read_executor.shutdown(wait=True)
+        self._writer.database.close()
+        self._reader.database.close()
+
+    @staticmethod
+    async def _run(
+        executor: ThreadPoolExecutor, func: Callable[..., T], *args: Any
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args))
@@ -0,0 +1,289 @@
+"""Read-through caching in front of ``BusRepository``."""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .database import Database
+from .models import Booking, BulkResult, Route, RouteAvailability, SeatHold
+from .repository import BusRepository, _publishes
+
+DEFAULT_CACHE_CAPACITY = 1024
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    external_flushes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CachedBusRepository(BusRepository):
+    """``BusRepository`` that serves seat counts and route listings from memory.
+
+    Seat availability is kept per route in an LRU map of at most ``capacity``
+    entries, and the full ``list_routes`` result is kept while it has no more
+    than ``capacity`` routes. Writes made through this repository invalidate
+    exactly the entries they affect.
+
+    SQLite access goes through the cache's own pool, as large as the
+    caller's (one connection if the caller has no pool); only the in-memory
+    state is behind a lock. ``PRAGMA data_version`` changes only when
+    *another* connection commits, so the cache remembers it per connection
+    and polls it before every cached read to detect writes from other
+    processes (or other repositories). The cache then reads the change log
+    since its last check and drops only the routes that changed; it is
+    flushed whole when the backlog is longer than ``capacity`` or has been
+    pruned.
+
+    A hold that lapses writes nothing, so entries for routes with live holds
+    also expire when the earliest of those holds does.
+    """
+
+    def __init__(self, database: Database, *, capacity: int = DEFAULT_CACHE_CAPACITY) -> None:
+        if capacity <= 0:
+            raise ValueError("Cache capacity must be greater than zero.")
+        # data_version is only meaningful on a long-lived connection.
+        super().__init__(database.derive(pool_size=database.pool.size if database.pool is not None else 1))
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        # route id -> (seats available, time.time() the entry expires at)
+        self._seats: "OrderedDict[int, Tuple[int, float]]" = OrderedDict()
+        self._listing: Optional[List[RouteAvailability]] = None
+        self._listing_expires = math.inf
+        # Bumped by every invalidation, so a read that raced one is not stored.
+        self._generation = 0
+        # id(connection) -> its last PRAGMA data_version; pooled connections
+        # stay open until the pool is closed, so their ids are stable.
+        self._data_versions: Dict[int, int] = {}
+        with self.database.connection() as conn:
+            self._data_versions[id(conn)] = conn.execute("PRAGMA data_version").fetchone()[0]
+            self._change_version = self._head_version(conn)
+        self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._seats.clear()
+            self._listing = None
+
+    # Cached reads
+    def get_available_seats(self, route_id: int) -> int:
+        with self.database.connection() as conn:
+            self._check_external_writes(conn)
+            now = time.time()
+            with self._lock:
+                entry = self._seats.get(route_id)
+                if entry is not None and now < entry[1]:
+                    self._seats.move_to_end(route_id)
+                    self._stats.hits += 1
+                    return entry[0]
+                self._stats.misses += 1
+                generation = self._generation
+            seats = super().get_available_seats(route_id)
+            expires = self._hold_expiries(conn, now, route_id).get(route_id, math.inf)
+            with self._lock:
+                if generation == self._generation:
+                    self._store_seats(route_id, seats, expires)
+            return seats
+
+    def list_routes(self) -> List[RouteAvailability]:
+        with self.database.connection() as conn:
+            self._check_external_writes(conn)
+            now = time.time()
+            with self._lock:
+                if self._listing is not None and now < self._listing_expires:
+                    self._stats.hits += 1
+                    return list(self._listing)
+                self._stats.misses += 1
+                generation = self._generation
+            routes = super().list_routes()
+            expiries = self._hold_expiries(conn, now)
+            with self._lock:
+                if generation != self._generation:
+                    return list(routes)
+                if len(routes) <= self.capacity:
+                    self._listing = routes
+                    self._listing_expires = min(expiries.values(), default=math.inf)
+                for availability in routes[: self.capacity]:
+                    route_id = availability.route.id
+                    self._store_seats(route_id, availability.seats_available, expiries.get(route_id, math.inf))
+            return list(routes)
+
+    # Writes (invalidate while still holding the connection, before commit)
+    @_publishes
+    def add_route(self, route: Route) -> Route:
+        with self.database.connection():
+            created = super().add_route(route)
+            self._after_write(listing=True)
+            return created
+
+    @_publishes
+    def add_booking(self, booking: Booking) -> Booking:
+        with self.database.connection():
+            created = super().add_booking(booking)
+            self._after_write(route_ids=(booking.route_id,), listing=True)
+            return created
+
+    @_publishes
+    def add_booking_batch(self, bookings: Sequence[Booking]) -> List[Any]:
+        with self.database.connection():
+            outcomes = super().add_booking_batch(bookings)
+            self._after_write(route_ids={booking.route_id for booking in bookings}, listing=True)
+            return outcomes
+
+    @_publishes
+    def add_routes_bulk(self, rows: Iterable[Mapping[str, Any]], **kwargs: Any) -> BulkResult:
+        with self.database.connection():
+            result = super().add_routes_bulk(rows, **kwargs)
+            self._after_write(listing=True)
+            return result
+
+    @_publishes
+    def add_bookings_bulk(self, rows: Iterable[Mapping[str, Any]], **kwargs: Any) -> BulkResult:
+        with self.database.connection():
+            result = super().add_bookings_bulk(rows, **kwargs)
+            self._after_write(all_seats=True, listing=True)
+            return result
+
+    @_publishes
+    def cancel_booking(self, booking_id: int) -> None:
+        with self.database.connection():
+            super().cancel_booking(booking_id)
+            self._after_write(all_seats=True, listing=True)
+
+    @_publishes
+    def hold_seats(self, route_id: int, seats: int, **kwargs: Any) -> SeatHold:
+        with self.database.connection():
+            hold = super().hold_seats(route_id, seats, **kwargs)
+            self._after_write(route_ids=(route_id,), listing=True)
+            return hold
+
+    @_publishes
+    def confirm_hold(self, hold_id: int, *args: Any, **kwargs: Any) -> Booking:
+        with self.database.connection():
+            booking = super().confirm_hold(hold_id, *args, **kwargs)
+            self._after_write(route_ids=(booking.route_id,), listing=True)
+            return booking
+
+    @_publishes
+    def release_hold(self, hold_id: int) -> None:
+        with self.database.connection():
+            super().release_hold(hold_id)
+            self._after_write(all_seats=True, listing=True)
+
+    @_publishes
+    def expire_holds(self, **kwargs: Any) -> int:
+        released = super().expire_holds(**kwargs)
+        if released:
+            with self.database.connection():
+                self._after_write(all_seats=True, listing=True)
+        return released
+
+    @_publishes
+    def reconcile_seat_counts(self, *, repair: bool = True) -> Dict[int, Tuple[int, int]]:
+        with self.database.connection():
+            drift = super().reconcile_seat_counts(repair=repair)
+            if repair and drift:
+                self._after_write(route_ids=drift, listing=True)
+            return drift
+
+    # Internals
+    def _check_external_writes(self, conn: sqlite3.Connection) -> None:
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            # A connection not seen before may have missed any number of commits.
+            changed = version != self._data_versions.get(id(conn))
+            self._data_versions[id(conn)] = version
+            seen = self._change_version
+        if not changed:
+            return
+        changes = self.changes_since(seen, self.capacity + 1)
+        if changes.complete and len(changes.events) <= self.capacity:
+            self._invalidate(
+                route_ids={event.route_id for event in changes.events if event.route_id is not None},
+                listing=bool(changes.events),
+            )
+            head = changes.version
+        else:
+            with self._lock:
+                if self._seats or self._listing is not None:
+                    self._stats.external_flushes += 1
+                self._generation += 1
+                self._seats.clear()
+                self._listing = None
+            head = self._head_version(conn)
+        with self._lock:
+            self._change_version = max(self._change_version, head)
+
+    def _after_write(self, **targets: Any) -> None:
+        """Invalidate after our own write; its change-log entries need no replay."""
+        self._invalidate(**targets)
+        with self.database.connection() as conn:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            head = self._head_version(conn)
+        with self._lock:
+            # If no other connection committed since this one last checked,
+            # every change up to ``head`` is ours and already invalidated.
+            if version == self._data_versions.get(id(conn)):
+                self._change_version = max(self._change_version, head)
+
+    @staticmethod
+    def _hold_expiries(
+        conn: sqlite3.Connection, now: float, route_id: Optional[int] = None
+    ) -> Dict[int, int]:
+        """Earliest expiry of the holds live at ``now``, per route.
+
+        ``now`` is taken before the seats are read, so a hold that lapses in
+        between is still counted and its entry is stale on arrival.
+        """
+        sql = "SELECT route_id, MIN(expires_at) FROM seat_holds WHERE expires_at > ?"
+        params: List[Any] = [now]
+        if route_id is not None:
+            sql += " AND route_id = ?"
+            params.append(route_id)
+        return dict(conn.execute(f"{sql} GROUP BY route_id", params).fetchall())
+
+    def _store_seats(self, route_id: int, seats: int, expires: float) -> None:
+        self._seats[route_id] = (seats, expires)
+        self._seats.move_to_end(route_id)
+        while len(self._seats) > self.capacity:
+            self._seats.popitem(last=False)
+            self._stats.evictions += 1
+
+    def _invalidate(
+        self,
+        *,
+        route_ids: Iterable[int] = (),
+        all_seats: bool = False,
+        listing: bool = False,
+    ) -> None:
+        with self._lock:
+            self._generation += 1
+            if all_seats:
+                self._stats.invalidations += len(self._seats)
+                self._seats.clear()
+            for route_id in route_ids:
+                if self._seats.pop(route_id, None) is not None:
+                    self._stats.invalidations += 1
+            if listing and self._listing is not None:
+                self._listing = None
+                self._stats.invalidations += 1
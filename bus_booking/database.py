@@ -3,29 +3,219 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Dict, Iterator, List, Optional
+
+from .instrumentation import Instrumentation, InstrumentedConnection
+from .migrations import migrate
 
 DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "bus_booking.sqlite3"
+DEFAULT_CACHED_STATEMENTS = 256
+
+
+@dataclass(frozen=True, slots=True)
+class StoragePragmas:
+    """Storage pragmas applied once to every new connection.
+
+    ``None`` leaves the SQLite default untouched.
+    """
+
+    journal_mode: Optional[str] = "WAL"
+    synchronous: Optional[str] = "NORMAL"
+    mmap_size: Optional[int] = None
+    cache_size: Optional[int] = None
+
+    def statements(self) -> List[str]:
+        statements: List[str] = []
+        if self.journal_mode is not None:
+            statements.append(f"PRAGMA journal_mode = {self.journal_mode}")
+        if self.synchronous is not None:
+            statements.append(f"PRAGMA synchronous = {self.synchronous}")
+        if self.mmap_size is not None:
+            statements.append(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        if self.cache_size is not None:
+            statements.append(f"PRAGMA cache_size = {int(self.cache_size)}")
+        return statements
+
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections.
+
+    A thread checks a connection out for the duration of its outermost
+    ``Database.connection()`` block; nested blocks on the same thread reuse
+    it. Connections are created lazily up to ``size`` and kept open, so the
+    per-connection statement cache survives between repository calls.
+    """
+
+    def __init__(self, database: "Database", size: int, timeout: float = 30.0) -> None:
+        if size <= 0:
+            raise ValueError("Pool size must be greater than zero.")
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self._idle: List[sqlite3.Connection] = []
+        self._all: List[sqlite3.Connection] = []
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed.")
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._all) < self.size:
+                    break
+                if not self._condition.wait(self.timeout):
+                    raise sqlite3.OperationalError("Timed out waiting for a pooled connection.")
+            conn = self.database.connect(check_same_thread=False)
+            self._all.append(conn)
+            return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        with self._condition:
+            if self._closed:
+                conn.close()
+                return
+            self._idle.append(conn)
+            self._condition.notify()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+            self._idle.clear()
+            self._condition.notify_all()
+
+    @property
+    def opened(self) -> int:
+        return len(self._all)
 
 
 class Database:
-    """Simple SQLite database wrapper with schema initialization."""
+    """Simple SQLite database wrapper with versioned schema migrations.
+
+    By default every ``connection()`` block opens and closes its own
+    connection. Pass ``pool_size`` to keep that many connections open and
+    hand them out per thread instead. ``db_path`` may also be an SQLite
+    ``file:`` URI, and ``read_only`` sets ``PRAGMA query_only`` on every
+    connection so any write fails.
+    """
 
-    def __init__(self, db_path: Path | str = DEFAULT_DB_PATH) -> None:
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+    def __init__(
+        self,
+        db_path: Path | str = DEFAULT_DB_PATH,
+        *,
+        pool_size: int = 0,
+        pragmas: Optional[StoragePragmas] = None,
+        cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+        pool_timeout: float = 30.0,
+        busy_timeout: float = 30.0,
+        instrumentation: Optional[Instrumentation] = None,
+        read_only: bool = False,
+    ) -> None:
+        self.uri = isinstance(db_path, str) and db_path.startswith("file:")
+        self.db_path: Path | str = db_path if self.uri else Path(db_path)
+        if not self.uri:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.read_only = read_only
+        self.pragmas = pragmas
+        self.cached_statements = cached_statements
+        self.busy_timeout = busy_timeout
+        self.pool_timeout = pool_timeout
+        self.instrumentation = instrumentation
+        self.pool: Optional[ConnectionPool] = (
+            ConnectionPool(self, pool_size, pool_timeout) if pool_size else None
+        )
+        self._local = threading.local()
+        self._schema_ready = False
 
-    def connect(self) -> sqlite3.Connection:
-        connection = sqlite3.connect(self.db_path)
+    def derive(self, **overrides: Any) -> "Database":
+        """Return a new ``Database`` on the same file with the same settings.
+
+        Keyword arguments override individual constructor options, e.g.
+        ``database.derive(pool_size=1)`` for a dedicated single connection.
+        """
+        options: Dict[str, Any] = {
+            "pool_size": self.pool.size if self.pool is not None else 0,
+            "pragmas": self.pragmas,
+            "cached_statements": self.cached_statements,
+            "pool_timeout": self.pool_timeout,
+            "busy_timeout": self.busy_timeout,
+            "instrumentation": self.instrumentation,
+            "read_only": self.read_only,
+        }
+        options.update(overrides)
+        return Database(self.db_path, **options)
+
+    def connect(self, *, check_same_thread: bool = True) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.db_path,
+            uri=self.uri,
+            timeout=self.busy_timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=check_same_thread,
+            factory=sqlite3.Connection if self.instrumentation is None else InstrumentedConnection,
+        )
+        if self.instrumentation is not None:
+            self.instrumentation.attach(connection)
         connection.row_factory = sqlite3.Row
         connection.execute("PRAGMA foreign_keys = ON")
+        if self.pragmas is not None:
+            for statement in self.pragmas.statements():
+                connection.execute(statement)
+        if self.read_only:
+            connection.execute("PRAGMA query_only = ON")
+        return connection
+
+    def connect_readonly(self) -> sqlite3.Connection:
+        """Open a dedicated read-only connection for long-running reads.
+
+        It never takes a write lock, and under the WAL journal it reads a
+        stable snapshot without blocking writers.
+        """
+        connection = sqlite3.connect(
+            self.db_path if self.uri else f"{self.db_path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            timeout=self.busy_timeout,
+            cached_statements=self.cached_statements,
+            factory=sqlite3.Connection if self.instrumentation is None else InstrumentedConnection,
+        )
+        if self.instrumentation is not None:
+            self.instrumentation.attach(connection)
+        connection.row_factory = sqlite3.Row
+        if self.uri:
+            connection.execute("PRAGMA query_only = ON")
         return connection
 
     @contextmanager
     def connection(self) -> Iterator[sqlite3.Connection]:
-        conn = self.connect()
+        if self.pool is None:
+            conn = self.connect()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+            return
+
+        current: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if current is not None:
+            # Nested block on the same thread: the outermost block owns the transaction.
+            yield current
+            return
+
+        conn = self.pool.acquire()
+        self._local.conn = conn
         try:
             yield conn
             conn.commit()
@@ -33,30 +223,29 @@ class Database:
             conn.rollback()
             raise
         finally:
-            conn.close()
+            self._local.conn = None
+            self.pool.release(conn)
+
+    @contextmanager
+    def write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the block in a ``BEGIN IMMEDIATE`` transaction.
+
+        The write lock is taken up front, so reads inside the block cannot be
+        invalidated by another writer before the block commits. Keep these
+        blocks short: every other writer waits on them.
+        """
+        with self.connection() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
 
     def initialize_schema(self) -> None:
+        if self._schema_ready:
+            return
         with self.connection() as conn:
-            conn.executescript(
-                """
-                CREATE TABLE IF NOT EXISTS routes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    bus_number TEXT NOT NULL UNIQUE,
-                    origin TEXT NOT NULL,
-                    destination TEXT NOT NULL,
-                    departure_time TEXT NOT NULL,
-                    total_seats INTEGER NOT NULL CHECK(total_seats > 0),
-                    price REAL NOT NULL CHECK(price >= 0)
-                );
-
-                CREATE TABLE IF NOT EXISTS bookings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    route_id INTEGER NOT NULL,
-                    passenger_name TEXT NOT NULL,
-                    passenger_contact TEXT NOT NULL,
-                    seats_booked INTEGER NOT NULL CHECK(seats_booked > 0),
-                    booked_at TEXT NOT NULL DEFAULT (datetime('now')),
-                    FOREIGN KEY(route_id) REFERENCES routes(id) ON DELETE CASCADE
-                );
-                """
-            )
+            migrate(conn)
+        self._schema_ready = True
@@ -11,3 +11,11 @@ class ValidationError(BookingError):
 
 class SeatAvailabilityError(BookingError):
     """Raised when there are not enough seats remaining for a booking."""
+
+
+class RouteNotFoundError(SeatAvailabilityError):
+    """Raised when a booking, hold or availability lookup names an unknown route."""
+
+
+class HoldExpiredError(BookingError):
+    """Raised when confirming or releasing a seat hold that has lapsed."""
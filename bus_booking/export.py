@@ -0,0 +1,54 @@
+"""Streaming CSV and JSON lines writers for repository exports."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, TextIO
+
+FORMATS = ("csv", "jsonl")
+
+
+@contextmanager
+def open_output(path: Optional[Path], *, compress: bool = False) -> Iterator[TextIO]:
+    """Open ``path`` (or stdout for ``None``) as text, gzip-compressed if asked."""
+    if path is None:
+        if not compress:
+            yield sys.stdout
+            return
+        with gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb") as raw:
+            with io.TextIOWrapper(raw, encoding="utf-8", newline="") as handle:
+                yield handle
+        return
+    if compress:
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as handle:
+            yield handle
+    else:
+        with path.open("w", encoding="utf-8", newline="") as handle:
+            yield handle
+
+
+def write_rows(
+    rows: Iterable[Dict[str, Any]], columns: Sequence[str], handle: TextIO, fmt: str
+) -> int:
+    """Write ``rows`` to ``handle`` one at a time and return how many were written."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(handle, fieldnames=list(columns))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            handle.write(json.dumps(row, separators=(",", ":")))
+            handle.write("\n")
+            count += 1
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return count
@@ -0,0 +1,128 @@
+"""Group commit for bookings: many callers, one transaction per batch."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .models import Booking
+from .repository import BusRepository
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_DELAY = 0.0
+
+
+@dataclass(slots=True)
+class GroupCommitStats:
+    batches: int = 0
+    bookings: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.bookings / self.batches if self.batches else 0.0
+
+
+class GroupCommitQueue:
+    """Coalesce concurrent ``add_booking`` calls into shared transactions.
+
+    A committer thread takes the first waiting request, collects whatever
+    else arrives within ``max_delay`` seconds (up to ``max_batch`` requests)
+    and books them all with ``BusRepository.add_booking_batch``: one write
+    transaction and one commit for the whole batch. Requests are processed in
+    arrival order, so each caller sees the same outcome as serial
+    ``add_booking`` calls would give, including ``SeatAvailabilityError``.
+
+    By default the committer does not wait: a batch is whatever queued up
+    while the previous one was committing, so batches grow with load and a
+    lone request is never delayed. A positive ``max_delay`` only pays off
+    when each commit is expensive, e.g. with ``synchronous = FULL``; under
+    the default ``NORMAL`` the committer would mostly sit idle in the window.
+    """
+
+    def __init__(
+        self,
+        repository: BusRepository,
+        *,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ) -> None:
+        if max_batch <= 0:
+            raise ValueError("max_batch must be greater than zero.")
+        self.repository = repository
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = GroupCommitStats()
+        self._requests: "queue.Queue[Optional[Tuple[Booking, Future]]]" = queue.Queue()
+        self._closed = False
+        # Guards _closed, so no request can be queued behind the stop marker.
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="bus-booking-group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, booking: Booking) -> "Future[Booking]":
+        future: "Future[Booking]" = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Group commit queue is closed.")
+            self._requests.put((booking, future))
+        return future
+
+    def book(self, booking: Booking, timeout: Optional[float] = None) -> Booking:
+        """Submit and wait; raises the same exceptions as ``add_booking``."""
+        return self.submit(booking).result(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting requests, flush the ones already queued and stop."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._requests.put(None)
+        self._thread.join(timeout)
+
+    def __enter__(self) -> "GroupCommitQueue":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def _collect(self, first: Tuple[Booking, Future]) -> Tuple[List[Tuple[Booking, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._requests.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            pending = [(booking, future) for booking, future in batch if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            try:
+                outcomes = self.repository.add_booking_batch([booking for booking, _ in pending])
+            except Exception as exc:
+                for _, future in pending:
+                    future.set_exception(exc)
+                continue
+            self.stats.batches += 1
+            self.stats.bookings += len(pending)
+            for (_, future), outcome in zip(pending, outcomes):
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
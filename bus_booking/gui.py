@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
+import queue
 import sqlite3
+import threading
 import tkinter as tk
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from tkinter import ttk
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 from .exceptions import SeatAvailabilityError, ValidationError
-from .models import Booking, Route, RouteAvailability
-from .repository import BusRepository
+from .models import Booking, ChangeEvent, ChangeKind, Occupancy, Route, RouteAvailability
+from .repository import MIN_SEARCH_TERM, BusRepository
+from .seatmap import SeatMap
+from .worker import BackgroundWorker
 from .validators import (
     parse_departure,
     require_non_negative_float,
@@ -20,19 +24,168 @@ from .validators import (
 )
 
 
+DATETIME_DISPLAY_FORMAT = "%Y-%m-%d %H:%M"
+WORKER_POLL_MS = 40
+SEARCH_DEBOUNCE_MS = 150
+# Most recent matches shown for a passenger search.
+BOOKING_SEARCH_LIMIT = 200
+# How often changes made by other processes are picked up.
+CHANGE_POLL_MS = 1000
+# Upper bound on routes offered in the booking combobox at once.
+ROUTE_OPTION_LIMIT = 200
+# Treeview operations applied per event-loop tick when syncing large tables.
+SYNC_CHUNK_SIZE = 300
+# Departure days and route pairs shown on the Reports tab.
+REPORT_DAYS = 14
+REPORT_PAIRS = 20
+# Coach layout used by the seat picker: two seats either side of the aisle.
+SEATS_PER_ROW = 4
+
+
+class TreeSync:
+    """Keep a ``Treeview`` in step with an ordered list of keyed rows.
+
+    Rows are identified by ``iid``; each sync deletes, updates, moves or
+    inserts only the rows that differ from what is already displayed, and
+    ``render`` is called only for new or changed rows. Inserts and moves are
+    applied ``chunk_size`` at a time through ``after()`` so very large tables
+    fill in progressively without freezing the window.
+    """
+
+    def __init__(
+        self,
+        tree: ttk.Treeview,
+        render: Callable[[Any], Sequence[Any]],
+        chunk_size: int = SYNC_CHUNK_SIZE,
+    ) -> None:
+        self.tree = tree
+        self.render = render
+        self.chunk_size = chunk_size
+        self.shown: Dict[str, Any] = {}
+        self._rows: List[Tuple[str, Any]] = []
+        # Children as they were when the sync started. Rows before the
+        # current index are already in place; the rest of the tree is
+        # ``_order`` minus ``_placed``, in order, from ``_next`` on.
+        self._order: List[str] = []
+        self._placed: Set[str] = set()
+        self._next = 0
+        self._job: Optional[str] = None
+
+    @property
+    def pending(self) -> bool:
+        return self._job is not None
+
+    def sync(self, rows: List[Tuple[str, Any]]) -> None:
+        if self._job is not None:
+            self.tree.after_cancel(self._job)
+            self._job = None
+
+        wanted = dict(rows)
+        stale = [iid for iid in self.shown if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self.shown[iid]
+        for iid, item in rows:
+            if iid in self.shown and self.shown[iid] != item:
+                self.tree.item(iid, values=self.render(item))
+                self.shown[iid] = item
+
+        self._rows = rows
+        self._order = list(self.tree.get_children())
+        self._placed = set()
+        self._next = 0
+        self._apply(0)
+
+    def _current(self) -> Optional[str]:
+        """The child now at the first position not yet in place."""
+        while self._next < len(self._order) and self._order[self._next] in self._placed:
+            self._next += 1
+        return self._order[self._next] if self._next < len(self._order) else None
+
+    def _apply(self, start: int) -> None:
+        self._job = None
+        operations = 0
+        index = start
+        while index < len(self._rows):
+            if operations >= self.chunk_size:
+                self._job = self.tree.after(1, self._apply, index)
+                return
+            iid, item = self._rows[index]
+            if self._current() != iid:
+                if iid in self.shown:
+                    self.tree.move(iid, "", index)
+                else:
+                    self.tree.insert("", index, iid=iid, values=self.render(item))
+                    self.shown[iid] = item
+                operations += 1
+            self._placed.add(iid)
+            index += 1
+
+
+class SeatPicker(tk.Toplevel):
+    """Grid of toggle buttons for choosing seats from a route's seat map."""
+
+    def __init__(
+        self,
+        master: tk.Widget,
+        seat_map: SeatMap,
+        selected: Sequence[int],
+        on_done: Callable[[Tuple[int, ...]], None],
+    ) -> None:
+        super().__init__(master, padx=12, pady=12)
+        self.title("Choose seats")
+        self.transient(master.winfo_toplevel())
+        self._on_done = on_done
+        self._chosen: Dict[int, tk.BooleanVar] = {}
+        grid = ttk.Frame(self)
+        grid.pack()
+        for seat in range(1, seat_map.capacity + 1):
+            index = seat - 1
+            row, column = divmod(index, SEATS_PER_ROW)
+            column += column >= SEATS_PER_ROW // 2
+            if seat_map.is_free(seat):
+                var = tk.BooleanVar(value=seat in selected)
+                self._chosen[seat] = var
+                widget = ttk.Checkbutton(grid, text=str(seat), variable=var)
+            else:
+                widget = ttk.Label(grid, text=f"{seat} ✕", foreground="#ae2012")
+            widget.grid(row=row, column=column, padx=4, pady=2, sticky="w")
+        ttk.Button(self, text="Use selected seats", command=self._done).pack(fill="x", pady=(10, 0))
+
+    def _done(self) -> None:
+        self._on_done(tuple(seat for seat, var in self._chosen.items() if var.get()))
+        self.destroy()
+
+
 class Application(ttk.Frame):
     """Main application window."""
 
     def __init__(self, master: tk.Tk, repository: BusRepository) -> None:
         super().__init__(master, padding=20)
         self.repository = repository
+        self.worker = BackgroundWorker()
+        self._busy = False
         self.route_lookup: Dict[int, RouteAvailability] = {}
+        self._route_labels: Dict[int, Tuple[Route, str, str]] = {}
+        self._combo_route_ids: List[int] = []
+        self._search_job: Optional[str] = None
+        self._booking_search_job: Optional[str] = None
+        self._chosen_seats: Tuple[int, ...] = ()
+        self._bookings: Dict[int, Booking] = {}
+        # Subscribers run on whichever thread wrote; events wait here for
+        # the Tk thread.
+        self._changes: "queue.Queue[ChangeEvent]" = queue.Queue()
+        self._unsubscribe = repository.subscribe(self._changes.put)
+        self._stop_polling = threading.Event()
 
         self.pack(fill="both", expand=True)
         self._configure_root(master)
         self._create_styles()
         self._build_ui()
         self.refresh_all()
+        self._poll_worker()
+        threading.Thread(target=self._poll_changes, name="bus-booking-changes", daemon=True).start()
 
     def _configure_root(self, master: tk.Tk) -> None:
         master.title("SwiftSeat Bus Booking")
@@ -59,16 +212,23 @@ class Application(ttk.Frame):
 
         self.routes_frame = ttk.Frame(notebook, padding=10)
         self.bookings_frame = ttk.Frame(notebook, padding=10)
+        self.reports_frame = ttk.Frame(notebook, padding=10)
 
         notebook.add(self.routes_frame, text="Routes")
         notebook.add(self.bookings_frame, text="Bookings")
+        notebook.add(self.reports_frame, text="Reports")
 
         self._build_routes_tab()
         self._build_bookings_tab()
+        self._build_reports_tab()
 
+        status_bar = ttk.Frame(self)
+        status_bar.pack(fill="x", pady=(12, 0))
         self.status = tk.StringVar(value="Ready")
-        self.status_label = ttk.Label(self, textvariable=self.status, anchor="w")
-        self.status_label.pack(fill="x", pady=(12, 0))
+        self.status_label = ttk.Label(status_bar, textvariable=self.status, anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True)
+        self.busy_label = ttk.Label(status_bar, text="", anchor="e")
+        self.busy_label.pack(side="right")
 
     # Routes tab
     def _build_routes_tab(self) -> None:
@@ -109,6 +269,7 @@ class Application(ttk.Frame):
             self.routes_tree.heading(column, text=heading)
             self.routes_tree.column(column, width=width, anchor="center")
         self.routes_tree.pack(fill="both", expand=True)
+        self.routes_sync = TreeSync(self.routes_tree, self._render_route_row)
 
     def _create_labeled_entry(
         self,
@@ -131,16 +292,26 @@ class Application(ttk.Frame):
         card = ttk.LabelFrame(self.bookings_frame, text="Create booking", style="Card.TLabelframe")
         card.pack(fill="x", pady=(0, 16))
 
+        self.route_filter_entries = {
+            "origin": self._create_labeled_entry(card, "From (type to filter)", 0, 0),
+            "destination": self._create_labeled_entry(card, "To (type to filter)", 0, 1),
+        }
+        for entry in self.route_filter_entries.values():
+            entry.bind("<KeyRelease>", lambda _: self._schedule_route_search())
+
         self.route_selection = tk.StringVar()
-        ttk.Label(card, text="Route").grid(row=0, column=0, sticky="w", padx=6, pady=(0, 4))
+        ttk.Label(card, text="Route").grid(row=1, column=0, sticky="w", padx=6, pady=(6, 4))
         self.route_combo = ttk.Combobox(card, textvariable=self.route_selection, state="readonly")
-        self.route_combo.grid(row=1, column=0, columnspan=2, sticky="ew", padx=6)
+        self.route_combo.grid(row=2, column=0, columnspan=2, sticky="ew", padx=6)
 
         self.passenger_entries = {
-            "name": self._create_labeled_entry(card, "Passenger name", 2, 0),
-            "contact": self._create_labeled_entry(card, "Contact", 2, 1),
-            "seats": self._create_labeled_entry(card, "Seats to book", 3, 0),
+            "name": self._create_labeled_entry(card, "Passenger name", 3, 0),
+            "contact": self._create_labeled_entry(card, "Contact", 3, 1),
+            "seats": self._create_labeled_entry(card, "Seats to book", 4, 0),
         }
+        ttk.Button(card, text="Choose seats…", command=self._open_seat_picker).grid(
+            row=4, column=1, sticky="sew", padx=6, pady=6
+        )
         card.grid_columnconfigure(0, weight=1)
         card.grid_columnconfigure(1, weight=1)
 
@@ -149,10 +320,19 @@ class Application(ttk.Frame):
             text="Confirm booking",
             style="Accent.TButton",
             command=self._handle_booking,
-        ).grid(row=4, column=0, columnspan=2, sticky="ew", pady=(12, 0))
+        ).grid(row=5, column=0, columnspan=2, sticky="ew", pady=(12, 0))
 
         self.availability_label = ttk.Label(card, text="")
-        self.availability_label.grid(row=5, column=0, columnspan=2, sticky="w", padx=6, pady=(10, 0))
+        self.seats_label = ttk.Label(card, text="")
+        self.seats_label.grid(row=7, column=0, columnspan=2, sticky="w", padx=6)
+        self.availability_label.grid(row=6, column=0, columnspan=2, sticky="w", padx=6, pady=(10, 0))
+
+        search_bar = ttk.Frame(self.bookings_frame)
+        search_bar.pack(fill="x", pady=(0, 8))
+        ttk.Label(search_bar, text="Find booking (name or phone)").pack(side="left", padx=(0, 8))
+        self.booking_search_entry = ttk.Entry(search_bar)
+        self.booking_search_entry.pack(side="left", fill="x", expand=True)
+        self.booking_search_entry.bind("<KeyRelease>", lambda _: self._schedule_booking_search())
 
         self.bookings_tree = ttk.Treeview(
             self.bookings_frame,
@@ -163,7 +343,7 @@ class Application(ttk.Frame):
         for column, heading, width in (
             ("passenger", "Passenger", 160),
             ("route", "Route", 240),
-            ("seats", "Seats", 60),
+            ("seats", "Seats", 110),
             ("contact", "Contact", 150),
             ("booked", "Booked at", 150),
         ):
@@ -171,93 +351,338 @@ class Application(ttk.Frame):
             anchor = "center" if column in {"seats", "booked"} else "w"
             self.bookings_tree.column(column, width=width, anchor=anchor)
         self.bookings_tree.pack(fill="both", expand=True)
+        self.bookings_sync = TreeSync(self.bookings_tree, self._render_booking_row)
+
+        self.route_combo.bind("<<ComboboxSelected>>", lambda _: self._route_changed())
+
+    # Reports tab
+    def _build_reports_tab(self) -> None:
+        self.daily_tree = self._build_report_tree(f"Next {REPORT_DAYS} days", "Departure day")
+        self.daily_sync = TreeSync(self.daily_tree, self._render_report_row)
+        self.pairs_tree = self._build_report_tree("Top routes by revenue", "Origin → destination")
+        self.pairs_sync = TreeSync(self.pairs_tree, self._render_report_row)
+
+    def _build_report_tree(self, title: str, label: str) -> ttk.Treeview:
+        group = ttk.LabelFrame(self.reports_frame, text=title, style="Card.TLabelframe")
+        group.pack(fill="both", expand=True, pady=(0, 12))
+        tree = ttk.Treeview(
+            group,
+            columns=("label", "routes", "seats", "load", "revenue"),
+            show="headings",
+            height=7,
+        )
+        for column, heading, width in (
+            ("label", label, 260),
+            ("routes", "Routes", 80),
+            ("seats", "Seats sold", 120),
+            ("load", "Load factor", 100),
+            ("revenue", "Revenue", 120),
+        ):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="w" if column == "label" else "center")
+        tree.pack(fill="both", expand=True)
+        return tree
+
+    @staticmethod
+    def _render_report_row(item: Tuple[str, Occupancy]) -> Tuple[Any, ...]:
+        label, occupancy = item
+        return (
+            label,
+            occupancy.routes,
+            f"{occupancy.seats_booked} / {occupancy.seats_total}",
+            f"{occupancy.load_factor:.0%}",
+            f"${occupancy.revenue:,.2f}",
+        )
+
+    def _refresh_reports(self) -> None:
+        today = date.today()
+
+        def load() -> Tuple[Dict[date, Occupancy], List[Tuple[str, str, Occupancy]]]:
+            daily = self.repository.daily_occupancy(today, today + timedelta(days=REPORT_DAYS - 1))
+            return daily, self.repository.top_pairs(REPORT_PAIRS)
+
+        def show(data: Tuple[Dict[date, Occupancy], List[Tuple[str, str, Occupancy]]]) -> None:
+            daily, pairs = data
+            self.daily_sync.sync(
+                [(day.isoformat(), (day.strftime("%a %d %b %Y"), occupancy)) for day, occupancy in daily.items()]
+            )
+            labels = [(f"{origin} → {destination}", occupancy) for origin, destination, occupancy in pairs]
+            self.pairs_sync.sync([(label, (label, occupancy)) for label, occupancy in labels])
+
+        self._run_in_background(load, show, key="reports")
+
+    # Background work
+    def _poll_worker(self) -> None:
+        self.worker.drain()
+        self._drain_changes()
+        busy = self.worker.busy
+        if busy != self._busy:
+            self._busy = busy
+            self.busy_label.config(text="Working…" if busy else "")
+            self.winfo_toplevel().config(cursor="watch" if busy else "")
+        self.after(WORKER_POLL_MS, self._poll_worker)
+
+    def _poll_changes(self) -> None:
+        # Delivers other processes' changes to the subscriber; our own
+        # writes are delivered as soon as they return.
+        while not self._stop_polling.wait(CHANGE_POLL_MS / 1000):
+            try:
+                self.repository.poll_changes()
+            except sqlite3.Error:
+                pass  # e.g. locked by a long write; retried on the next tick
+
+    def stop(self) -> None:
+        self._stop_polling.set()
+        self._unsubscribe()
+        self.worker.stop(timeout=5)
+
+    def _run_in_background(
+        self,
+        func: Callable[[], Any],
+        on_success: Callable[[Any], None],
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        *,
+        key: Optional[str] = None,
+    ) -> None:
+        self.worker.submit(func, on_success, on_error or self._report_error, key=key)
 
-        self.route_combo.bind("<<ComboboxSelected>>", lambda _: self._update_availability())
+    def _report_error(self, exc: BaseException) -> None:
+        self._set_status(f"Database error: {exc}", error=True)
 
     def refresh_all(self) -> None:
-        self._load_routes()
-        self._load_bookings()
+        """Reload both tables; repeated requests while one is queued collapse into one."""
+        search = self._route_search()
+        bookings = self._booking_search()
+        self._run_in_background(
+            lambda: (self.repository.list_routes(), bookings(), search()),
+            self._apply_refresh,
+            key="refresh",
+        )
+        self._refresh_reports()
+
+    def _apply_refresh(
+        self,
+        data: Tuple[List[RouteAvailability], List[Booking], List[RouteAvailability]],
+    ) -> None:
+        routes, bookings, matches = data
+        self._load_routes(routes)
+        self._load_bookings(bookings)
+        self._load_route_options(matches)
+
+    # Change events
+    def _drain_changes(self) -> None:
+        events: List[ChangeEvent] = []
+        while True:
+            try:
+                events.append(self._changes.get_nowait())
+            except queue.Empty:
+                break
+        if events:
+            self._apply_changes(events)
+
+    def _apply_changes(self, events: List[ChangeEvent]) -> None:
+        """Reload only the routes and bookings named by ``events``."""
+        if any(event.kind is ChangeKind.RESYNC for event in events):
+            self.refresh_all()
+            return
+        removed_routes = {event.route_id for event in events if event.kind is ChangeKind.ROUTE_REMOVED}
+        changed_routes = {
+            event.route_id
+            for event in events
+            if event.kind in (ChangeKind.ROUTE_ADDED, ChangeKind.ROUTE_CHANGED, ChangeKind.AVAILABILITY_CHANGED)
+        } - removed_routes
+        added_bookings = {event.booking_id for event in events if event.kind is ChangeKind.BOOKING_ADDED}
+        removed_bookings = {event.booking_id for event in events if event.kind is ChangeKind.BOOKING_REMOVED}
+        bookings_changed = bool(added_bookings or removed_bookings)
+        listed_routes_changed = any(
+            event.kind in (ChangeKind.ROUTE_ADDED, ChangeKind.ROUTE_CHANGED, ChangeKind.ROUTE_REMOVED)
+            for event in events
+        )
+        # Search results are the latest matches, which new bookings can
+        # displace, so a search is rerun rather than patched.
+        search = self._booking_search() if bookings_changed and self._booking_search_active() else None
+
+        def load() -> Tuple[List[RouteAvailability], List[Booking]]:
+            routes = self.repository.get_routes(changed_routes)
+            if search is not None:
+                return routes, search()
+            return routes, self.repository.get_bookings(added_bookings - removed_bookings)
+
+        def show(data: Tuple[List[RouteAvailability], List[Booking]]) -> None:
+            routes, bookings = data
+            for route_id in removed_routes:
+                self.route_lookup.pop(route_id, None)
+            self.route_lookup.update((route.route.id, route) for route in routes)
+            self._load_routes(
+                sorted(self.route_lookup.values(), key=lambda item: (item.route.departure_time, item.route.id))
+            )
+            if search is not None:
+                self._load_bookings(bookings)
+            elif bookings_changed or listed_routes_changed:
+                for booking_id in removed_bookings:
+                    self._bookings.pop(booking_id, None)
+                self._bookings.update((booking.id, booking) for booking in bookings)
+                shown = list(self._bookings.values())
+                if not self._booking_search_active():
+                    shown.sort(key=lambda booking: (booking.booked_at, booking.id), reverse=True)
+                self._load_bookings(shown)
+            if self._selected_route_id() in changed_routes | removed_routes:
+                self._update_availability()
+            if listed_routes_changed:
+                self._run_route_search()
+            self._refresh_reports()
+
+        self._run_in_background(load, show)
+
+    # Route search
+    def _route_search(self) -> Callable[[], List[RouteAvailability]]:
+        """Capture the current filter text as a repository search to run later."""
+        origin = self.route_filter_entries["origin"].get()
+        destination = self.route_filter_entries["destination"].get()
+        return lambda: self.repository.search_routes(
+            origin=origin, destination=destination, limit=ROUTE_OPTION_LIMIT
+        )
+
+    def _schedule_route_search(self) -> None:
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DEBOUNCE_MS, self._run_route_search)
+
+    def _run_route_search(self) -> None:
+        self._search_job = None
+        self._run_in_background(self._route_search(), self._load_route_options, key="search")
+
+    # Booking search
+    def _booking_search_active(self) -> bool:
+        return len(self.booking_search_entry.get().strip()) >= MIN_SEARCH_TERM
+
+    def _booking_search(self) -> Callable[[], List[Booking]]:
+        """Capture the search box text; until it is long enough, list every booking."""
+        if not self._booking_search_active():
+            return self.repository.list_bookings
+        query = self.booking_search_entry.get().strip()
+        return lambda: self.repository.find_bookings(query, limit=BOOKING_SEARCH_LIMIT)
+
+    def _schedule_booking_search(self) -> None:
+        if self._booking_search_job is not None:
+            self.after_cancel(self._booking_search_job)
+        self._booking_search_job = self.after(SEARCH_DEBOUNCE_MS, self._run_booking_search)
+
+    def _run_booking_search(self) -> None:
+        self._booking_search_job = None
+        self._run_in_background(self._booking_search(), self._load_bookings, key="bookings")
+
+    def _load_route_options(self, matches: List[RouteAvailability]) -> None:
+        selected = self._selected_route_id()
+        self._combo_route_ids = [match.route.id for match in matches]
+        self.route_combo["values"] = [self._route_labels_for(match.route)[0] for match in matches]
+        if not matches:
+            self.route_selection.set("")
+        elif selected in self._combo_route_ids:
+            self.route_combo.current(self._combo_route_ids.index(selected))
+        else:
+            self.route_combo.current(0)
+        if self._selected_route_id() != selected:
+            self._set_chosen_seats(())
         self._update_availability()
 
-    def _load_routes(self) -> None:
-        for item in self.routes_tree.get_children():
-            self.routes_tree.delete(item)
-        routes = self.repository.list_routes()
+    def _load_routes(self, routes: List[RouteAvailability]) -> None:
         self.route_lookup = {route.route.id: route for route in routes if route.route.id is not None}
-
-        options: List[str] = []
-        for route in routes:
-            departure = route.route.departure_time.strftime("%Y-%m-%d %H:%M")
-            price = f"${route.route.price:,.2f}"
-            self.routes_tree.insert(
-                "",
-                "end",
-                iid=str(route.route.id),
-                values=(
-                    route.route.bus_number,
-                    route.route.origin,
-                    route.route.destination,
-                    departure,
-                    route.seats_available,
-                    price,
-                ),
-            )
-            options.append(
-                f"{route.route.bus_number} | {route.route.origin} → {route.route.destination} | {departure}"
+        self.routes_sync.sync([(str(route.route.id), route) for route in routes])
+        for route_id in self._route_labels.keys() - self.route_lookup.keys():
+            del self._route_labels[route_id]
+
+    def _route_labels_for(self, route: Route) -> Tuple[str, str]:
+        """Return the cached ``(combobox option, booking summary)`` for a route."""
+        cached = self._route_labels.get(route.id)
+        if cached is None or cached[0] != route:
+            departure = route.departure_time.strftime(DATETIME_DISPLAY_FORMAT)
+            cached = (
+                route,
+                f"{route.bus_number} | {route.origin} → {route.destination} | {departure}",
+                f"{route.bus_number} {route.origin}→{route.destination} @ {departure}",
             )
-        self.route_combo["values"] = options
-        if options:
-            if self.route_selection.get() not in options:
-                self.route_selection.set(options[0])
-        else:
-            self.route_selection.set("")
+            self._route_labels[route.id] = cached
+        return cached[1], cached[2]
+
+    def _render_route_row(self, route: RouteAvailability) -> Tuple[Any, ...]:
+        return (
+            route.route.bus_number,
+            route.route.origin,
+            route.route.destination,
+            route.route.departure_time.strftime(DATETIME_DISPLAY_FORMAT),
+            route.seats_available,
+            f"${route.route.price:,.2f}",
+        )
 
-    def _load_bookings(self) -> None:
-        for item in self.bookings_tree.get_children():
-            self.bookings_tree.delete(item)
-        bookings = self.repository.list_bookings()
+    def _load_bookings(self, bookings: List[Booking]) -> None:
+        self._bookings = {booking.id: booking for booking in bookings}
+        rows: List[Tuple[str, Tuple[Booking, str]]] = []
         for booking in bookings:
             route_info = self.route_lookup.get(booking.route_id)
             route_summary = "Unknown route"
             if route_info:
-                route = route_info.route
-                route_summary = (
-                    f"{route.bus_number} {route.origin}→{route.destination}"
-                    f" @ {route.departure_time.strftime('%Y-%m-%d %H:%M')}"
-                )
-            self.bookings_tree.insert(
-                "",
-                "end",
-                values=(
-                    booking.passenger_name,
-                    route_summary,
-                    booking.seats_booked,
-                    booking.passenger_contact,
-                    booking.booked_at.strftime("%Y-%m-%d %H:%M"),
-                ),
-            )
+                route_summary = self._route_labels_for(route_info.route)[1]
+            rows.append((str(booking.id), (booking, route_summary)))
+        self.bookings_sync.sync(rows)
+
+    @staticmethod
+    def _render_booking_row(item: Tuple[Booking, str]) -> Tuple[Any, ...]:
+        booking, route_summary = item
+        return (
+            booking.passenger_name,
+            route_summary,
+            ", ".join(map(str, booking.seat_numbers)) or booking.seats_booked,
+            booking.passenger_contact,
+            booking.booked_at.strftime(DATETIME_DISPLAY_FORMAT),
+        )
 
     def _update_availability(self) -> None:
-        selection = self.route_selection.get()
-        if not selection:
+        route_id = self._selected_route_id()
+        if route_id is None:
             self.availability_label.config(text="")
             return
+
+        def show(seats: int) -> None:
+            if self._selected_route_id() == route_id:
+                self.availability_label.config(text=f"Seats remaining: {seats}")
+
+        self._run_in_background(
+            lambda: self.repository.get_available_seats(route_id), show, key="availability"
+        )
+
+    def _route_changed(self) -> None:
+        self._set_chosen_seats(())
+        self._update_availability()
+
+    def _open_seat_picker(self) -> None:
         route_id = self._selected_route_id()
         if route_id is None:
-            self.availability_label.config(text="")
+            self._set_status("Please select a route first.", error=True)
             return
-        seats = self.repository.get_available_seats(route_id)
-        self.availability_label.config(text=f"Seats remaining: {seats}")
+
+        def show(seat_map: SeatMap) -> None:
+            if self._selected_route_id() == route_id:
+                SeatPicker(self, seat_map, self._chosen_seats, self._set_chosen_seats)
+
+        self._run_in_background(
+            lambda: self.repository.get_seat_map(route_id), show, key="seat-map"
+        )
+
+    def _set_chosen_seats(self, seats: Tuple[int, ...]) -> None:
+        self._chosen_seats = seats
+        seats_entry = self.passenger_entries["seats"]
+        if seats:
+            seats_entry.delete(0, tk.END)
+            seats_entry.insert(0, str(len(seats)))
+            self.seats_label.config(text=f"Seats chosen: {', '.join(map(str, seats))}")
+        else:
+            self.seats_label.config(text="")
 
     def _selected_route_id(self) -> Optional[int]:
-        selection = self.route_selection.get()
-        for route_id, availability in self.route_lookup.items():
-            departure = availability.route.departure_time.strftime("%Y-%m-%d %H:%M")
-            summary = (
-                f"{availability.route.bus_number} | {availability.route.origin} → {availability.route.destination} | {departure}"
-            )
-            if summary == selection:
-                return route_id
+        index = self.route_combo.current()
+        if 0 <= index < len(self._combo_route_ids):
+            return self._combo_route_ids[index]
         return None
 
     def _handle_add_route(self) -> None:
@@ -281,19 +706,20 @@ class Application(ttk.Frame):
             total_seats=total_seats,
             price=price,
         )
-        try:
-            self.repository.add_route(route)
-        except sqlite3.IntegrityError:
-            self._set_status("Bus number must be unique.", error=True)
-            return
-        except Exception as exc:  # pragma: no cover - defensive fallback
-            self._set_status(f"Failed to add route: {exc}", error=True)
-            return
 
-        for entry in self.route_entries.values():
-            entry.delete(0, tk.END)
-        self._set_status("Route added successfully.")
-        self.refresh_all()
+        def added(_: Route) -> None:
+            for entry in self.route_entries.values():
+                entry.delete(0, tk.END)
+            self._set_status("Route added successfully.")
+
+        def failed(exc: BaseException) -> None:
+            if isinstance(exc, sqlite3.IntegrityError):
+                self._set_status("Bus number must be unique.", error=True)
+            else:  # pragma: no cover - defensive fallback
+                self._set_status(f"Failed to add route: {exc}", error=True)
+
+        self._set_status("Adding route…")
+        self._run_in_background(lambda: self.repository.add_route(route), added, failed)
 
     def _handle_booking(self) -> None:
         route_id = self._selected_route_id()
@@ -315,20 +741,24 @@ class Application(ttk.Frame):
             passenger_contact=contact,
             seats_booked=seats,
             booked_at=datetime.now(),
+            seat_numbers=self._chosen_seats,
         )
-        try:
-            self.repository.add_booking(booking)
-        except SeatAvailabilityError as exc:
-            self._set_status(str(exc), error=True)
-            return
-        except Exception as exc:  # pragma: no cover - defensive fallback
-            self._set_status(f"Failed to create booking: {exc}", error=True)
-            return
 
-        for entry in self.passenger_entries.values():
-            entry.delete(0, tk.END)
-        self._set_status("Booking confirmed.")
-        self.refresh_all()
+        def confirmed(created: Booking) -> None:
+            for entry in self.passenger_entries.values():
+                entry.delete(0, tk.END)
+            self._set_chosen_seats(())
+            seats_text = ", ".join(map(str, created.seat_numbers))
+            self._set_status(f"Booking confirmed: seats {seats_text}.")
+
+        def failed(exc: BaseException) -> None:
+            if isinstance(exc, (SeatAvailabilityError, ValidationError)):
+                self._set_status(str(exc), error=True)
+            else:  # pragma: no cover - defensive fallback
+                self._set_status(f"Failed to create booking: {exc}", error=True)
+
+        self._set_status("Submitting booking…")
+        self._run_in_background(lambda: self.repository.add_booking(booking), confirmed, failed)
 
     def _set_status(self, message: str, *, error: bool = False) -> None:
         self.status.set(message)
@@ -338,5 +768,8 @@ class Application(ttk.Frame):
 
 def launch_gui(repository: BusRepository) -> None:
     root = tk.Tk()
-    Application(root, repository)
-    root.mainloop()
+    app = Application(root, repository)
+    try:
+        root.mainloop()
+    finally:
+        app.stop()
@@ -0,0 +1,86 @@
+"""Background sweeper that releases lapsed seat holds."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from .repository import DEFAULT_SWEEP_BATCH, BusRepository
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SWEEP_INTERVAL = 5.0
+
+
+@dataclass(slots=True)
+class SweepStats:
+    sweeps: int = 0
+    released: int = 0
+    failures: int = 0
+    last_finished: Optional[datetime] = None
+
+
+class HoldSweeper:
+    """Call ``repository.expire_holds`` every ``interval`` seconds.
+
+    Bookings release lapsed holds on their own route before claiming seats,
+    so the sweeper only keeps listings and searches from counting seats that
+    nobody will confirm. Each sweep runs in ``batch_size`` transactions.
+    """
+
+    def __init__(
+        self,
+        repository: BusRepository,
+        *,
+        interval: float = DEFAULT_SWEEP_INTERVAL,
+        batch_size: int = DEFAULT_SWEEP_BATCH,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("Sweep interval must be greater than zero.")
+        self.repository = repository
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stats = SweepStats()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sweep_now(self) -> int:
+        released = self.repository.expire_holds(batch_size=self.batch_size)
+        self.stats.sweeps += 1
+        self.stats.released += released
+        self.stats.last_finished = datetime.now()
+        return released
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("Hold sweeper already started.")
+        self._thread = threading.Thread(target=self._run, name="bus-booking-holds", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                released = self.sweep_now()
+                if released:
+                    LOGGER.info("Released %s expired seat holds", released)
+            except sqlite3.Error:
+                self.stats.failures += 1
+                LOGGER.exception("Seat hold sweep failed")
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> "HoldSweeper":
+        self.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
@@ -0,0 +1,182 @@
+"""Optional SQL tracing and latency statistics for ``Database``.
+
+Instrumentation is opt-in: a ``Database`` without an ``Instrumentation``
+hands out plain ``sqlite3.Connection`` objects, so the disabled path adds no
+per-statement work at all.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, TextIO
+
+SQL_LOGGER = logging.getLogger("bus_booking.sql")
+SLOW_QUERY_LOGGER = logging.getLogger("bus_booking.sql.slow")
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and variable-length ``?, ?, ?`` lists."""
+    return _PLACEHOLDER_LIST.sub("?, ...", _WHITESPACE.sub(" ", sql).strip())
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Latency distribution with power-of-two microsecond buckets."""
+
+    count: int = 0
+    total: float = 0.0
+    minimum: float = float("inf")
+    maximum: float = 0.0
+    buckets: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+        bucket = max(int(seconds * 1_000_000), 1).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound (seconds) of the bucket holding the given percentile."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min((1 << bucket) / 1_000_000, self.maximum)
+        return self.maximum
+
+
+class Instrumentation:
+    """Counters, per-statement latency histograms and a slow-query log.
+
+    Latency covers ``execute``/``executemany`` – preparing the statement and
+    running it to its first row, which is the whole statement for writes,
+    sorts and aggregates. Rows fetched afterwards are not included.
+    """
+
+    def __init__(self, *, slow_query_threshold: Optional[float] = None, trace: bool = False) -> None:
+        self.slow_query_threshold = slow_query_threshold
+        self.trace = trace
+        self.connections_opened = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.slow_queries = 0
+        self.statements: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            self.connections_opened += 1
+        if isinstance(connection, InstrumentedConnection):
+            connection.instrumentation = self
+        if self.trace:
+            connection.set_trace_callback(SQL_LOGGER.debug)
+
+    def record(self, sql: str, seconds: float) -> None:
+        key = normalize_sql(sql)
+        with self._lock:
+            histogram = self.statements.get(key)
+            if histogram is None:
+                histogram = self.statements[key] = LatencyHistogram()
+            histogram.record(seconds)
+            slow = self.slow_query_threshold is not None and seconds >= self.slow_query_threshold
+            if slow:
+                self.slow_queries += 1
+        if slow:
+            SLOW_QUERY_LOGGER.warning("%.1f ms: %s", seconds * 1000, key)
+
+    def transaction_finished(self, *, committed: bool) -> None:
+        with self._lock:
+            if committed:
+                self.commits += 1
+            else:
+                self.rollbacks += 1
+
+    def summary(self, limit: int = 15) -> Dict[str, Any]:
+        with self._lock:
+            ranked = sorted(self.statements.items(), key=lambda item: item[1].total, reverse=True)
+            return {
+                "connections_opened": self.connections_opened,
+                "commits": self.commits,
+                "rollbacks": self.rollbacks,
+                "slow_queries": self.slow_queries,
+                "statements": [
+                    {
+                        "sql": sql,
+                        "count": histogram.count,
+                        "total_ms": histogram.total * 1000,
+                        "mean_ms": histogram.mean * 1000,
+                        "p50_ms": histogram.percentile(0.50) * 1000,
+                        "p95_ms": histogram.percentile(0.95) * 1000,
+                        "max_ms": histogram.maximum * 1000,
+                    }
+                    for sql, histogram in ranked[:limit]
+                ],
+            }
+
+    def print_summary(self, stream: TextIO, limit: int = 15) -> None:
+        summary = self.summary(limit)
+        print(
+            f"connections opened: {summary['connections_opened']}  commits: {summary['commits']}"
+            f"  rollbacks: {summary['rollbacks']}  slow queries: {summary['slow_queries']}",
+            file=stream,
+        )
+        print(f"{'count':>8} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}  sql", file=stream)
+        for row in summary["statements"]:
+            sql = row["sql"] if len(row["sql"]) <= 90 else row["sql"][:87] + "..."
+            print(
+                f"{row['count']:>8} {row['total_ms']:>10.2f} {row['mean_ms']:>9.3f}"
+                f" {row['p95_ms']:>9.3f} {row['max_ms']:>9.3f}  {sql}",
+                file=stream,
+            )
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """``sqlite3.Connection`` that reports timings to its ``Instrumentation``."""
+
+    instrumentation: Instrumentation
+
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.instrumentation.record(sql, time.perf_counter() - start)
+
+    def executemany(self, sql: str, parameters: Any, /) -> sqlite3.Cursor:
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            self.instrumentation.record(sql, time.perf_counter() - start)
+
+    def commit(self) -> None:
+        pending = self.in_transaction
+        start = time.perf_counter()
+        super().commit()
+        if pending:
+            self.instrumentation.record("COMMIT", time.perf_counter() - start)
+            self.instrumentation.transaction_finished(committed=True)
+
+    def rollback(self) -> None:
+        pending = self.in_transaction
+        super().rollback()
+        if pending:
+            self.instrumentation.transaction_finished(committed=False)
+
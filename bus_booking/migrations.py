@@ -0,0 +1,560 @@
+"""Versioned schema migrations driven by ``PRAGMA user_version``."""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Iterator, List
+
+from .validators import CONTACT_SEPARATORS
+
+
+def _statements(script: str) -> Iterator[str]:
+    """Split a SQL script into complete statements (trigger bodies included).
+
+    ``executescript`` would commit the surrounding transaction, so migration
+    scripts are executed one statement at a time instead.
+    """
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            buffer = ""
+            if statement:
+                yield statement
+    if buffer.strip():
+        raise ValueError(f"Incomplete SQL statement in migration: {buffer.strip()!r}")
+
+
+def _run_script(conn: sqlite3.Connection, script: str) -> None:
+    for statement in _statements(script):
+        conn.execute(statement)
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _column_type(conn: sqlite3.Connection, table: str, column: str) -> str:
+    types = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+    return types[column].upper()
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _create_base_tables(conn: sqlite3.Connection) -> None:
+    _run_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS routes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bus_number TEXT NOT NULL UNIQUE,
+            origin TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            departure_time TEXT NOT NULL,
+            total_seats INTEGER NOT NULL CHECK(total_seats > 0),
+            price REAL NOT NULL CHECK(price >= 0)
+        );
+
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            route_id INTEGER NOT NULL,
+            passenger_name TEXT NOT NULL,
+            passenger_contact TEXT NOT NULL,
+            seats_booked INTEGER NOT NULL CHECK(seats_booked > 0),
+            booked_at TEXT NOT NULL DEFAULT (datetime('now')),
+            FOREIGN KEY(route_id) REFERENCES routes(id) ON DELETE CASCADE
+        );
+        """,
+    )
+
+
+def _add_seat_counter(conn: sqlite3.Connection) -> None:
+    # Keep routes.seats_booked equal to SUM(bookings.seats_booked) for the route.
+    if "seats_booked" not in _columns(conn, "routes"):
+        conn.execute("ALTER TABLE routes ADD COLUMN seats_booked INTEGER NOT NULL DEFAULT 0")
+    conn.execute(
+        """
+        UPDATE routes SET seats_booked = IFNULL((
+            SELECT SUM(b.seats_booked) FROM bookings AS b WHERE b.route_id = routes.id
+        ), 0)
+        """
+    )
+    _run_script(
+        conn,
+        """
+        CREATE TRIGGER IF NOT EXISTS bookings_seats_insert
+        AFTER INSERT ON bookings
+        BEGIN
+            UPDATE routes SET seats_booked = seats_booked + NEW.seats_booked WHERE id = NEW.route_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bookings_seats_delete
+        AFTER DELETE ON bookings
+        BEGIN
+            UPDATE routes SET seats_booked = seats_booked - OLD.seats_booked WHERE id = OLD.route_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bookings_seats_update
+        AFTER UPDATE OF route_id, seats_booked ON bookings
+        BEGIN
+            UPDATE routes SET seats_booked = seats_booked - OLD.seats_booked WHERE id = OLD.route_id;
+            UPDATE routes SET seats_booked = seats_booked + NEW.seats_booked WHERE id = NEW.route_id;
+        END;
+        """,
+    )
+
+
+def _add_lookup_indexes(conn: sqlite3.Connection) -> None:
+    _run_script(
+        conn,
+        """
+        CREATE INDEX IF NOT EXISTS idx_bookings_route_id ON bookings(route_id);
+        CREATE INDEX IF NOT EXISTS idx_bookings_booked_at ON bookings(booked_at);
+        CREATE INDEX IF NOT EXISTS idx_routes_departure_time ON routes(departure_time);
+        """,
+    )
+
+
+def _add_search_indexes(conn: sqlite3.Connection) -> None:
+    # NOCASE keys let search_routes seek on case-insensitive city prefixes.
+    _run_script(
+        conn,
+        """
+        CREATE INDEX IF NOT EXISTS idx_routes_origin_departure
+            ON routes(origin COLLATE NOCASE, departure_time);
+        CREATE INDEX IF NOT EXISTS idx_routes_destination_departure
+            ON routes(destination COLLATE NOCASE, departure_time);
+        """,
+    )
+
+
+def _add_seat_maps(conn: sqlite3.Connection) -> None:
+    # routes.seat_map packs occupancy one bit per seat (see seatmap.SeatMap);
+    # bookings.seat_numbers lists the seats each booking holds. Existing
+    # bookings get consecutive seats in booking order.
+    if "seat_map" not in _columns(conn, "routes"):
+        conn.execute("ALTER TABLE routes ADD COLUMN seat_map BLOB")
+    if "seat_numbers" not in _columns(conn, "bookings"):
+        conn.execute("ALTER TABLE bookings ADD COLUMN seat_numbers TEXT")
+    routes = conn.execute("SELECT id, total_seats FROM routes WHERE seat_map IS NULL").fetchall()
+    for route_id, total_seats in routes:
+        next_seat = 1
+        assignments = []
+        for booking_id, seats_booked in conn.execute(
+            "SELECT id, seats_booked FROM bookings WHERE route_id = ? ORDER BY id", (route_id,)
+        ).fetchall():
+            last = min(next_seat + seats_booked, total_seats + 1)
+            assignments.append((",".join(map(str, range(next_seat, last))) or None, booking_id))
+            next_seat = last
+        conn.executemany("UPDATE bookings SET seat_numbers = ? WHERE id = ?", assignments)
+        occupied = (1 << (next_seat - 1)) - 1
+        conn.execute(
+            "UPDATE routes SET seat_map = ? WHERE id = ?",
+            (occupied.to_bytes((total_seats + 7) // 8, "little"), route_id),
+        )
+
+
+_BOOKING_COLUMNS = (
+    "id", "route_id", "passenger_name", "passenger_contact", "seats_booked", "booked_at", "seat_numbers"
+)
+
+
+def _rebuild_bookings(conn: sqlite3.Connection) -> None:
+    """Copy ``bookings`` into its current definition, converting TEXT ``booked_at``.
+
+    ``ALTER TABLE ADD COLUMN`` cannot give a column an expression default,
+    so the table is recreated with its columns in their original order. Its
+    indexes, triggers and AUTOINCREMENT counter carry over. Nothing refers
+    to bookings by foreign key, so dropping the old table cascades nowhere.
+    """
+    booked_at = "booked_at"
+    if _column_type(conn, "bookings", "booked_at") != "INTEGER":
+        booked_at = "CAST(strftime('%s', booked_at) AS INTEGER) / 60"
+    dependents = [
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT sql FROM sqlite_master
+            WHERE tbl_name = 'bookings' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+            """
+        )
+    ]
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'bookings'").fetchone()
+    conn.execute(
+        """
+        CREATE TABLE bookings_rebuilt (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            route_id INTEGER NOT NULL,
+            passenger_name TEXT NOT NULL,
+            passenger_contact TEXT NOT NULL,
+            seats_booked INTEGER NOT NULL CHECK(seats_booked > 0),
+            booked_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER) / 60),
+            seat_numbers TEXT,
+            FOREIGN KEY(route_id) REFERENCES routes(id) ON DELETE CASCADE
+        )
+        """
+    )
+    values = ", ".join(booked_at if column == "booked_at" else column for column in _BOOKING_COLUMNS)
+    conn.execute(f"INSERT INTO bookings_rebuilt ({', '.join(_BOOKING_COLUMNS)}) SELECT {values} FROM bookings")
+    conn.execute("DROP TABLE bookings")
+    conn.execute("ALTER TABLE bookings_rebuilt RENAME TO bookings")
+    for statement in dependents:
+        conn.execute(statement)
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'bookings'")
+    if sequence is not None:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('bookings', ?)", (sequence[0],))
+
+
+def _use_epoch_minutes(conn: sqlite3.Connection) -> None:
+    # departure_time and booked_at become INTEGER minutes since the epoch
+    # (models.to_epoch_minutes) so range filters and sorts compare integers.
+    # TEXT affinity would turn stored integers back into text, so the column
+    # has to change type. routes.departure_time is swapped for a converted
+    # INTEGER twin, which moves it to the end of the table; bookings is
+    # rebuilt so booked_at keeps its place and its "now" default. The
+    # indexes are rebuilt after.
+    _run_script(
+        conn,
+        """
+        DROP INDEX IF EXISTS idx_bookings_booked_at;
+        DROP INDEX IF EXISTS idx_routes_departure_time;
+        DROP INDEX IF EXISTS idx_routes_origin_departure;
+        DROP INDEX IF EXISTS idx_routes_destination_departure;
+        """,
+    )
+    if _column_type(conn, "routes", "departure_time") != "INTEGER":
+        conn.execute("ALTER TABLE routes ADD COLUMN departure_time_minutes INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            "UPDATE routes SET departure_time_minutes = CAST(strftime('%s', departure_time) AS INTEGER) / 60"
+        )
+        conn.execute("ALTER TABLE routes DROP COLUMN departure_time")
+        conn.execute("ALTER TABLE routes RENAME COLUMN departure_time_minutes TO departure_time")
+    if _column_type(conn, "bookings", "booked_at") != "INTEGER":
+        _rebuild_bookings(conn)
+    _add_lookup_indexes(conn)
+    _add_search_indexes(conn)
+
+
+# Revenue is kept in whole cents per route so incremental += / -= updates
+# never drift from a full recomputation.
+_ROUTE_REVENUE_CENTS = "CAST(ROUND({0}.seats_booked * {0}.price * 100) AS INTEGER)"
+
+
+def _rollup_upsert(table: str, key_columns: str, key_values: str) -> str:
+    return f"""
+        INSERT INTO {table} ({key_columns}, routes, seats_total, seats_booked, revenue_cents)
+        VALUES ({key_values}, 1, NEW.total_seats, NEW.seats_booked, {_ROUTE_REVENUE_CENTS.format("NEW")})
+        ON CONFLICT({key_columns}) DO UPDATE SET
+            routes = routes + excluded.routes,
+            seats_total = seats_total + excluded.seats_total,
+            seats_booked = seats_booked + excluded.seats_booked,
+            revenue_cents = revenue_cents + excluded.revenue_cents;
+    """
+
+
+def _rollup_remove(table: str, key_filter: str) -> str:
+    return f"""
+        UPDATE {table} SET
+            routes = routes - 1,
+            seats_total = seats_total - OLD.total_seats,
+            seats_booked = seats_booked - OLD.seats_booked,
+            revenue_cents = revenue_cents - {_ROUTE_REVENUE_CENTS.format("OLD")}
+        WHERE {key_filter};
+        DELETE FROM {table} WHERE {key_filter} AND routes = 0;
+    """
+
+
+def rebuild_rollups(conn: sqlite3.Connection) -> None:
+    """Recompute the occupancy rollup tables from ``routes``."""
+    revenue = _ROUTE_REVENUE_CENTS.format("r")
+    _run_script(
+        conn,
+        f"""
+        DELETE FROM daily_rollups;
+        DELETE FROM pair_rollups;
+        INSERT INTO daily_rollups (day, routes, seats_total, seats_booked, revenue_cents)
+        SELECT r.departure_time / 1440, COUNT(*), SUM(r.total_seats), SUM(r.seats_booked), SUM({revenue})
+        FROM routes AS r
+        GROUP BY r.departure_time / 1440;
+        INSERT INTO pair_rollups (origin, destination, routes, seats_total, seats_booked, revenue_cents)
+        SELECT r.origin, r.destination, COUNT(*), SUM(r.total_seats), SUM(r.seats_booked), SUM({revenue})
+        FROM routes AS r
+        GROUP BY r.origin, r.destination;
+        """,
+    )
+
+
+def _add_rollups(conn: sqlite3.Connection) -> None:
+    # Occupancy and revenue per departure day and per origin/destination
+    # pair. Triggers on routes keep them current; booking changes reach them
+    # through the routes.seats_booked counter updates.
+    day_key = ("day", "NEW.departure_time / 1440", "day = OLD.departure_time / 1440")
+    pair_key = (
+        "origin, destination",
+        "NEW.origin, NEW.destination",
+        "origin = OLD.origin AND destination = OLD.destination",
+    )
+    _run_script(
+        conn,
+        f"""
+        CREATE TABLE IF NOT EXISTS daily_rollups (
+            day INTEGER PRIMARY KEY,
+            routes INTEGER NOT NULL,
+            seats_total INTEGER NOT NULL,
+            seats_booked INTEGER NOT NULL,
+            revenue_cents INTEGER NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS pair_rollups (
+            origin TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            routes INTEGER NOT NULL,
+            seats_total INTEGER NOT NULL,
+            seats_booked INTEGER NOT NULL,
+            revenue_cents INTEGER NOT NULL,
+            PRIMARY KEY (origin, destination)
+        );
+
+        CREATE TRIGGER IF NOT EXISTS routes_rollup_insert
+        AFTER INSERT ON routes
+        BEGIN
+            {_rollup_upsert("daily_rollups", *day_key[:2])}
+            {_rollup_upsert("pair_rollups", *pair_key[:2])}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS routes_rollup_delete
+        AFTER DELETE ON routes
+        BEGIN
+            {_rollup_remove("daily_rollups", day_key[2])}
+            {_rollup_remove("pair_rollups", pair_key[2])}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS routes_rollup_update
+        AFTER UPDATE OF origin, destination, departure_time, total_seats, price, seats_booked ON routes
+        BEGIN
+            {_rollup_remove("daily_rollups", day_key[2])}
+            {_rollup_remove("pair_rollups", pair_key[2])}
+            {_rollup_upsert("daily_rollups", *day_key[:2])}
+            {_rollup_upsert("pair_rollups", *pair_key[:2])}
+        END;
+        """,
+    )
+    rebuild_rollups(conn)
+
+
+def _add_seat_holds(conn: sqlite3.Connection) -> None:
+    # A hold sets its seats in routes.seat_map and counts in routes.seats_held
+    # until it is confirmed, released or swept after expires_at (epoch
+    # seconds). The expiry indexes serve the global sweeper and the per-route
+    # cleanup done before each booking.
+    if "seats_held" not in _columns(conn, "routes"):
+        conn.execute("ALTER TABLE routes ADD COLUMN seats_held INTEGER NOT NULL DEFAULT 0")
+    _run_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS seat_holds (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            route_id INTEGER NOT NULL,
+            seats INTEGER NOT NULL CHECK(seats > 0),
+            seat_numbers TEXT NOT NULL,
+            expires_at INTEGER NOT NULL,
+            FOREIGN KEY(route_id) REFERENCES routes(id) ON DELETE CASCADE
+        );
+        CREATE INDEX IF NOT EXISTS idx_seat_holds_expires_at ON seat_holds(expires_at);
+        CREATE INDEX IF NOT EXISTS idx_seat_holds_route_expires ON seat_holds(route_id, expires_at);
+
+        CREATE TRIGGER IF NOT EXISTS seat_holds_insert
+        AFTER INSERT ON seat_holds
+        BEGIN
+            UPDATE routes SET seats_held = seats_held + NEW.seats WHERE id = NEW.route_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS seat_holds_delete
+        AFTER DELETE ON seat_holds
+        BEGIN
+            UPDATE routes SET seats_held = seats_held - OLD.seats WHERE id = OLD.route_id;
+        END;
+        """,
+    )
+
+
+def _contact_digits(column: str) -> str:
+    """SQL stripping the separators ``validate_contact`` allows, leaving the digits."""
+    expression = column
+    for separator in CONTACT_SEPARATORS:
+        expression = f"REPLACE({expression}, char({ord(separator)}), '')"
+    return expression
+
+
+def _add_booking_search(conn: sqlite3.Connection) -> None:
+    # Contentless trigram index: any three-character substring of a name or
+    # of the contact's digits is a lookup, and the index stores no copy of
+    # the text. Contentless rows are removed with the 'delete' command and
+    # the original values, which the triggers still have in OLD.
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bookings_fts'"
+    ).fetchone() is None
+    _run_script(
+        conn,
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS bookings_fts USING fts5(
+            passenger_name, contact_digits, content = '', tokenize = 'trigram'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS bookings_fts_insert
+        AFTER INSERT ON bookings
+        BEGIN
+            INSERT INTO bookings_fts (rowid, passenger_name, contact_digits)
+            VALUES (NEW.id, NEW.passenger_name, {_contact_digits("NEW.passenger_contact")});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bookings_fts_delete
+        AFTER DELETE ON bookings
+        BEGIN
+            INSERT INTO bookings_fts (bookings_fts, rowid, passenger_name, contact_digits)
+            VALUES ('delete', OLD.id, OLD.passenger_name, {_contact_digits("OLD.passenger_contact")});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bookings_fts_update
+        AFTER UPDATE OF passenger_name, passenger_contact ON bookings
+        BEGIN
+            INSERT INTO bookings_fts (bookings_fts, rowid, passenger_name, contact_digits)
+            VALUES ('delete', OLD.id, OLD.passenger_name, {_contact_digits("OLD.passenger_contact")});
+            INSERT INTO bookings_fts (rowid, passenger_name, contact_digits)
+            VALUES (NEW.id, NEW.passenger_name, {_contact_digits("NEW.passenger_contact")});
+        END;
+        """,
+    )
+    if created:
+        conn.execute(
+            f"""
+            INSERT INTO bookings_fts (rowid, passenger_name, contact_digits)
+            SELECT id, passenger_name, {_contact_digits("passenger_contact")} FROM bookings
+            """
+        )
+
+
+# The change log keeps the latest CHANGE_LOG_KEEP versions; every
+# CHANGE_LOG_PRUNE_EVERY-th change drops the ones that fell out of range.
+CHANGE_LOG_KEEP = 100_000
+CHANGE_LOG_PRUNE_EVERY = 1000
+
+
+def _add_change_log(conn: sqlite3.Connection) -> None:
+    # One row per change, numbered by the AUTOINCREMENT version, so readers
+    # in any process can ask for everything after the last version they saw.
+    # Seat-map rewrites and rollup bookkeeping are not logged. Pruning in a
+    # trigger covers every writer, in every process, without a scheduler;
+    # each pass is one primary-key range delete.
+    _run_script(
+        conn,
+        f"""
+        CREATE TABLE IF NOT EXISTS change_log (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            route_id INTEGER NOT NULL,
+            booking_id INTEGER
+        );
+
+        CREATE TRIGGER IF NOT EXISTS routes_log_insert
+        AFTER INSERT ON routes
+        BEGIN
+            INSERT INTO change_log (kind, route_id) VALUES ('route_added', NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS routes_log_delete
+        AFTER DELETE ON routes
+        BEGIN
+            INSERT INTO change_log (kind, route_id) VALUES ('route_removed', OLD.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS routes_log_update
+        AFTER UPDATE OF bus_number, origin, destination, departure_time, total_seats, price ON routes
+        WHEN (NEW.bus_number, NEW.origin, NEW.destination, NEW.departure_time, NEW.total_seats, NEW.price)
+            IS NOT (OLD.bus_number, OLD.origin, OLD.destination, OLD.departure_time, OLD.total_seats, OLD.price)
+        BEGIN
+            INSERT INTO change_log (kind, route_id) VALUES ('route_changed', NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS routes_log_availability
+        AFTER UPDATE OF total_seats, seats_booked, seats_held ON routes
+        WHEN NEW.total_seats - NEW.seats_booked - NEW.seats_held
+            != OLD.total_seats - OLD.seats_booked - OLD.seats_held
+        BEGIN
+            INSERT INTO change_log (kind, route_id) VALUES ('availability_changed', NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bookings_log_insert
+        AFTER INSERT ON bookings
+        BEGIN
+            INSERT INTO change_log (kind, route_id, booking_id) VALUES ('booking_added', NEW.route_id, NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bookings_log_delete
+        AFTER DELETE ON bookings
+        BEGIN
+            INSERT INTO change_log (kind, route_id, booking_id) VALUES ('booking_removed', OLD.route_id, OLD.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS change_log_prune
+        AFTER INSERT ON change_log
+        WHEN NEW.version % {CHANGE_LOG_PRUNE_EVERY} = 0
+        BEGIN
+            DELETE FROM change_log WHERE version <= NEW.version - {CHANGE_LOG_KEEP};
+        END;
+        """,
+    )
+
+
+# Ordered list of schema steps. Every step must be idempotent: databases
+# created before versioning start at user_version 0 but already contain
+# some of these objects.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create routes and bookings tables", _create_base_tables),
+    Migration(2, "Trigger-maintained routes.seats_booked counter", _add_seat_counter),
+    Migration(3, "Indexes for listing and availability lookups", _add_lookup_indexes),
+    Migration(4, "Indexes for route search by city prefix", _add_search_indexes),
+    Migration(5, "Per-seat occupancy bitmaps", _add_seat_maps),
+    Migration(6, "Integer epoch-minute timestamps", _use_epoch_minutes),
+    Migration(7, "Occupancy and revenue rollups", _add_rollups),
+    Migration(8, "Expiring seat holds", _add_seat_holds),
+    Migration(9, "Full-text passenger search", _add_booking_search),
+    Migration(10, "Change log for incremental readers", _add_change_log),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Bring the schema up to ``SCHEMA_VERSION`` and return the starting version.
+
+    Pending steps run in a single ``BEGIN IMMEDIATE`` transaction, so
+    concurrent start-ups apply each step exactly once. The caller commits.
+    """
+    current = schema_version(conn)
+    if current == SCHEMA_VERSION:
+        return current
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+        # Another process may have migrated while we waited for the lock.
+        current = schema_version(conn)
+    if current > SCHEMA_VERSION:
+        raise sqlite3.DatabaseError(
+            f"Database schema version {current} is newer than supported version {SCHEMA_VERSION}."
+        )
+    for migration in MIGRATIONS:
+        if migration.version > current:
+            migration.apply(conn)
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+    return current
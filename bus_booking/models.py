@@ -2,15 +2,35 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from functools import lru_cache
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+# Timestamps are stored as whole minutes since 1970-01-01 00:00 wall-clock time.
+EPOCH = datetime(1970, 1, 1)
+_MINUTE = timedelta(minutes=1)
 
 
 def parse_datetime(value: str) -> datetime:
     return datetime.fromisoformat(value)
 
 
+def to_epoch_minutes(value: datetime) -> int:
+    return (value.replace(tzinfo=None) - EPOCH) // _MINUTE
+
+
+@lru_cache(maxsize=8192)
+def from_epoch_minutes(value: int) -> datetime:
+    # Listings repeat the same few departure and booking minutes many times;
+    # datetimes are immutable, so cached instances are shared.
+    return EPOCH + _MINUTE * value
+
+
 @dataclass(slots=True)
 class Route:
     id: Optional[int]
@@ -36,3 +56,75 @@ class Booking:
     passenger_contact: str
     seats_booked: int
     booked_at: datetime
+    seat_numbers: Tuple[int, ...] = ()
+
+
+@dataclass(slots=True)
+class SeatHold:
+    """Seats set aside for a route until ``expires_at`` or until confirmed."""
+
+    id: int
+    route_id: int
+    seats: int
+    seat_numbers: Tuple[int, ...]
+    expires_at: datetime
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str]
+
+
+@dataclass(slots=True)
+class RowError:
+    row_number: int
+    message: str
+
+
+@dataclass(slots=True)
+class BulkResult:
+    inserted: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Occupancy:
+    """Seats sold and revenue over a group of routes."""
+
+    routes: int = 0
+    seats_total: int = 0
+    seats_booked: int = 0
+    revenue: float = 0.0
+
+    @property
+    def load_factor(self) -> float:
+        return self.seats_booked / self.seats_total if self.seats_total else 0.0
+
+
+class ChangeKind(str, Enum):
+    ROUTE_ADDED = "route_added"
+    ROUTE_CHANGED = "route_changed"
+    ROUTE_REMOVED = "route_removed"
+    BOOKING_ADDED = "booking_added"
+    BOOKING_REMOVED = "booking_removed"
+    AVAILABILITY_CHANGED = "availability_changed"
+    # Older changes were pruned from the log; reload everything.
+    RESYNC = "resync"
+
+
+@dataclass(slots=True)
+class ChangeEvent:
+    version: int
+    kind: ChangeKind
+    route_id: Optional[int] = None
+    booking_id: Optional[int] = None
+
+
+@dataclass(slots=True)
+class ChangeSet:
+    """Changes after a version; pass ``version`` to the next ``changes_since`` call."""
+
+    version: int
+    events: List[ChangeEvent]
+    complete: bool = True
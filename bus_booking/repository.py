@@ -2,12 +2,295 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import List
+import base64
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from functools import wraps
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, TypeVar, Union
 
 from .database import Database
-from .exceptions import SeatAvailabilityError
-from .models import Booking, Route, RouteAvailability
+from .migrations import CHANGE_LOG_KEEP, rebuild_rollups
+from .exceptions import BookingError, HoldExpiredError, RouteNotFoundError, SeatAvailabilityError, ValidationError
+from .models import (
+    EPOCH,
+    Booking,
+    BulkResult,
+    ChangeEvent,
+    ChangeKind,
+    ChangeSet,
+    Occupancy,
+    Page,
+    Route,
+    RouteAvailability,
+    RowError,
+    SeatHold,
+    from_epoch_minutes,
+    to_epoch_minutes,
+)
+from .seatmap import SeatMap, format_seat_numbers, parse_seat_numbers
+from .validators import (
+    normalize_phone,
+    parse_departure,
+    require_non_negative_float,
+    require_positive_int,
+    require_text,
+    validate_contact,
+)
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_BULK_BATCH = 1000
+DEFAULT_SEARCH_LIMIT = 100
+DEFAULT_HOLD_TTL = 300
+DEFAULT_SWEEP_BATCH = 500
+DEFAULT_FIND_LIMIT = 50
+DEFAULT_CHANGE_BATCH = 1000
+DEFAULT_CHANGE_LOG_KEEP = CHANGE_LOG_KEEP
+# A larger backlog reaches subscribers as one RESYNC event instead.
+MAX_PUBLISHED_CHANGES = 1000
+# Trigram search needs at least this many characters per term.
+MIN_SEARCH_TERM = 3
+# Sorts after every character, so [prefix, prefix + _MAX_CHAR) covers all
+# strings that start with prefix.
+_MAX_CHAR = chr(0x10FFFF)
+
+# Seats of holds that have lapsed but are not swept yet, per route. The
+# sweeper keeps this set small, so route queries join it once instead of
+# probing seat_holds for every route.
+_LAPSED_HOLDS = """
+    LEFT JOIN (
+        SELECT route_id, SUM(seats) AS seats
+        FROM seat_holds
+        WHERE expires_at <= CAST(strftime('%s', 'now') AS INTEGER)
+        GROUP BY route_id
+    ) AS lapsed ON lapsed.route_id = r.id
+"""
+# Availability reads the counters the booking and hold triggers maintain.
+_ROUTES = f"routes AS r {_LAPSED_HOLDS}"
+_SEATS_AVAILABLE = "r.total_seats - r.seats_booked - r.seats_held + IFNULL(lapsed.seats, 0)"
+
+_ROUTE_COLUMNS = f"""
+    r.id,
+    r.bus_number,
+    r.origin,
+    r.destination,
+    r.departure_time,
+    r.total_seats,
+    r.price,
+    {_SEATS_AVAILABLE} AS seats_available
+"""
+
+BOOKING_EXPORT_COLUMNS = (
+    "booking_id",
+    "route_id",
+    "bus_number",
+    "origin",
+    "destination",
+    "departure_time",
+    "passenger_name",
+    "passenger_contact",
+    "seats_booked",
+    "seat_numbers",
+    "booked_at",
+    "amount",
+)
+
+ROUTE_EXPORT_COLUMNS = (
+    "route_id",
+    "bus_number",
+    "origin",
+    "destination",
+    "departure_time",
+    "total_seats",
+    "seats_booked",
+    "seats_available",
+    "price",
+)
+
+_BOOKING_COLUMNS = (
+    "id, route_id, passenger_name, passenger_contact, seats_booked, booked_at, seat_numbers"
+)
+
+
+def _tuples(cursor: sqlite3.Cursor) -> List[Tuple[Any, ...]]:
+    """Fetch the remaining rows as plain tuples instead of ``sqlite3.Row``."""
+    cursor.row_factory = None
+    return cursor.fetchall()
+
+
+def _routes_from_tuples(rows: List[Tuple[Any, ...]]) -> List[RouteAvailability]:
+    # Positional unpacking in _ROUTE_COLUMNS order; listings decode thousands
+    # of rows, so this avoids per-column name lookups.
+    return [
+        RouteAvailability(
+            Route(route_id, bus_number, origin, destination, from_epoch_minutes(departure), total, price),
+            seats_available,
+        )
+        for route_id, bus_number, origin, destination, departure, total, price, seats_available in rows
+    ]
+
+
+def _bookings_from_tuples(rows: List[Tuple[Any, ...]]) -> List[Booking]:
+    # Positional unpacking in _BOOKING_COLUMNS order.
+    return [
+        Booking(
+            booking_id,
+            route_id,
+            name,
+            contact,
+            seats,
+            from_epoch_minutes(booked_at),
+            parse_seat_numbers(seat_numbers),
+        )
+        for booking_id, route_id, name, contact, seats, booked_at, seat_numbers in rows
+    ]
+
+
+def _encode_cursor(sort_key: object, row_id: int) -> str:
+    payload = json.dumps([sort_key, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        sort_key, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError) as exc:
+        raise ValidationError("Invalid page cursor.") from exc
+    if not isinstance(sort_key, int) or not isinstance(row_id, int):
+        raise ValidationError("Invalid page cursor.")
+    return sort_key, row_id
+
+
+def _export_filters(
+    departure_from: Optional[date], departure_to: Optional[date], route_id: Optional[int]
+) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    if departure_from is not None:
+        clauses.append("r.departure_time >= ?")
+        params.append(to_epoch_minutes(datetime.combine(departure_from, datetime.min.time())))
+    if departure_to is not None:
+        clauses.append("r.departure_time < ?")
+        params.append(to_epoch_minutes(datetime.combine(departure_to + timedelta(days=1), datetime.min.time())))
+    if route_id is not None:
+        clauses.append("r.id = ?")
+        params.append(route_id)
+    return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _iso_minutes(column: str) -> str:
+    """SQL rendering an epoch-minute column as ``YYYY-MM-DDTHH:MM`` for exports."""
+    return f"strftime('%Y-%m-%dT%H:%M', {column} * 60, 'unixepoch')"
+
+
+def _numbered_batches(
+    rows: Iterable[Any], batch_size: int
+) -> Iterator[List[Tuple[int, Any]]]:
+    numbered = enumerate(rows, start=1)
+    while True:
+        batch = list(islice(numbered, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _placeholders(values: List[Any]) -> str:
+    return ", ".join("?" * len(values))
+
+
+def _field(row: Mapping[str, Any], name: str) -> str:
+    value = row.get(name)
+    return "" if value is None else str(value)
+
+
+def _require_mapping(row: Any) -> Mapping[str, Any]:
+    if not isinstance(row, Mapping):
+        raise ValidationError("Row must be a mapping of field names to values.")
+    return row
+
+
+def _route_values(row: Any) -> Tuple[Any, ...]:
+    row = _require_mapping(row)
+    return (
+        require_text("Bus number", _field(row, "bus_number")),
+        require_text("Origin", _field(row, "origin")),
+        require_text("Destination", _field(row, "destination")),
+        to_epoch_minutes(parse_departure("Departure", _field(row, "departure_time"))),
+        require_positive_int("Total seats", _field(row, "total_seats")),
+        require_non_negative_float("Ticket price", _field(row, "price")),
+    )
+
+
+def _booking_values(row: Any) -> Tuple[Any, ...]:
+    row = _require_mapping(row)
+    booked_at = (
+        parse_departure("Booked at", _field(row, "booked_at"))
+        if _field(row, "booked_at").strip()
+        else datetime.now()
+    )
+    return (
+        require_positive_int("Route id", _field(row, "route_id")),
+        require_text("Passenger name", _field(row, "passenger_name")),
+        validate_contact(_field(row, "passenger_contact")),
+        require_positive_int("Seats", _field(row, "seats_booked")),
+        to_epoch_minutes(booked_at),
+    )
+
+
+_PHONE_RUN = re.compile(r"\+?[0-9][0-9\s-]*")
+
+
+def _booking_match(query: str) -> Optional[str]:
+    """Turn search box text into an FTS5 query over ``bookings_fts``.
+
+    Runs of digits (with the separators phone numbers use) match the
+    contact's digits; the remaining words match the passenger name. Every
+    term must match, as a substring. Terms too short for the trigram index
+    are ignored; ``None`` means nothing is left to search for.
+    """
+    terms = []
+    for run in _PHONE_RUN.findall(query):
+        digits = normalize_phone(run)
+        if len(digits) >= MIN_SEARCH_TERM:
+            terms.append(f'contact_digits : "{digits}"')
+    for word in _PHONE_RUN.sub(" ", query).split():
+        if len(word) >= MIN_SEARCH_TERM:
+            escaped = word.replace('"', '""')
+            terms.append(f'passenger_name : "{escaped}"')
+    return " AND ".join(terms) or None
+
+
+def _check_limit(limit: int) -> int:
+    if limit <= 0:
+        raise ValidationError("Page size must be greater than zero.")
+    return limit
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _publishes(method: F) -> F:
+    """Deliver change events to subscribers once the outermost write call returns."""
+
+    @wraps(method)
+    def wrapper(self: "BusRepository", *args: Any, **kwargs: Any) -> Any:
+        depth = getattr(self._local, "write_depth", 0)
+        self._local.write_depth = depth + 1
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            self._local.write_depth = depth
+        if depth == 0 and self._subscribers:
+            self.poll_changes()
+        return result
+
+    return wrapper  # type: ignore[return-value]
 
 
 class BusRepository:
@@ -16,10 +299,15 @@ class BusRepository:
     def __init__(self, database: Database) -> None:
         self.database = database
         self.database.initialize_schema()
+        self._subscribers: List[Callable[[ChangeEvent], None]] = []
+        self._published_version: Optional[int] = None
+        self._publish_lock = threading.RLock()
+        self._local = threading.local()
 
     # Route operations
+    @_publishes
     def add_route(self, route: Route) -> Route:
-        departure = route.departure_time.isoformat(timespec="minutes")
+        departure = to_epoch_minutes(route.departure_time)
         with self.database.connection() as conn:
             cursor = conn.execute(
                 """
@@ -48,103 +336,952 @@ class BusRepository:
 
     def list_routes(self) -> List[RouteAvailability]:
         with self.database.connection() as conn:
-            rows = conn.execute(
-                """
-                SELECT
-                    r.id,
-                    r.bus_number,
-                    r.origin,
-                    r.destination,
-                    r.departure_time,
-                    r.total_seats,
-                    r.price,
-                    r.total_seats - IFNULL(SUM(b.seats_booked), 0) AS seats_available
-                FROM routes AS r
-                LEFT JOIN bookings AS b ON r.id = b.route_id
-                GROUP BY r.id
-                ORDER BY r.departure_time ASC
-                """
-            ).fetchall()
-        results: List[RouteAvailability] = []
-        for row in rows:
-            route = Route(
-                id=row["id"],
-                bus_number=row["bus_number"],
-                origin=row["origin"],
-                destination=row["destination"],
-                departure_time=datetime.fromisoformat(row["departure_time"]),
-                total_seats=row["total_seats"],
-                price=row["price"],
+            rows = _tuples(
+                conn.execute(
+                    f"""
+                    SELECT {_ROUTE_COLUMNS}
+                    FROM {_ROUTES}
+                    ORDER BY r.departure_time ASC, r.id ASC
+                    """
+                )
+            )
+        return _routes_from_tuples(rows)
+
+    def list_routes_page(
+        self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> Page[RouteAvailability]:
+        """Return up to ``limit`` routes after ``cursor`` in departure order.
+
+        Uses keyset pagination on ``(departure_time, id)``, so every page is
+        an index seek regardless of how deep into the table it starts.
+        """
+        limit = _check_limit(limit)
+        with self.database.connection() as conn:
+            if cursor is None:
+                rows = _tuples(
+                    conn.execute(
+                        f"""
+                        SELECT {_ROUTE_COLUMNS}
+                        FROM {_ROUTES}
+                        ORDER BY r.departure_time ASC, r.id ASC
+                        LIMIT ?
+                        """,
+                        (limit + 1,),
+                    )
+                )
+            else:
+                departure, route_id = _decode_cursor(cursor)
+                rows = _tuples(
+                    conn.execute(
+                        f"""
+                        SELECT {_ROUTE_COLUMNS}
+                        FROM {_ROUTES}
+                        WHERE (r.departure_time, r.id) > (?, ?)
+                        ORDER BY r.departure_time ASC, r.id ASC
+                        LIMIT ?
+                        """,
+                        (departure, route_id, limit + 1),
+                    )
+                )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][4], rows[-1][0])
+        return Page(items=_routes_from_tuples(rows), next_cursor=next_cursor)
+
+    def iter_routes(self, batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[RouteAvailability]:
+        """Stream every route in departure order, ``batch_size`` rows at a time."""
+        cursor: Optional[str] = None
+        while True:
+            page = self.list_routes_page(batch_size, cursor)
+            yield from page.items
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
+    def search_routes(
+        self,
+        *,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        depart_after: Optional[datetime] = None,
+        depart_before: Optional[datetime] = None,
+        min_seats: Optional[int] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> List[RouteAvailability]:
+        """Find routes by case-insensitive city prefix and departure window.
+
+        ``depart_after`` is inclusive and ``depart_before`` exclusive. City
+        prefixes are turned into index ranges on the NOCASE search indexes
+        rather than ``LIKE`` patterns, so user input needs no escaping.
+        """
+        limit = _check_limit(limit)
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, prefix in (("origin", origin), ("destination", destination)):
+            prefix = (prefix or "").strip()
+            if prefix:
+                clauses.append(
+                    f"r.{column} COLLATE NOCASE >= ? AND r.{column} COLLATE NOCASE < ?"
+                )
+                params.extend((prefix, prefix + _MAX_CHAR))
+        if depart_after is not None:
+            clauses.append("r.departure_time >= ?")
+            params.append(to_epoch_minutes(depart_after))
+        if depart_before is not None:
+            clauses.append("r.departure_time < ?")
+            params.append(to_epoch_minutes(depart_before))
+        if min_seats is not None:
+            clauses.append(f"{_SEATS_AVAILABLE} >= ?")
+            params.append(min_seats)
+        where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        with self.database.connection() as conn:
+            rows = _tuples(
+                conn.execute(
+                    f"""
+                    SELECT {_ROUTE_COLUMNS}
+                    FROM {_ROUTES}
+                    {where}
+                    ORDER BY r.departure_time ASC, r.id ASC
+                    LIMIT ?
+                    """,
+                    (*params, limit),
+                )
             )
-            results.append(RouteAvailability(route=route, seats_available=row["seats_available"]))
-        return results
+        return _routes_from_tuples(rows)
 
     # Booking operations
+    @_publishes
     def add_booking(self, booking: Booking) -> Booking:
-        available = self.get_available_seats(booking.route_id)
-        if booking.seats_booked > available:
-            raise SeatAvailabilityError(
-                f"Only {available} seats remaining for this route."
+        with self.database.write_transaction() as conn:
+            return self._insert_booking(conn, booking)
+
+    @_publishes
+    def add_booking_batch(
+        self, bookings: Sequence[Booking]
+    ) -> List[Union[Booking, Exception]]:
+        """Book several requests in one transaction, in order.
+
+        Each request is checked against the seats left after the requests
+        before it, so every outcome is exactly what a serial sequence of
+        ``add_booking`` calls would produce. Failed requests get their
+        exception back in the result list instead of aborting the batch.
+        """
+        outcomes: List[Union[Booking, Exception]] = []
+        with self.database.write_transaction() as conn:
+            for booking in bookings:
+                # A request writes the seat map before its booking row, so a
+                # failure rolls back to the savepoint to undo both. Whatever
+                # the error, it belongs to this request alone.
+                conn.execute("SAVEPOINT batch_booking")
+                try:
+                    outcomes.append(self._insert_booking(conn, booking))
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO batch_booking")
+                    outcomes.append(exc)
+                conn.execute("RELEASE batch_booking")
+        return outcomes
+
+    def _insert_booking(self, conn: sqlite3.Connection, booking: Booking) -> Booking:
+        """Assign seats on the route's seat map and insert the booking.
+
+        Requested ``seat_numbers`` are claimed as a unit; without them the
+        seat map picks adjacent seats when it can.
+        """
+        seats = self._claim_seats(conn, booking.route_id, booking.seats_booked, booking.seat_numbers)
+        cursor = conn.execute(
+            """
+            INSERT INTO bookings (
+                route_id, passenger_name, passenger_contact, seats_booked, booked_at, seat_numbers
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                booking.route_id,
+                booking.passenger_name,
+                booking.passenger_contact,
+                booking.seats_booked,
+                to_epoch_minutes(booking.booked_at),
+                format_seat_numbers(seats),
+            ),
+        )
+        return Booking(
+            id=cursor.lastrowid,
+            route_id=booking.route_id,
+            passenger_name=booking.passenger_name,
+            passenger_contact=booking.passenger_contact,
+            seats_booked=booking.seats_booked,
+            booked_at=booking.booked_at,
+            seat_numbers=tuple(seats),
+        )
+
+    def _claim_seats(
+        self, conn: sqlite3.Connection, route_id: int, count: int, requested: Sequence[int] = ()
+    ) -> List[int]:
+        """Take ``count`` seats on the route's seat map and store the map.
+
+        Requested seats are claimed as a unit; without them the seat map
+        picks adjacent seats when it can. Lapsed holds on the route are
+        released first so they never block a sale.
+        """
+        if count <= 0:
+            raise ValidationError("Seats must be greater than zero.")
+        self._release_expired_holds(conn, route_ids=[route_id])
+        available = self._available_seats(conn, route_id)
+        if count > available:
+            raise SeatAvailabilityError(f"Only {available} seats remaining for this route.")
+        seat_map = self._load_seat_map(conn, route_id)
+        if requested:
+            seats = sorted(set(requested))
+            if len(seats) != count:
+                raise ValidationError(f"Choose exactly {count} different seats.")
+        else:
+            seats = seat_map.allocate(count)
+        seat_map.claim(seats)
+        conn.execute("UPDATE routes SET seat_map = ? WHERE id = ?", (seat_map.to_bytes(), route_id))
+        return seats
+
+    def _release_seats(self, conn: sqlite3.Connection, seats: Iterable[Tuple[int, Sequence[int]]]) -> None:
+        """Clear ``(route_id, seat numbers)`` pairs on the seat maps, one write per route."""
+        by_route: Dict[int, List[int]] = defaultdict(list)
+        for route_id, numbers in seats:
+            by_route[route_id].extend(numbers)
+        route_ids = list(by_route)
+        if not route_ids:
+            return
+        updates = []
+        for row in conn.execute(
+            f"SELECT id, total_seats, seat_map FROM routes WHERE id IN ({_placeholders(route_ids)})",
+            route_ids,
+        ):
+            seat_map = SeatMap(row["total_seats"], row["seat_map"])
+            seat_map.release(by_route[row["id"]])
+            updates.append((seat_map.to_bytes(), row["id"]))
+        conn.executemany("UPDATE routes SET seat_map = ? WHERE id = ?", updates)
+
+    @_publishes
+    def cancel_booking(self, booking_id: int) -> None:
+        """Delete a booking and free its seats in one transaction."""
+        with self.database.write_transaction() as conn:
+            row = conn.execute(
+                "SELECT route_id, seat_numbers FROM bookings WHERE id = ?", (booking_id,)
+            ).fetchone()
+            if row is None:
+                raise BookingError("Booking does not exist.")
+            self._release_seats(conn, [(row["route_id"], parse_seat_numbers(row["seat_numbers"]))])
+            conn.execute("DELETE FROM bookings WHERE id = ?", (booking_id,))
+
+    # Seat holds
+    @_publishes
+    def hold_seats(
+        self,
+        route_id: int,
+        seats: int,
+        *,
+        seat_numbers: Sequence[int] = (),
+        ttl: float = DEFAULT_HOLD_TTL,
+    ) -> SeatHold:
+        """Set seats aside for ``ttl`` seconds while passenger details are collected.
+
+        The hold takes its seats off ``get_available_seats`` straight away,
+        but only a short write transaction is used; nothing stays open while
+        the hold is pending. Turn it into a booking with ``confirm_hold``.
+        """
+        if seats <= 0:
+            raise ValidationError("Seats must be greater than zero.")
+        expires_at = math.ceil(time.time() + ttl)
+        with self.database.write_transaction() as conn:
+            numbers = self._claim_seats(conn, route_id, seats, seat_numbers)
+            cursor = conn.execute(
+                "INSERT INTO seat_holds (route_id, seats, seat_numbers, expires_at) VALUES (?, ?, ?, ?)",
+                (route_id, seats, format_seat_numbers(numbers), expires_at),
             )
-        with self.database.connection() as conn:
+        return SeatHold(cursor.lastrowid, route_id, seats, tuple(numbers), datetime.fromtimestamp(expires_at))
+
+    @_publishes
+    def confirm_hold(
+        self,
+        hold_id: int,
+        passenger_name: str,
+        passenger_contact: str,
+        booked_at: Optional[datetime] = None,
+    ) -> Booking:
+        """Book the held seats; raises ``HoldExpiredError`` once the hold has lapsed."""
+        booked_at = booked_at or datetime.now()
+        with self.database.write_transaction() as conn:
+            row = self._live_hold(conn, hold_id)
+            # The seats stay set in the seat map; they move from the hold to
+            # the booking in one transaction.
+            conn.execute("DELETE FROM seat_holds WHERE id = ?", (hold_id,))
             cursor = conn.execute(
                 """
                 INSERT INTO bookings (
-                    route_id, passenger_name, passenger_contact, seats_booked, booked_at
-                ) VALUES (?, ?, ?, ?, ?)
+                    route_id, passenger_name, passenger_contact, seats_booked, booked_at, seat_numbers
+                ) VALUES (?, ?, ?, ?, ?, ?)
                 """,
                 (
-                    booking.route_id,
-                    booking.passenger_name,
-                    booking.passenger_contact,
-                    booking.seats_booked,
-                    booking.booked_at.isoformat(timespec="minutes"),
+                    row["route_id"],
+                    passenger_name,
+                    passenger_contact,
+                    row["seats"],
+                    to_epoch_minutes(booked_at),
+                    row["seat_numbers"],
                 ),
             )
-            booking_id = cursor.lastrowid
         return Booking(
-            id=booking_id,
-            route_id=booking.route_id,
-            passenger_name=booking.passenger_name,
-            passenger_contact=booking.passenger_contact,
-            seats_booked=booking.seats_booked,
-            booked_at=booking.booked_at,
+            id=cursor.lastrowid,
+            route_id=row["route_id"],
+            passenger_name=passenger_name,
+            passenger_contact=passenger_contact,
+            seats_booked=row["seats"],
+            booked_at=booked_at,
+            seat_numbers=parse_seat_numbers(row["seat_numbers"]),
         )
 
+    @_publishes
+    def release_hold(self, hold_id: int) -> None:
+        """Give held seats back before the hold expires."""
+        with self.database.write_transaction() as conn:
+            row = self._live_hold(conn, hold_id)
+            self._release_seats(conn, [(row["route_id"], parse_seat_numbers(row["seat_numbers"]))])
+            conn.execute("DELETE FROM seat_holds WHERE id = ?", (hold_id,))
+
+    @_publishes
+    def expire_holds(self, *, batch_size: int = DEFAULT_SWEEP_BATCH) -> int:
+        """Release every lapsed hold, ``batch_size`` per short transaction.
+
+        Each batch is an index range scan on ``expires_at``, so the sweep
+        costs the same however many live holds exist. Returns the number of
+        holds released.
+        """
+        released = 0
+        while True:
+            with self.database.write_transaction() as conn:
+                count = self._release_expired_holds(conn, limit=batch_size)
+            released += count
+            if count < batch_size:
+                return released
+
+    @staticmethod
+    def _live_hold(conn: sqlite3.Connection, hold_id: int) -> sqlite3.Row:
+        row = conn.execute(
+            "SELECT route_id, seats, seat_numbers FROM seat_holds WHERE id = ? AND expires_at > ?",
+            (hold_id, int(time.time())),
+        ).fetchone()
+        if row is None:
+            raise HoldExpiredError("Seat hold has expired or does not exist.")
+        return row
+
+    def _release_expired_holds(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        route_ids: Optional[List[int]] = None,
+        limit: int = -1,
+    ) -> int:
+        sql = "SELECT id, route_id, seat_numbers FROM seat_holds WHERE expires_at <= ?"
+        params: List[Any] = [int(time.time())]
+        if route_ids is not None:
+            sql += f" AND route_id IN ({_placeholders(route_ids)})"
+            params.extend(route_ids)
+        rows = conn.execute(f"{sql} ORDER BY expires_at LIMIT ?", (*params, limit)).fetchall()
+        if not rows:
+            return 0
+        self._release_seats(conn, ((row["route_id"], parse_seat_numbers(row["seat_numbers"])) for row in rows))
+        conn.executemany("DELETE FROM seat_holds WHERE id = ?", [(row["id"],) for row in rows])
+        return len(rows)
+
     def list_bookings(self) -> List[Booking]:
         with self.database.connection() as conn:
-            rows = conn.execute(
-                """
-                SELECT id, route_id, passenger_name, passenger_contact, seats_booked, booked_at
+            rows = _tuples(
+                conn.execute(
+                    f"""
+                    SELECT {_BOOKING_COLUMNS}
+                    FROM bookings
+                    ORDER BY booked_at DESC, id DESC
+                    """
+                )
+            )
+        return _bookings_from_tuples(rows)
+
+    def find_bookings(
+        self, query: str, limit: int = DEFAULT_FIND_LIMIT, *, by_booked_at: bool = False
+    ) -> List[Booking]:
+        """Bookings whose passenger name or phone number contains ``query``, latest made first.
+
+        Served by the ``bookings_fts`` trigram index. Phone numbers match on
+        digits alone, so ``555-0100`` finds ``+1 555 0100``. Latest made
+        first lets the index stop after ``limit`` matches; ``by_booked_at``
+        sorts every match in ``list_bookings`` order instead.
+        """
+        limit = _check_limit(limit)
+        match = _booking_match(query)
+        if match is None:
+            return []
+        if by_booked_at:
+            sql = f"""
+                SELECT {_BOOKING_COLUMNS}
                 FROM bookings
-                ORDER BY booked_at DESC
-                """
-            ).fetchall()
-        return [
-            Booking(
-                id=row["id"],
-                route_id=row["route_id"],
-                passenger_name=row["passenger_name"],
-                passenger_contact=row["passenger_contact"],
-                seats_booked=row["seats_booked"],
-                booked_at=datetime.fromisoformat(row["booked_at"]),
+                WHERE id IN (SELECT rowid FROM bookings_fts WHERE bookings_fts MATCH ?)
+                ORDER BY booked_at DESC, id DESC
+                LIMIT ?
+            """
+        else:
+            sql = f"""
+                SELECT {_BOOKING_COLUMNS}
+                FROM bookings
+                WHERE id IN (
+                    SELECT rowid FROM bookings_fts WHERE bookings_fts MATCH ?
+                    ORDER BY rowid DESC
+                    LIMIT ?
+                )
+                ORDER BY id DESC
+            """
+        with self.database.connection() as conn:
+            rows = _tuples(conn.execute(sql, (match, limit)))
+        return _bookings_from_tuples(rows)
+
+    def list_bookings_page(
+        self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> Page[Booking]:
+        """Return up to ``limit`` bookings after ``cursor``, newest first.
+
+        Uses keyset pagination on ``(booked_at, id)``.
+        """
+        limit = _check_limit(limit)
+        with self.database.connection() as conn:
+            if cursor is None:
+                rows = _tuples(
+                    conn.execute(
+                        f"""
+                        SELECT {_BOOKING_COLUMNS}
+                        FROM bookings
+                        ORDER BY booked_at DESC, id DESC
+                        LIMIT ?
+                        """,
+                        (limit + 1,),
+                    )
+                )
+            else:
+                booked_at, booking_id = _decode_cursor(cursor)
+                rows = _tuples(
+                    conn.execute(
+                        f"""
+                        SELECT {_BOOKING_COLUMNS}
+                        FROM bookings
+                        WHERE (booked_at, id) < (?, ?)
+                        ORDER BY booked_at DESC, id DESC
+                        LIMIT ?
+                        """,
+                        (booked_at, booking_id, limit + 1),
+                    )
+                )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][5], rows[-1][0])
+        return Page(items=_bookings_from_tuples(rows), next_cursor=next_cursor)
+
+    def iter_bookings(self, batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Booking]:
+        """Stream every booking, newest first, ``batch_size`` rows at a time."""
+        cursor: Optional[str] = None
+        while True:
+            page = self.list_bookings_page(batch_size, cursor)
+            yield from page.items
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
+    def get_available_seats(self, route_id: int) -> int:
+        with self.database.connection() as conn:
+            return self._available_seats(conn, route_id)
+
+    def get_seat_map(self, route_id: int) -> SeatMap:
+        with self.database.connection() as conn:
+            return self._load_seat_map(conn, route_id)
+
+    @staticmethod
+    def _load_seat_map(conn: sqlite3.Connection, route_id: int) -> SeatMap:
+        row = conn.execute(
+            "SELECT total_seats, seat_map FROM routes WHERE id = ?", (route_id,)
+        ).fetchone()
+        if row is None:
+            raise RouteNotFoundError("Route does not exist.")
+        return SeatMap(row["total_seats"], row["seat_map"])
+
+    @staticmethod
+    def _available_seats(conn: sqlite3.Connection, route_id: int) -> int:
+        row = conn.execute(
+            f"SELECT {_SEATS_AVAILABLE} AS seats_available FROM {_ROUTES} WHERE r.id = ?",
+            (route_id,),
+        ).fetchone()
+        if row is None:
+            raise RouteNotFoundError("Route does not exist.")
+        return row["seats_available"]
+
+    def get_routes(self, route_ids: Iterable[int]) -> List[RouteAvailability]:
+        """Routes with the given ids in departure order; unknown ids are skipped."""
+        route_ids = list(route_ids)
+        if not route_ids:
+            return []
+        with self.database.connection() as conn:
+            rows = _tuples(
+                conn.execute(
+                    f"""
+                    SELECT {_ROUTE_COLUMNS}
+                    FROM {_ROUTES}
+                    WHERE r.id IN ({_placeholders(route_ids)})
+                    ORDER BY r.departure_time ASC, r.id ASC
+                    """,
+                    route_ids,
+                )
             )
-            for row in rows
+        return _routes_from_tuples(rows)
+
+    def get_bookings(self, booking_ids: Iterable[int]) -> List[Booking]:
+        """Bookings with the given ids, newest first; unknown ids are skipped."""
+        booking_ids = list(booking_ids)
+        if not booking_ids:
+            return []
+        with self.database.connection() as conn:
+            rows = _tuples(
+                conn.execute(
+                    f"""
+                    SELECT {_BOOKING_COLUMNS}
+                    FROM bookings
+                    WHERE id IN ({_placeholders(booking_ids)})
+                    ORDER BY booked_at DESC, id DESC
+                    """,
+                    booking_ids,
+                )
+            )
+        return _bookings_from_tuples(rows)
+
+    # Change feed
+    def current_version(self) -> int:
+        """Version of the latest change; ``changes_since`` it returns only newer changes."""
+        with self.database.connection() as conn:
+            return self._head_version(conn)
+
+    @staticmethod
+    def _head_version(conn: sqlite3.Connection) -> int:
+        # The AUTOINCREMENT counter survives pruning, unlike MAX(version).
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+        return row["seq"] if row is not None else 0
+
+    def changes_since(self, version: int, limit: int = DEFAULT_CHANGE_BATCH) -> ChangeSet:
+        """Up to ``limit`` changes committed after ``version``, by any process, oldest first.
+
+        A primary-key range scan on ``change_log``. The result is incomplete
+        when changes the caller has not seen were already pruned; it should
+        then reload everything and continue from the returned version.
+        """
+        limit = _check_limit(limit)
+        with self.database.connection() as conn:
+            rows = _tuples(
+                conn.execute(
+                    """
+                    SELECT version, kind, route_id, booking_id
+                    FROM change_log
+                    WHERE version > ?
+                    ORDER BY version
+                    LIMIT ?
+                    """,
+                    (version, limit),
+                )
+            )
+            head = self._head_version(conn)
+        # Versions have no gaps, so a gap right after ``version`` means pruning.
+        complete = rows[0][0] == version + 1 if rows else head <= version
+        if not complete:
+            return ChangeSet(head, [], complete=False)
+        events = [
+            ChangeEvent(number, ChangeKind(kind), route_id, booking_id)
+            for number, kind, route_id, booking_id in rows
         ]
+        return ChangeSet(events[-1].version if events else version, events)
 
-    def get_available_seats(self, route_id: int) -> int:
+    def prune_changes(self, keep: int = DEFAULT_CHANGE_LOG_KEEP) -> int:
+        """Drop all but the latest ``keep`` changes; returns the number removed.
+
+        The ``change_log_prune`` trigger already keeps the log near
+        ``DEFAULT_CHANGE_LOG_KEEP`` versions; call this to trim it further.
+        """
+        with self.database.write_transaction() as conn:
+            head = self._head_version(conn)
+            return conn.execute("DELETE FROM change_log WHERE version <= ?", (head - keep,)).rowcount
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> Callable[[], None]:
+        """Call ``callback`` with every change from now on; returns an unsubscribe function.
+
+        Changes made through this repository are delivered when the write
+        returns, on the writing thread. Changes from other processes arrive
+        with the next write or ``poll_changes`` call.
+        """
+        with self._publish_lock:
+            if not self._subscribers:
+                self._published_version = self.current_version()
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._publish_lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def poll_changes(self) -> List[ChangeEvent]:
+        """Deliver changes since the last delivery to subscribers, in version order."""
+        with self._publish_lock:
+            if self._published_version is None:
+                self._published_version = self.current_version()
+                return []
+            changes = self.changes_since(self._published_version, MAX_PUBLISHED_CHANGES + 1)
+            if changes.complete and len(changes.events) <= MAX_PUBLISHED_CHANGES:
+                events = changes.events
+                self._published_version = changes.version
+            else:
+                self._published_version = self.current_version() if changes.complete else changes.version
+                events = [ChangeEvent(self._published_version, ChangeKind.RESYNC)]
+            for event in events:
+                for callback in list(self._subscribers):
+                    callback(event)
+            return events
+
+    # Bulk import
+    @_publishes
+    def add_routes_bulk(
+        self, rows: Iterable[Mapping[str, Any]], *, batch_size: int = DEFAULT_BULK_BATCH
+    ) -> BulkResult:
+        """Validate and insert routes from raw field mappings.
+
+        Rows use the ``Route`` field names with form-style values
+        (``departure_time`` as ``YYYY-MM-DD HH:MM``). Each batch is inserted
+        with one ``executemany`` in one transaction; invalid rows and duplicate
+        bus numbers are reported in the result instead of aborting the import.
+        """
+        result = BulkResult()
+        for batch in _numbered_batches(rows, batch_size):
+            valid: List[Tuple[int, Tuple[Any, ...]]] = []
+            for row_number, row in batch:
+                try:
+                    valid.append((row_number, _route_values(row)))
+                except ValidationError as exc:
+                    result.errors.append(RowError(row_number, str(exc)))
+            if not valid:
+                continue
+            with self.database.write_transaction() as conn:
+                bus_numbers = [values[0] for _, values in valid]
+                seen = {
+                    row["bus_number"]
+                    for row in conn.execute(
+                        f"SELECT bus_number FROM routes WHERE bus_number IN ({_placeholders(bus_numbers)})",
+                        bus_numbers,
+                    )
+                }
+                accepted: List[Tuple[Any, ...]] = []
+                for row_number, values in valid:
+                    if values[0] in seen:
+                        result.errors.append(RowError(row_number, f"Bus number {values[0]} already exists."))
+                        continue
+                    seen.add(values[0])
+                    accepted.append(values)
+                conn.executemany(
+                    """
+                    INSERT INTO routes (bus_number, origin, destination, departure_time, total_seats, price)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    accepted,
+                )
+            result.inserted += len(accepted)
+        return result
+
+    @_publishes
+    def add_bookings_bulk(
+        self, rows: Iterable[Mapping[str, Any]], *, batch_size: int = DEFAULT_BULK_BATCH
+    ) -> BulkResult:
+        """Validate and insert bookings from raw field mappings.
+
+        Rows use the ``Booking`` field names; ``booked_at`` is optional and
+        defaults to now. Seats are allocated from each route's seat map for
+        every row, in input order, inside the batch's write transaction, so a
+        bulk load can never overbook a route.
+        """
+        result = BulkResult()
+        for batch in _numbered_batches(rows, batch_size):
+            valid: List[Tuple[int, Tuple[Any, ...]]] = []
+            for row_number, row in batch:
+                try:
+                    valid.append((row_number, _booking_values(row)))
+                except ValidationError as exc:
+                    result.errors.append(RowError(row_number, str(exc)))
+            if not valid:
+                continue
+            with self.database.write_transaction() as conn:
+                route_ids = list({values[0] for _, values in valid})
+                self._release_expired_holds(conn, route_ids=route_ids)
+                seat_maps: Dict[int, SeatMap] = {}
+                remaining: Dict[int, int] = {}
+                for row in conn.execute(
+                    f"""
+                    SELECT id, total_seats, seat_map, total_seats - seats_booked - seats_held AS available
+                    FROM routes
+                    WHERE id IN ({_placeholders(route_ids)})
+                    """,
+                    route_ids,
+                ):
+                    seat_maps[row["id"]] = SeatMap(row["total_seats"], row["seat_map"])
+                    remaining[row["id"]] = row["available"]
+                accepted: List[Tuple[Any, ...]] = []
+                touched = set()
+                for row_number, values in valid:
+                    route_id, seats = values[0], values[3]
+                    if route_id not in seat_maps:
+                        result.errors.append(RowError(row_number, f"Route {route_id} does not exist."))
+                        continue
+                    if seats > remaining[route_id]:
+                        result.errors.append(
+                            RowError(row_number, f"Only {remaining[route_id]} seats remaining for route {route_id}.")
+                        )
+                        continue
+                    seat_map = seat_maps[route_id]
+                    try:
+                        numbers = seat_map.allocate(seats)
+                    except SeatAvailabilityError as exc:
+                        result.errors.append(RowError(row_number, str(exc)))
+                        continue
+                    seat_map.claim(numbers)
+                    remaining[route_id] -= seats
+                    touched.add(route_id)
+                    accepted.append((*values, format_seat_numbers(numbers)))
+                conn.executemany(
+                    """
+                    INSERT INTO bookings (
+                        route_id, passenger_name, passenger_contact, seats_booked, booked_at, seat_numbers
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    accepted,
+                )
+                conn.executemany(
+                    "UPDATE routes SET seat_map = ? WHERE id = ?",
+                    [(seat_maps[route_id].to_bytes(), route_id) for route_id in touched],
+                )
+            result.inserted += len(accepted)
+        return result
+
+    # Export
+    def export_bookings(
+        self,
+        *,
+        departure_from: Optional[date] = None,
+        departure_to: Optional[date] = None,
+        route_id: Optional[int] = None,
+        batch_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream bookings joined with their route as plain dicts.
+
+        Rows come straight off one cursor on a read-only connection,
+        ``batch_size`` at a time, so memory stays constant and live bookings
+        are never blocked. Date bounds are inclusive and apply to the route's
+        departure.
+        """
+        where, params = _export_filters(departure_from, departure_to, route_id)
+        yield from self._stream(
+            f"""
+            SELECT {", ".join(BOOKING_EXPORT_COLUMNS)}
+            FROM (
+                SELECT
+                    b.id AS booking_id,
+                    b.route_id,
+                    r.bus_number,
+                    r.origin,
+                    r.destination,
+                    {_iso_minutes("r.departure_time")} AS departure_time,
+                    b.passenger_name,
+                    b.passenger_contact,
+                    b.seats_booked,
+                    b.seat_numbers,
+                    {_iso_minutes("b.booked_at")} AS booked_at,
+                    ROUND(b.seats_booked * r.price, 2) AS amount
+                FROM bookings AS b
+                JOIN routes AS r ON r.id = b.route_id
+                {where}
+                ORDER BY b.id
+            )
+            """,
+            params,
+            batch_size,
+        )
+
+    def export_route_availability(
+        self,
+        *,
+        departure_from: Optional[date] = None,
+        departure_to: Optional[date] = None,
+        route_id: Optional[int] = None,
+        batch_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream the ``list_routes`` availability data as plain dicts."""
+        where, params = _export_filters(departure_from, departure_to, route_id)
+        yield from self._stream(
+            f"""
+            SELECT {", ".join(ROUTE_EXPORT_COLUMNS)}
+            FROM (
+                SELECT
+                    r.id AS route_id,
+                    r.bus_number,
+                    r.origin,
+                    r.destination,
+                    {_iso_minutes("r.departure_time")} AS departure_time,
+                    r.total_seats,
+                    r.seats_booked,
+                    {_SEATS_AVAILABLE} AS seats_available,
+                    r.price
+                FROM {_ROUTES}
+                {where}
+                ORDER BY r.departure_time ASC, r.id ASC
+            )
+            """,
+            params,
+            batch_size,
+        )
+
+    def _stream(self, sql: str, params: List[Any], batch_size: int) -> Iterator[Dict[str, Any]]:
+        conn = self.database.connect_readonly()
+        try:
+            cursor = conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            conn.close()
+
+    # Reporting
+    def route_occupancy(self, route_id: int) -> Occupancy:
+        with self.database.connection() as conn:
+            row = conn.execute(
+                "SELECT total_seats, seats_booked, price FROM routes WHERE id = ?", (route_id,)
+            ).fetchone()
+        if row is None:
+            raise RouteNotFoundError("Route does not exist.")
+        revenue = round(row["seats_booked"] * row["price"], 2)
+        return Occupancy(1, row["total_seats"], row["seats_booked"], revenue)
+
+    def daily_occupancy(self, first_day: date, last_day: date) -> Dict[date, Occupancy]:
+        """Occupancy of routes departing on each day from ``first_day`` to ``last_day``.
+
+        Read from the ``daily_rollups`` table, so the cost depends on the
+        number of days, not on how many bookings exist. Days without routes
+        are left out.
+        """
+        epoch_day = EPOCH.date()
+        with self.database.connection() as conn:
+            rows = _tuples(
+                conn.execute(
+                    """
+                    SELECT day, routes, seats_total, seats_booked, revenue_cents
+                    FROM daily_rollups
+                    WHERE day BETWEEN ? AND ?
+                    ORDER BY day
+                    """,
+                    ((first_day - epoch_day).days, (last_day - epoch_day).days),
+                )
+            )
+        return {
+            epoch_day + timedelta(days=day): Occupancy(routes, total, booked, cents / 100)
+            for day, routes, total, booked, cents in rows
+        }
+
+    def pair_occupancy(self, origin: str, destination: str) -> Occupancy:
         with self.database.connection() as conn:
             row = conn.execute(
                 """
-                SELECT
-                    total_seats - IFNULL((
-                        SELECT SUM(seats_booked) FROM bookings WHERE route_id = ?
-                    ), 0) AS seats_available
-                FROM routes
-                WHERE id = ?
+                SELECT routes, seats_total, seats_booked, revenue_cents
+                FROM pair_rollups
+                WHERE origin = ? AND destination = ?
                 """,
-                (route_id, route_id),
+                (origin, destination),
             ).fetchone()
         if row is None:
-            raise SeatAvailabilityError("Route does not exist.")
-        return max(row["seats_available"], 0)
+            return Occupancy()
+        return Occupancy(row["routes"], row["seats_total"], row["seats_booked"], row["revenue_cents"] / 100)
+
+    def top_pairs(self, limit: int = 20) -> List[Tuple[str, str, Occupancy]]:
+        """Origin/destination pairs with the highest revenue."""
+        limit = _check_limit(limit)
+        with self.database.connection() as conn:
+            rows = _tuples(
+                conn.execute(
+                    """
+                    SELECT origin, destination, routes, seats_total, seats_booked, revenue_cents
+                    FROM pair_rollups
+                    ORDER BY revenue_cents DESC, origin, destination
+                    LIMIT ?
+                    """,
+                    (limit,),
+                )
+            )
+        return [
+            (origin, destination, Occupancy(routes, total, booked, cents / 100))
+            for origin, destination, routes, total, booked, cents in rows
+        ]
+
+    def rebuild_rollups(self) -> None:
+        """Recompute the rollup tables from scratch, after repairing seat counters."""
+        self.reconcile_seat_counts()
+        with self.database.write_transaction() as conn:
+            rebuild_rollups(conn)
+
+    # Maintenance
+    @_publishes
+    def reconcile_seat_counts(self, *, repair: bool = True) -> Dict[int, Tuple[int, int]]:
+        """Compare each route's seat map and counters with its bookings and holds.
+
+        Returns ``{route_id: (stored, actual)}`` seats taken for every route
+        that has drifted, e.g. after a manual edit: ``stored`` is the seat
+        map's count, or the ``seats_booked + seats_held`` counters' when only
+        those are off. With ``repair`` lapsed holds are released, then the
+        seat map and both counters are rebuilt from the bookings and live
+        holds in the same transaction.
+        """
+        with self.database.write_transaction() as conn:
+            if repair:
+                self._release_expired_holds(conn)
+            rows = conn.execute(
+                """
+                SELECT
+                    r.id, r.total_seats, r.seat_map, r.seats_booked, r.seats_held,
+                    IFNULL((SELECT SUM(b.seats_booked) FROM bookings AS b WHERE b.route_id = r.id), 0) AS booked,
+                    IFNULL((SELECT SUM(h.seats) FROM seat_holds AS h WHERE h.route_id = r.id), 0) AS held,
+                    (
+                        SELECT group_concat(seat_numbers) FROM (
+                            SELECT seat_numbers FROM bookings WHERE route_id = r.id
+                            UNION ALL
+                            SELECT seat_numbers FROM seat_holds WHERE route_id = r.id
+                        )
+                    ) AS taken
+                FROM routes AS r
+                """
+            ).fetchall()
+            drift: Dict[int, Tuple[int, int]] = {}
+            repairs = []
+            for row in rows:
+                stored = SeatMap(row["total_seats"], row["seat_map"])
+                taken = map(int, row["taken"].split(",")) if row["taken"] else ()
+                actual = SeatMap.from_seats(row["total_seats"], taken)
+                if stored.to_bytes() != actual.to_bytes():
+                    drift[row["id"]] = (stored.occupied(), actual.occupied())
+                elif (row["seats_booked"], row["seats_held"]) != (row["booked"], row["held"]):
+                    drift[row["id"]] = (row["seats_booked"] + row["seats_held"], row["booked"] + row["held"])
+                else:
+                    continue
+                repairs.append((actual.to_bytes(), row["booked"], row["held"], row["id"]))
+            if repair and repairs:
+                conn.executemany(
+                    "UPDATE routes SET seat_map = ?, seats_booked = ?, seats_held = ? WHERE id = ?",
+                    repairs,
+                )
+        return drift
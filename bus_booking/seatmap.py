@@ -0,0 +1,106 @@
+"""Compact per-route seat occupancy bitmaps."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .exceptions import SeatAvailabilityError, ValidationError
+
+
+def format_seat_numbers(seats: Sequence[int]) -> Optional[str]:
+    return ",".join(str(seat) for seat in seats) if seats else None
+
+
+@lru_cache(maxsize=4096)
+def parse_seat_numbers(value: Optional[str]) -> Tuple[int, ...]:
+    # Listings see the same short seat lists over and over; tuples are
+    # immutable, so cached results are shared.
+    return tuple(map(int, value.split(","))) if value else ()
+
+
+class SeatMap:
+    """Occupancy of seats ``1..capacity`` packed one bit per seat.
+
+    Seat ``n`` is bit ``(n - 1) % 8`` of byte ``(n - 1) // 8``, so a 60-seat
+    coach fits in 8 bytes. The map is stored as-is in ``routes.seat_map``.
+    """
+
+    __slots__ = ("capacity", "_bits")
+
+    def __init__(self, capacity: int, data: Optional[bytes] = None) -> None:
+        self.capacity = capacity
+        self._bits = int.from_bytes(data or b"", "little") & ((1 << capacity) - 1)
+
+    @classmethod
+    def from_seats(cls, capacity: int, seats: Iterable[int]) -> "SeatMap":
+        """Map with exactly ``seats`` taken, e.g. rebuilt from bookings and holds."""
+        seat_map = cls(capacity)
+        seat_map._bits = seat_map._mask(seats)
+        return seat_map
+
+    @classmethod
+    def size_for(cls, capacity: int) -> int:
+        return (capacity + 7) // 8
+
+    def to_bytes(self) -> bytes:
+        return self._bits.to_bytes(self.size_for(self.capacity), "little")
+
+    def occupied(self) -> int:
+        return self._bits.bit_count()
+
+    def available(self) -> int:
+        return self.capacity - self.occupied()
+
+    def is_free(self, seat: int) -> bool:
+        self._check_seat(seat)
+        return not (self._bits >> (seat - 1)) & 1
+
+    def free_seats(self) -> List[int]:
+        return [seat for seat in range(1, self.capacity + 1) if not (self._bits >> (seat - 1)) & 1]
+
+    def find_adjacent(self, count: int) -> Optional[List[int]]:
+        """Lowest-numbered run of ``count`` consecutive free seats, if any."""
+        if count <= 0 or count > self.capacity:
+            return None
+        free = ~self._bits & ((1 << self.capacity) - 1)
+        starts = free
+        for offset in range(1, count):
+            starts &= free >> offset
+        if not starts:
+            return None
+        first = (starts & -starts).bit_length()
+        return list(range(first, first + count))
+
+    def allocate(self, count: int) -> List[int]:
+        """Pick seats for ``count`` passengers: together if possible, else lowest free."""
+        if count <= 0:
+            raise ValidationError("Seats must be greater than zero.")
+        if count > self.available():
+            raise SeatAvailabilityError(f"Only {self.available()} seats remaining for this route.")
+        return self.find_adjacent(count) or self.free_seats()[:count]
+
+    def claim(self, seats: Iterable[int]) -> None:
+        """Mark ``seats`` as taken; nothing changes unless all of them are free."""
+        mask = self._mask(seats)
+        taken = self._bits & mask
+        if taken:
+            numbers = [seat for seat in range(1, self.capacity + 1) if (taken >> (seat - 1)) & 1]
+            raise SeatAvailabilityError(
+                f"Seat{'s' if len(numbers) > 1 else ''} {', '.join(map(str, numbers))} already taken."
+            )
+        self._bits |= mask
+
+    def release(self, seats: Iterable[int]) -> None:
+        self._bits &= ~self._mask(seats)
+
+    def _mask(self, seats: Iterable[int]) -> int:
+        mask = 0
+        for seat in seats:
+            self._check_seat(seat)
+            mask |= 1 << (seat - 1)
+        return mask
+
+    def _check_seat(self, seat: int) -> None:
+        if not 1 <= seat <= self.capacity:
+            raise ValidationError(f"Seat {seat} does not exist on this route.")
@@ -0,0 +1,400 @@
+"""Headless HTTP/JSON booking API built on asyncio and the standard library.
+
+Endpoints::
+
+    GET  /health
+    GET  /routes?limit=&cursor=
+    GET  /routes/search?origin=&destination=&depart_after=&depart_before=&min_seats=&limit=
+    GET  /routes/<id>/availability
+    GET  /bookings/search?q=&limit=
+    POST /bookings   {"route_id", "passenger_name", "passenger_contact", "seats_booked"[, "seat_numbers"]}
+    POST /holds      {"route_id", "seats"[, "seat_numbers", "ttl"]}
+    POST /holds/<id>/confirm   {"passenger_name", "passenger_contact"}
+    DELETE /holds/<id>
+
+Blocking repository calls run on a bounded thread pool. Requests beyond
+``max_pending`` in-flight calls are rejected with ``503`` instead of queueing
+without bound, and calls that exceed ``request_timeout`` answer ``504``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .exceptions import HoldExpiredError, RouteNotFoundError, SeatAvailabilityError, ValidationError
+from .models import Booking, RouteAvailability, SeatHold
+from .repository import BusRepository
+from .validators import (
+    parse_departure,
+    require_positive_int,
+    require_text,
+    validate_contact,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BODY_BYTES = 64 * 1024
+IDLE_TIMEOUT = 30.0
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+@dataclass(slots=True)
+class Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+    keep_alive: bool
+
+
+def route_to_json(availability: RouteAvailability) -> Dict[str, Any]:
+    route = availability.route
+    return {
+        "id": route.id,
+        "bus_number": route.bus_number,
+        "origin": route.origin,
+        "destination": route.destination,
+        "departure_time": route.departure_time.isoformat(timespec="minutes"),
+        "total_seats": route.total_seats,
+        "price": route.price,
+        "seats_available": availability.seats_available,
+    }
+
+
+def booking_to_json(booking: Booking) -> Dict[str, Any]:
+    return {
+        "id": booking.id,
+        "route_id": booking.route_id,
+        "passenger_name": booking.passenger_name,
+        "passenger_contact": booking.passenger_contact,
+        "seats_booked": booking.seats_booked,
+        "seat_numbers": list(booking.seat_numbers),
+        "booked_at": booking.booked_at.isoformat(timespec="minutes"),
+    }
+
+
+def hold_to_json(hold: SeatHold) -> Dict[str, Any]:
+    return {
+        "id": hold.id,
+        "route_id": hold.route_id,
+        "seats": hold.seats,
+        "seat_numbers": list(hold.seat_numbers),
+        "expires_at": hold.expires_at.isoformat(timespec="seconds"),
+    }
+
+
+def _json_object(request: Request) -> Dict[str, Any]:
+    try:
+        data = json.loads(request.body or b"{}")
+    except json.JSONDecodeError as exc:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be valid JSON.") from exc
+    if not isinstance(data, dict):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object.")
+    return data
+
+
+def _seat_numbers(data: Dict[str, Any]) -> Tuple[int, ...]:
+    seat_numbers = data.get("seat_numbers") or []
+    if not isinstance(seat_numbers, list) or not all(
+        isinstance(seat, int) and not isinstance(seat, bool) for seat in seat_numbers
+    ):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "seat_numbers must be a list of integers.")
+    return tuple(seat_numbers)
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Parse one HTTP/1.x request, or return ``None`` on a clean EOF."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial.strip():
+            return None
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Incomplete request.") from exc
+    except asyncio.LimitOverrunError as exc:
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request headers too large.") from exc
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError as exc:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.") from exc
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    raw_length = headers.get("content-length", "") or "0"
+    if not (raw_length.isascii() and raw_length.isdigit()):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length header.")
+    length = int(raw_length)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large.")
+    body = await reader.readexactly(length) if length else b""
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    url = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    return Request(method.upper(), url.path, query, headers, body, keep_alive)
+
+
+def encode_response(
+    status: HTTPStatus,
+    payload: Any,
+    *,
+    keep_alive: bool,
+    headers: Optional[Dict[str, str]] = None,
+) -> bytes:
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    lines = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+class BookingServer:
+    """asyncio HTTP server exposing ``BusRepository`` operations as JSON."""
+
+    def __init__(
+        self,
+        repository: BusRepository,
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: int = 4,
+        max_pending: int = 64,
+        request_timeout: float = 5.0,
+    ) -> None:
+        self.repository = repository
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.request_timeout = request_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bus-booking-db")
+        self._pending = 0
+        self._server: Optional[asyncio.Server] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        LOGGER.info("Serving on http://%s:%s", self.host, self.port)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                keep_alive = False
+                headers: Dict[str, str] = {}
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+                    if request is None:
+                        break
+                    keep_alive = request.keep_alive
+                    status, payload = await self._dispatch(request)
+                except HTTPError as exc:
+                    status, payload, headers = exc.status, {"error": str(exc)}, exc.headers
+                except asyncio.TimeoutError:
+                    break
+                except Exception:  # pragma: no cover - defensive fallback
+                    LOGGER.exception("Unhandled error while serving request")
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error."}
+                writer.write(encode_response(status, payload, keep_alive=keep_alive, headers=headers))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self._pending >= self.max_pending:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Server busy, retry shortly.", {"Retry-After": "1"})
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+        # A call counts as pending until its thread finishes, even after the
+        # request itself has timed out, so timeouts cannot bypass max_pending.
+        self._pending += 1
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.request_timeout)
+        except asyncio.TimeoutError as exc:
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, "Database did not respond in time.") from exc
+
+    def _release(self, _: "asyncio.Future[Any]") -> None:
+        self._pending -= 1
+
+    async def _dispatch(self, request: Request) -> Tuple[HTTPStatus, Any]:
+        parts = [part for part in request.path.split("/") if part]
+        try:
+            if request.method == "GET" and parts == ["health"]:
+                return HTTPStatus.OK, {"status": "ok", "pending": self._pending}
+            if request.method == "GET" and parts == ["routes"]:
+                return await self._list_routes(request)
+            if request.method == "GET" and parts == ["routes", "search"]:
+                return await self._search_routes(request)
+            if request.method == "GET" and len(parts) == 3 and parts[0] == "routes" and parts[2] == "availability":
+                return await self._availability(parts[1])
+            if request.method == "GET" and parts == ["bookings", "search"]:
+                return await self._find_bookings(request)
+            if request.method == "POST" and parts == ["bookings"]:
+                return await self._create_booking(request)
+            if request.method == "POST" and parts == ["holds"]:
+                return await self._create_hold(request)
+            if request.method == "POST" and len(parts) == 3 and parts[0] == "holds" and parts[2] == "confirm":
+                return await self._confirm_hold(parts[1], request)
+            if request.method == "DELETE" and len(parts) == 2 and parts[0] == "holds":
+                return await self._release_hold(parts[1])
+        except ValidationError as exc:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No endpoint for {request.method} {request.path}.")
+
+    async def _list_routes(self, request: Request) -> Tuple[HTTPStatus, Any]:
+        limit = require_positive_int("limit", request.query.get("limit", "100"))
+        page = await self._call(self.repository.list_routes_page, limit, request.query.get("cursor"))
+        return HTTPStatus.OK, {
+            "routes": [route_to_json(item) for item in page.items],
+            "next_cursor": page.next_cursor,
+        }
+
+    async def _search_routes(self, request: Request) -> Tuple[HTTPStatus, Any]:
+        query = request.query
+
+        def when(name: str) -> Optional[datetime]:
+            return parse_departure(name, query[name]) if query.get(name) else None
+
+        matches: List[RouteAvailability] = await self._call(
+            self.repository.search_routes,
+            origin=query.get("origin"),
+            destination=query.get("destination"),
+            depart_after=when("depart_after"),
+            depart_before=when("depart_before"),
+            min_seats=require_positive_int("min_seats", query["min_seats"]) if query.get("min_seats") else None,
+            limit=require_positive_int("limit", query.get("limit", "100")),
+        )
+        return HTTPStatus.OK, {"routes": [route_to_json(item) for item in matches]}
+
+    async def _availability(self, raw_route_id: str) -> Tuple[HTTPStatus, Any]:
+        route_id = require_positive_int("Route id", raw_route_id)
+        try:
+            seats = await self._call(self.repository.get_available_seats, route_id)
+        except RouteNotFoundError as exc:
+            raise HTTPError(HTTPStatus.NOT_FOUND, str(exc)) from exc
+        return HTTPStatus.OK, {"route_id": route_id, "seats_available": seats}
+
+    async def _find_bookings(self, request: Request) -> Tuple[HTTPStatus, Any]:
+        matches: List[Booking] = await self._call(
+            self.repository.find_bookings,
+            request.query.get("q", ""),
+            require_positive_int("limit", request.query.get("limit", "50")),
+        )
+        return HTTPStatus.OK, {"bookings": [booking_to_json(item) for item in matches]}
+
+    async def _create_booking(self, request: Request) -> Tuple[HTTPStatus, Any]:
+        data = _json_object(request)
+        booking = Booking(
+            id=None,
+            route_id=require_positive_int("Route id", str(data.get("route_id", ""))),
+            passenger_name=require_text("Passenger name", str(data.get("passenger_name", ""))),
+            passenger_contact=validate_contact(str(data.get("passenger_contact", ""))),
+            seats_booked=require_positive_int("Seats", str(data.get("seats_booked", ""))),
+            booked_at=datetime.now(),
+            seat_numbers=_seat_numbers(data),
+        )
+        try:
+            created = await self._call(self.repository.add_booking, booking)
+        except RouteNotFoundError as exc:
+            raise HTTPError(HTTPStatus.NOT_FOUND, str(exc)) from exc
+        except SeatAvailabilityError as exc:
+            raise HTTPError(HTTPStatus.CONFLICT, str(exc)) from exc
+        return HTTPStatus.CREATED, booking_to_json(created)
+
+    async def _create_hold(self, request: Request) -> Tuple[HTTPStatus, Any]:
+        data = _json_object(request)
+        options: Dict[str, Any] = {"seat_numbers": _seat_numbers(data)}
+        if data.get("ttl") is not None:
+            options["ttl"] = require_positive_int("ttl", str(data["ttl"]))
+        try:
+            hold = await self._call(
+                self.repository.hold_seats,
+                require_positive_int("Route id", str(data.get("route_id", ""))),
+                require_positive_int("Seats", str(data.get("seats", ""))),
+                **options,
+            )
+        except RouteNotFoundError as exc:
+            raise HTTPError(HTTPStatus.NOT_FOUND, str(exc)) from exc
+        except SeatAvailabilityError as exc:
+            raise HTTPError(HTTPStatus.CONFLICT, str(exc)) from exc
+        return HTTPStatus.CREATED, hold_to_json(hold)
+
+    async def _confirm_hold(self, raw_hold_id: str, request: Request) -> Tuple[HTTPStatus, Any]:
+        hold_id = require_positive_int("Hold id", raw_hold_id)
+        data = _json_object(request)
+        try:
+            booking = await self._call(
+                self.repository.confirm_hold,
+                hold_id,
+                require_text("Passenger name", str(data.get("passenger_name", ""))),
+                validate_contact(str(data.get("passenger_contact", ""))),
+            )
+        except HoldExpiredError as exc:
+            raise HTTPError(HTTPStatus.GONE, str(exc)) from exc
+        return HTTPStatus.CREATED, booking_to_json(booking)
+
+    async def _release_hold(self, raw_hold_id: str) -> Tuple[HTTPStatus, Any]:
+        hold_id = require_positive_int("Hold id", raw_hold_id)
+        try:
+            await self._call(self.repository.release_hold, hold_id)
+        except HoldExpiredError as exc:
+            raise HTTPError(HTTPStatus.GONE, str(exc)) from exc
+        return HTTPStatus.OK, {"id": hold_id, "released": True}
+
+
+def run_server(repository: BusRepository, **options: Any) -> None:
+    server = BookingServer(repository, **options)
+
+    async def main() -> None:
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
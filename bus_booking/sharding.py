@@ -0,0 +1,383 @@
+"""Routes and their bookings partitioned across several SQLite files.
+
+SQLite admits one writer per file. ``ShardedRepository`` spreads routes over
+N files, each with its own ``BusRepository``, so bookings on routes in
+different shards commit in parallel. A route's bookings and holds always
+live in the route's shard, which keeps every booking a single-file
+transaction.
+
+Each shard allocates ids from its own range (``SHARD_ID_SPAN`` apart), so
+any route, booking or hold id names its shard and point operations go
+straight to the owning file. Shard 0 keeps the ids of an unsharded
+database, so an existing file can become the first shard.
+"""
+
+from __future__ import annotations
+
+import heapq
+import sqlite3
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from itertools import count, islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, TypeVar, Union
+
+from .database import Database
+from .exceptions import BookingError, ValidationError
+from .models import Booking, BulkResult, Occupancy, Page, Route, RouteAvailability, RowError, SeatHold, to_epoch_minutes
+from .repository import (
+    DEFAULT_BULK_BATCH,
+    DEFAULT_FIND_LIMIT,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    DEFAULT_SWEEP_BATCH,
+    BusRepository,
+    _check_limit,
+    _encode_cursor,
+    _numbered_batches,
+    _tuples,
+)
+from .seatmap import SeatMap
+from .validators import parse_departure
+
+T = TypeVar("T")
+
+SHARD_ID_SPAN = 1 << 40
+PARTITIONS = ("route", "month")
+# Tables whose AUTOINCREMENT ids are handed out from the shard's range.
+_SHARDED_TABLES = ("routes", "bookings", "seat_holds")
+
+
+def shard_paths(db_path: Path, shards: int) -> List[Path]:
+    """File names for ``shards`` shards next to ``db_path``: ``name.0.sqlite3``, ..."""
+    db_path = Path(db_path)
+    return [db_path.with_name(f"{db_path.stem}.{index}{db_path.suffix}") for index in range(shards)]
+
+
+def shard_of(record_id: int) -> int:
+    return record_id // SHARD_ID_SPAN
+
+
+def _reserve_id_range(conn: sqlite3.Connection, index: int) -> None:
+    floor = index * SHARD_ID_SPAN
+    for table in _SHARDED_TABLES:
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, floor))
+        elif row["seq"] and not floor <= row["seq"] < floor + SHARD_ID_SPAN:
+            raise ValueError(f"Database already holds {table} ids outside the range of shard {index}.")
+        elif row["seq"] < floor:
+            conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (floor, table))
+
+
+def _route_key(item: RouteAvailability) -> Tuple[datetime, int]:
+    return item.route.departure_time, item.route.id
+
+
+def _booking_key(booking: Booking) -> Tuple[datetime, int]:
+    return booking.booked_at, booking.id
+
+
+def _add_occupancy(first: Occupancy, second: Occupancy) -> Occupancy:
+    return Occupancy(
+        first.routes + second.routes,
+        first.seats_total + second.seats_total,
+        first.seats_booked + second.seats_booked,
+        round(first.revenue + second.revenue, 2),
+    )
+
+
+class ShardedRepository:
+    """``BusRepository`` operations over routes partitioned across databases.
+
+    ``partition`` decides where a new route goes: ``"route"`` deals routes
+    out round-robin, so the route id alone picks the shard; ``"month"``
+    keeps every departure month in one shard, so a month's routes share a
+    file. Cross-shard listings are merged from each shard's sorted stream
+    in the same order a single database returns them.
+
+    Bus numbers stay unique across shards: a route whose bus number already
+    exists is sent to the shard that has it, which rejects it as a single
+    database would. Routes must be added through one ``ShardedRepository``
+    for that check to see every insert.
+    """
+
+    def __init__(self, databases: Sequence[Database], *, partition: str = "route") -> None:
+        if not databases:
+            raise ValueError("At least one shard is required.")
+        if partition not in PARTITIONS:
+            raise ValueError(f"Partition must be one of {', '.join(PARTITIONS)}.")
+        self.partition = partition
+        self.shards = [BusRepository(database) for database in databases]
+        for index, shard in enumerate(self.shards):
+            with shard.database.write_transaction() as conn:
+                _reserve_id_range(conn, index)
+        self._next_shard = count()
+        self._placement_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="bus-booking-shard")
+
+    @classmethod
+    def open(cls, db_path: Path, shards: int, *, partition: str = "route", **options: Any) -> "ShardedRepository":
+        """Open (or create) ``shards`` files named after ``db_path``; ``options`` go to ``Database``."""
+        return cls([Database(path, **options) for path in shard_paths(db_path, shards)], partition=partition)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        for shard in self.shards:
+            shard.database.close()
+
+    def __enter__(self) -> "ShardedRepository":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    # Shard selection
+    def shard_for(self, record_id: int) -> BusRepository:
+        """The shard owning a route, booking or hold id."""
+        return self.shards[self._index_for(record_id)]
+
+    def _index_for(self, record_id: int) -> int:
+        # Ids outside every range go to the nearest shard, which reports
+        # the record as missing just like an unsharded database would.
+        return min(max(shard_of(record_id), 0), len(self.shards) - 1)
+
+    def _place(self, departure: Optional[datetime]) -> int:
+        if self.partition == "month" and departure is not None:
+            return (departure.year * 12 + departure.month - 1) % len(self.shards)
+        return next(self._next_shard) % len(self.shards)
+
+    def _bus_number_owners(self, bus_numbers: Sequence[str]) -> Dict[str, int]:
+        """Shard index of every bus number in ``bus_numbers`` that some shard already has."""
+        owners: Dict[str, int] = {}
+        if not bus_numbers:
+            return owners
+        placeholders = ", ".join("?" * len(bus_numbers))
+        for index, shard in enumerate(self.shards):
+            with shard.database.connection() as conn:
+                for row in conn.execute(
+                    f"SELECT bus_number FROM routes WHERE bus_number IN ({placeholders})", list(bus_numbers)
+                ):
+                    owners[row["bus_number"]] = index
+        return owners
+
+    def _fan_out(self, groups: Mapping[int, T], call: Callable[[BusRepository, T], Any]) -> Dict[int, Any]:
+        """Run ``call`` on every shard in ``groups`` in parallel; results by shard index."""
+        futures = {index: self._executor.submit(call, self.shards[index], group) for index, group in groups.items()}
+        return {index: future.result() for index, future in futures.items()}
+
+    # Routes
+    def add_route(self, route: Route) -> Route:
+        with self._placement_lock:
+            index = self._bus_number_owners([route.bus_number]).get(route.bus_number)
+            if index is None:
+                index = self._place(route.departure_time)
+            return self.shards[index].add_route(route)
+
+    def list_routes(self) -> List[RouteAvailability]:
+        return list(heapq.merge(*(shard.list_routes() for shard in self.shards), key=_route_key))
+
+    def list_routes_page(
+        self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+    ) -> Page[RouteAvailability]:
+        """Keyset page over all shards; cursors are interchangeable with ``BusRepository``'s."""
+        limit = _check_limit(limit)
+        pages = [shard.list_routes_page(limit, cursor) for shard in self.shards]
+        merged = list(islice(heapq.merge(*(page.items for page in pages), key=_route_key), limit + 1))
+        next_cursor = None
+        if len(merged) > limit or any(page.next_cursor for page in pages):
+            merged = merged[:limit]
+            last = merged[-1].route
+            next_cursor = _encode_cursor(to_epoch_minutes(last.departure_time), last.id)
+        return Page(items=merged, next_cursor=next_cursor)
+
+    def iter_routes(self, batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[RouteAvailability]:
+        """Stream every route in departure order; each shard is read ``batch_size`` rows at a time."""
+        return heapq.merge(*(shard.iter_routes(batch_size) for shard in self.shards), key=_route_key)
+
+    def search_routes(self, *, limit: int = DEFAULT_SEARCH_LIMIT, **filters: Any) -> List[RouteAvailability]:
+        matches = [shard.search_routes(limit=limit, **filters) for shard in self.shards]
+        return list(islice(heapq.merge(*matches, key=_route_key), limit))
+
+    def get_available_seats(self, route_id: int) -> int:
+        return self.shard_for(route_id).get_available_seats(route_id)
+
+    def get_seat_map(self, route_id: int) -> SeatMap:
+        return self.shard_for(route_id).get_seat_map(route_id)
+
+    # Bookings
+    def add_booking(self, booking: Booking) -> Booking:
+        return self.shard_for(booking.route_id).add_booking(booking)
+
+    def add_booking_batch(
+        self, bookings: Sequence[Booking]
+    ) -> List[Union[Booking, BookingError, sqlite3.Error]]:
+        """Book each shard's share of ``bookings`` in one transaction per shard, in parallel."""
+        positions: Dict[int, List[int]] = defaultdict(list)
+        for position, booking in enumerate(bookings):
+            positions[self._index_for(booking.route_id)].append(position)
+        results = self._fan_out(
+            positions, lambda shard, group: shard.add_booking_batch([bookings[position] for position in group])
+        )
+        outcomes: List[Any] = [None] * len(bookings)
+        for index, group in positions.items():
+            for position, outcome in zip(group, results[index]):
+                outcomes[position] = outcome
+        return outcomes
+
+    def cancel_booking(self, booking_id: int) -> None:
+        self.shard_for(booking_id).cancel_booking(booking_id)
+
+    def list_bookings(self) -> List[Booking]:
+        return list(heapq.merge(*(shard.list_bookings() for shard in self.shards), key=_booking_key, reverse=True))
+
+    def find_bookings(self, query: str, limit: int = DEFAULT_FIND_LIMIT) -> List[Booking]:
+        """Search every shard and merge the matches newest booking first.
+
+        Like every sharded booking listing, the result is ordered by
+        ``booked_at`` (then id), so each shard is asked for that order too.
+        """
+        matches = [shard.find_bookings(query, limit, by_booked_at=True) for shard in self.shards]
+        return list(islice(heapq.merge(*matches, key=_booking_key, reverse=True), limit))
+
+    def list_bookings_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Page[Booking]:
+        limit = _check_limit(limit)
+        pages = [shard.list_bookings_page(limit, cursor) for shard in self.shards]
+        merged = list(islice(heapq.merge(*(page.items for page in pages), key=_booking_key, reverse=True), limit + 1))
+        next_cursor = None
+        if len(merged) > limit or any(page.next_cursor for page in pages):
+            merged = merged[:limit]
+            next_cursor = _encode_cursor(to_epoch_minutes(merged[-1].booked_at), merged[-1].id)
+        return Page(items=merged, next_cursor=next_cursor)
+
+    def iter_bookings(self, batch_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Booking]:
+        return heapq.merge(
+            *(shard.iter_bookings(batch_size) for shard in self.shards), key=_booking_key, reverse=True
+        )
+
+    # Seat holds
+    def hold_seats(self, route_id: int, seats: int, **options: Any) -> SeatHold:
+        return self.shard_for(route_id).hold_seats(route_id, seats, **options)
+
+    def confirm_hold(self, hold_id: int, *args: Any, **kwargs: Any) -> Booking:
+        return self.shard_for(hold_id).confirm_hold(hold_id, *args, **kwargs)
+
+    def release_hold(self, hold_id: int) -> None:
+        self.shard_for(hold_id).release_hold(hold_id)
+
+    def expire_holds(self, *, batch_size: int = DEFAULT_SWEEP_BATCH) -> int:
+        groups = dict.fromkeys(range(len(self.shards)), batch_size)
+        return sum(self._fan_out(groups, lambda shard, size: shard.expire_holds(batch_size=size)).values())
+
+    # Bulk import
+    def add_routes_bulk(self, rows: Iterable[Mapping[str, Any]], *, batch_size: int = DEFAULT_BULK_BATCH) -> BulkResult:
+        def place(batch: List[Any]) -> List[int]:
+            bus_numbers = [
+                str(row.get("bus_number") or "").strip() if isinstance(row, Mapping) else "" for row in batch
+            ]
+            # Known bus numbers go to their shard, which reports the
+            # duplicate; repeats within the batch follow the first one.
+            owners = self._bus_number_owners([number for number in bus_numbers if number])
+            indexes = []
+            for row, bus_number in zip(batch, bus_numbers):
+                index = owners.get(bus_number)
+                if index is None:
+                    try:
+                        departure = parse_departure("Departure", str(row.get("departure_time") or ""))
+                    except (AttributeError, ValidationError):
+                        # Invalid rows are reported by whichever shard receives them.
+                        departure = None
+                    index = self._place(departure)
+                    if bus_number:
+                        owners[bus_number] = index
+                indexes.append(index)
+            return indexes
+
+        with self._placement_lock:
+            return self._bulk(
+                rows, batch_size, place, lambda shard, batch: shard.add_routes_bulk(batch, batch_size=batch_size)
+            )
+
+    def add_bookings_bulk(
+        self, rows: Iterable[Mapping[str, Any]], *, batch_size: int = DEFAULT_BULK_BATCH
+    ) -> BulkResult:
+        def place(batch: List[Any]) -> List[int]:
+            indexes = []
+            for row in batch:
+                try:
+                    indexes.append(self._index_for(int(row.get("route_id"))))
+                except (AttributeError, TypeError, ValueError):
+                    indexes.append(0)
+            return indexes
+
+        return self._bulk(
+            rows, batch_size, place, lambda shard, batch: shard.add_bookings_bulk(batch, batch_size=batch_size)
+        )
+
+    def _bulk(
+        self,
+        rows: Iterable[Any],
+        batch_size: int,
+        place: Callable[[List[Any]], List[int]],
+        insert: Callable[[BusRepository, List[Any]], BulkResult],
+    ) -> BulkResult:
+        """Split each batch by shard, insert the parts in parallel and renumber row errors."""
+        result = BulkResult()
+        for batch in _numbered_batches(rows, batch_size):
+            groups: Dict[int, List[Tuple[int, Any]]] = defaultdict(list)
+            for index, (row_number, row) in zip(place([row for _, row in batch]), batch):
+                groups[index].append((row_number, row))
+            results = self._fan_out(groups, lambda shard, group: insert(shard, [row for _, row in group]))
+            errors: List[RowError] = []
+            for index, partial in results.items():
+                result.inserted += partial.inserted
+                numbers = groups[index]
+                errors.extend(RowError(numbers[error.row_number - 1][0], error.message) for error in partial.errors)
+            result.errors.extend(sorted(errors, key=lambda error: error.row_number))
+        return result
+
+    # Reporting
+    def route_occupancy(self, route_id: int) -> Occupancy:
+        return self.shard_for(route_id).route_occupancy(route_id)
+
+    def daily_occupancy(self, first_day: date, last_day: date) -> Dict[date, Occupancy]:
+        totals: Dict[date, Occupancy] = {}
+        for shard in self.shards:
+            for day, occupancy in shard.daily_occupancy(first_day, last_day).items():
+                totals[day] = _add_occupancy(totals.get(day, Occupancy()), occupancy)
+        return dict(sorted(totals.items()))
+
+    def pair_occupancy(self, origin: str, destination: str) -> Occupancy:
+        total = Occupancy()
+        for shard in self.shards:
+            total = _add_occupancy(total, shard.pair_occupancy(origin, destination))
+        return total
+
+    def top_pairs(self, limit: int = 20) -> List[Tuple[str, str, Occupancy]]:
+        # A pair's revenue is split across shards, so every shard's pairs
+        # are summed before ranking.
+        limit = _check_limit(limit)
+        totals: Dict[Tuple[str, str], Occupancy] = {}
+        for shard in self.shards:
+            with shard.database.connection() as conn:
+                rows = _tuples(
+                    conn.execute(
+                        "SELECT origin, destination, routes, seats_total, seats_booked, revenue_cents FROM pair_rollups"
+                    )
+                )
+            for origin, destination, routes, total, booked, cents in rows:
+                pair = (origin, destination)
+                totals[pair] = _add_occupancy(totals.get(pair, Occupancy()), Occupancy(routes, total, booked, cents / 100))
+        ranked = sorted(totals.items(), key=lambda item: (-item[1].revenue, item[0]))
+        return [(origin, destination, occupancy) for (origin, destination), occupancy in ranked[:limit]]
+
+    def rebuild_rollups(self) -> None:
+        self._fan_out(dict.fromkeys(range(len(self.shards))), lambda shard, _: shard.rebuild_rollups())
+
+    def reconcile_seat_counts(self, *, repair: bool = True) -> Dict[int, Tuple[int, int]]:
+        drift: Dict[int, Tuple[int, int]] = {}
+        for shard in self.shards:
+            drift.update(shard.reconcile_seat_counts(repair=repair))
+        return drift
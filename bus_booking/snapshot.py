@@ -0,0 +1,235 @@
+"""Point-in-time snapshots and scheduled online backups via the SQLite backup API."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .database import Database
+from .repository import BusRepository
+
+LOGGER = logging.getLogger(__name__)
+
+# Pages copied per backup step, and the pause between steps that lets
+# writers in. 1024 pages is 4 MiB with the default page size.
+DEFAULT_BACKUP_PAGES = 1024
+DEFAULT_BACKUP_SLEEP = 0.001
+
+_memory_names = itertools.count(1)
+
+
+def backup_into(
+    database: Database,
+    target: sqlite3.Connection,
+    *,
+    pages: int = DEFAULT_BACKUP_PAGES,
+    sleep: float = DEFAULT_BACKUP_SLEEP,
+) -> int:
+    """Copy ``database`` into ``target`` ``pages`` at a time; return the page count.
+
+    Under the WAL journal the copy reads inside one read transaction, so it
+    is a consistent point-in-time image and writers carry on between steps.
+    With a rollback journal SQLite restarts the copy whenever another
+    connection writes mid-way instead.
+    """
+    source = database.connect_readonly()
+    try:
+        wal = source.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+        if wal:
+            source.execute("BEGIN")
+            source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        page_count = 0
+
+        def progress(status: int, remaining: int, total: int) -> None:
+            nonlocal page_count
+            page_count = total
+
+        source.backup(target, pages=pages, progress=progress, sleep=sleep)
+        if wal:
+            source.rollback()
+        return page_count
+    finally:
+        source.close()
+
+
+class Snapshot:
+    """Read-only copy of a database, with a ``BusRepository`` over it.
+
+    Heavy reports and exports run against the copy and never contend with
+    live bookings. Close the snapshot (or use it as a context manager) to
+    drop the copy.
+    """
+
+    def __init__(
+        self,
+        repository: BusRepository,
+        taken_at: datetime,
+        pages: int,
+        *,
+        path: Optional[Path] = None,
+        keeper: Optional[sqlite3.Connection] = None,
+    ) -> None:
+        self.repository = repository
+        self.taken_at = taken_at
+        self.pages = pages
+        self.path = path
+        self._keeper = keeper
+
+    def close(self) -> None:
+        self.repository.database.close()
+        if self._keeper is not None:
+            # Last connection to a shared in-memory database: this frees it.
+            self._keeper.close()
+            self._keeper = None
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+            self.path = None
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+def take_snapshot(
+    database: Database,
+    *,
+    in_memory: bool = False,
+    directory: Optional[Path] = None,
+    pages: int = DEFAULT_BACKUP_PAGES,
+    sleep: float = DEFAULT_BACKUP_SLEEP,
+) -> Snapshot:
+    """Copy ``database`` into a temp file (or memory) and open it read-only.
+
+    A temp file suits exports, which stream through their own connections;
+    ``in_memory`` avoids disk I/O for short-lived reports on small databases.
+    """
+    taken_at = datetime.now()
+    if in_memory:
+        uri = f"file:bus-booking-snapshot-{os.getpid()}-{next(_memory_names)}?mode=memory&cache=shared"
+        keeper = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        try:
+            page_count = backup_into(database, keeper, pages=pages, sleep=sleep)
+        except BaseException:
+            keeper.close()
+            raise
+        repository = BusRepository(Database(uri, read_only=True))
+        return Snapshot(repository, taken_at, page_count, keeper=keeper)
+
+    handle, name = tempfile.mkstemp(prefix="bus-booking-snapshot-", suffix=".sqlite3", dir=directory)
+    os.close(handle)
+    path = Path(name)
+    try:
+        target = sqlite3.connect(path)
+        try:
+            page_count = backup_into(database, target, pages=pages, sleep=sleep)
+            # The copy inherits WAL mode; query-only readers of a WAL file
+            # would leave -wal/-shm files behind.
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+        repository = BusRepository(Database(path, read_only=True))
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return Snapshot(repository, taken_at, page_count, path=path)
+
+
+@dataclass(slots=True)
+class BackupStats:
+    backups: int = 0
+    failures: int = 0
+    last_pages: int = 0
+    last_duration: float = 0.0
+    last_finished: Optional[datetime] = None
+
+
+class BackupScheduler:
+    """Back up a live database to ``target`` every ``interval`` seconds.
+
+    Each run copies in page steps through ``backup_into`` to a sibling temp
+    file and then renames it over ``target``, so ``target`` is always a
+    complete backup even if the process dies mid-copy. Failures are logged
+    and retried at the next interval.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        target: Path,
+        *,
+        interval: float,
+        pages: int = DEFAULT_BACKUP_PAGES,
+        sleep: float = DEFAULT_BACKUP_SLEEP,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("Backup interval must be greater than zero.")
+        self.database = database
+        self.target = Path(target)
+        self.interval = interval
+        self.pages = pages
+        self.sleep = sleep
+        self.stats = BackupStats()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def backup_now(self) -> Path:
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.target.with_name(f".{self.target.name}.partial")
+        start = time.perf_counter()
+        target = sqlite3.connect(partial)
+        try:
+            pages = backup_into(self.database, target, pages=self.pages, sleep=self.sleep)
+        finally:
+            target.close()
+        os.replace(partial, self.target)
+        self.stats.backups += 1
+        self.stats.last_pages = pages
+        self.stats.last_duration = time.perf_counter() - start
+        self.stats.last_finished = datetime.now()
+        return self.target
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("Backup scheduler already started.")
+        self._thread = threading.Thread(target=self._run, name="bus-booking-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        # First backup immediately, then one per interval until stopped.
+        while True:
+            try:
+                self.backup_now()
+                LOGGER.info(
+                    "Backed up %s pages to %s in %.3fs",
+                    self.stats.last_pages,
+                    self.target,
+                    self.stats.last_duration,
+                )
+            except (OSError, sqlite3.Error):
+                self.stats.failures += 1
+                LOGGER.exception("Backup to %s failed", self.target)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self) -> "BackupScheduler":
+        self.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
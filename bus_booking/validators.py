@@ -8,7 +8,11 @@ from datetime import datetime
 from .exceptions import ValidationError
 
 ISO_DATETIME_FORMAT = "%Y-%m-%d %H:%M"
-CONTACT_PATTERN = re.compile(r"^[+\d][\d\s-]{6,}$")
+# The only characters besides ASCII digits a contact may contain. The
+# booking search index strips exactly these, so what it stores always equals
+# ``normalize_phone`` of the contact.
+CONTACT_SEPARATORS = "+ \t-"
+CONTACT_PATTERN = re.compile(r"^[+0-9][0-9 \t-]{6,}$")
 
 
 def require_text(field: str, value: str) -> str:
@@ -56,3 +60,8 @@ def validate_contact(value: str) -> str:
             "Contact number must start with + or digits and contain at least 7 digits."
         )
     return value
+
+
+def normalize_phone(value: str) -> str:
+    """Digits of a phone number, so ``+1 555-0100`` and ``15550100`` compare equal."""
+    return re.sub(r"[^0-9]", "", value)
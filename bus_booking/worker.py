@@ -0,0 +1,104 @@
+"""Background execution of blocking repository calls for the GUI."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+SuccessCallback = Callable[[Any], None]
+ErrorCallback = Callable[[BaseException], None]
+
+
+@dataclass(slots=True)
+class _Job:
+    func: Callable[[], Any]
+    on_success: Optional[SuccessCallback]
+    on_error: Optional[ErrorCallback]
+    key: Optional[Hashable] = None
+
+
+class BackgroundWorker:
+    """Run blocking calls on one daemon thread and hand results back.
+
+    Jobs execute in submission order on the worker thread. Their callbacks
+    never run there: completed jobs wait in a result queue until the owner's
+    thread calls ``drain()`` (the GUI polls it with ``after()``), so callbacks
+    may touch Tk widgets safely.
+
+    Jobs submitted with a ``key`` are coalesced: while a job with that key is
+    still queued, submitting another one replaces it, so only the latest
+    request runs.
+    """
+
+    def __init__(self, name: str = "bus-booking-worker") -> None:
+        self._jobs: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._results: "queue.Queue[tuple[_Job, bool, Any]]" = queue.Queue()
+        self._queued: Dict[Hashable, _Job] = {}
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        """True while any submitted job has not had its callback delivered."""
+        with self._lock:
+            return self._outstanding > 0
+
+    def submit(
+        self,
+        func: Callable[[], Any],
+        on_success: Optional[SuccessCallback] = None,
+        on_error: Optional[ErrorCallback] = None,
+        *,
+        key: Optional[Hashable] = None,
+    ) -> None:
+        with self._lock:
+            if key is not None and key in self._queued:
+                job = self._queued[key]
+                job.func, job.on_success, job.on_error = func, on_success, on_error
+                return
+            job = _Job(func, on_success, on_error, key)
+            if key is not None:
+                self._queued[key] = job
+            self._outstanding += 1
+        self._jobs.put(job)
+
+    def drain(self) -> int:
+        """Deliver finished jobs' callbacks on the calling thread."""
+        delivered = 0
+        while True:
+            try:
+                job, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._outstanding -= 1
+            delivered += 1
+            if ok:
+                if job.on_success is not None:
+                    job.on_success(value)
+            elif job.on_error is not None:
+                job.on_error(value)
+        return delivered
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.key is not None:
+                    self._queued.pop(job.key, None)
+                func = job.func
+            try:
+                result = (job, True, func())
+            except Exception as exc:
+                result = (job, False, exc)
+            self._results.put(result)
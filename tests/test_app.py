@@ -0,0 +1,42 @@
+from bus_booking.app import main
+
+
+def test_headless_commands_list_book_and_show_seats(tmp_path, capsys):
+    database = str(tmp_path / "cli.sqlite3")
+    assert main(["--database", database, "--with-sample-data", "routes", "--from", "new"]) == 0
+    assert "HX101" in capsys.readouterr().out
+
+    assert main(["--database", database, "book", "1", "--name", "Ann", "--contact", "+1234567", "--seat-numbers", "3,4"]) == 0
+    assert "seats 3-4" in capsys.readouterr().out
+    assert main(["--database", database, "book", "1", "--name", "Bo", "--contact", "+1234567", "--seat-numbers", "4"]) == 1
+    assert "already taken" in capsys.readouterr().err
+
+    assert main(["--database", database, "availability", "1"]) == 0
+    assert "Free seats: 1-2, 5-40" in capsys.readouterr().out
+
+
+def test_cached_pooled_run_closes_every_database(tmp_path, monkeypatch):
+    from bus_booking.database import Database
+
+    closed = []
+    original_close = Database.close
+
+    def close(self):
+        closed.append(self)
+        original_close(self)
+
+    monkeypatch.setattr(Database, "close", close)
+    database = str(tmp_path / "cached.sqlite3")
+    assert main(["--database", database, "--pool-size", "2", "--cache-size", "8", "--with-sample-data", "routes"]) == 0
+    assert len({id(item) for item in closed}) == 2
+    assert all(item.pool._closed for item in closed)
+
+
+def test_backup_rejects_a_non_positive_interval(tmp_path, capsys):
+    import pytest
+
+    for every in ("0", "-5"):
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--database", str(tmp_path / "cli.sqlite3"), "backup", "--output", str(tmp_path / "b"), "--every", every])
+        assert exc_info.value.code == 2
+        assert "must be greater than zero" in capsys.readouterr().err
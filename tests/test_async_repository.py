@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime
+
+from bus_booking.async_repository import AsyncBusRepository
+from bus_booking.database import Database
+from bus_booking.exceptions import SeatAvailabilityError
+from bus_booking.models import Booking, Route
+
+
+def test_async_repository_serializes_writes_and_reads_concurrently(tmp_path):
+    async def scenario():
+        async with AsyncBusRepository(Database(tmp_path / "async.sqlite3"), readers=3) as repo:
+            route = await repo.add_route(
+                Route(None, "AS1", "A", "B", datetime(2024, 12, 1, 8, 0), 10, 5.0)
+            )
+            outcomes = await asyncio.gather(
+                *(
+                    repo.add_booking(
+                        Booking(None, route.id, f"P{i}", "+1234567890", 1, datetime(2024, 11, 1, 8, 0))
+                    )
+                    for i in range(12)
+                ),
+                return_exceptions=True,
+            )
+            seats, routes, bookings = await asyncio.gather(
+                repo.get_available_seats(route.id), repo.list_routes(), repo.list_bookings()
+            )
+            return outcomes, seats, routes, bookings
+
+    outcomes, seats, routes, bookings = asyncio.run(scenario())
+    assert sum(isinstance(outcome, Booking) for outcome in outcomes) == 10
+    assert all(isinstance(outcome, (Booking, SeatAvailabilityError)) for outcome in outcomes)
+    assert seats == 0 and routes[0].seats_available == 0 and len(bookings) == 10
+
+
+def test_async_writes_run_one_at_a_time_in_submission_order(tmp_path):
+    import threading
+    import time
+
+    calls, running, overlap = [], [0], []
+    lock = threading.Lock()
+
+    async def scenario():
+        async with AsyncBusRepository(Database(tmp_path / "writes.sqlite3"), readers=2) as repo:
+            route = await repo.add_route(Route(None, "AS2", "A", "B", datetime(2024, 12, 1, 8, 0), 10, 5.0))
+            add_booking = repo._writer.add_booking
+
+            def tracked(booking):
+                with lock:
+                    running[0] += 1
+                    overlap.append(running[0])
+                    calls.append((booking.passenger_name, threading.current_thread().name))
+                time.sleep(0.01)
+                try:
+                    return add_booking(booking)
+                finally:
+                    with lock:
+                        running[0] -= 1
+
+            repo._writer.add_booking = tracked
+            await asyncio.gather(
+                *(
+                    repo.add_booking(Booking(None, route.id, f"P{i}", "+1234567890", 1, datetime(2024, 11, 1)))
+                    for i in range(5)
+                )
+            )
+
+    asyncio.run(scenario())
+    assert [name for name, _ in calls] == [f"P{i}" for i in range(5)]
+    assert len({thread for _, thread in calls}) == 1 and max(overlap) == 1
+
+
+def test_async_reads_run_concurrently(tmp_path):
+    import threading
+
+    async def scenario():
+        async with AsyncBusRepository(Database(tmp_path / "reads.sqlite3"), readers=3) as repo:
+            route = await repo.add_route(Route(None, "AS3", "A", "B", datetime(2024, 12, 1, 8, 0), 10, 5.0))
+            get_available_seats = repo._reader.get_available_seats
+            # Every read waits until all three are in flight at once.
+            barrier = threading.Barrier(3, timeout=5)
+
+            def gated(route_id):
+                barrier.wait()
+                return get_available_seats(route_id)
+
+            repo._reader.get_available_seats = gated
+            return await asyncio.gather(*(repo.get_available_seats(route.id) for _ in range(3)))
+
+    assert asyncio.run(scenario()) == [10, 10, 10]
+
+
+def test_async_errors_reach_the_awaiting_caller(tmp_path):
+    import pytest
+
+    from bus_booking.exceptions import RouteNotFoundError
+
+    async def scenario():
+        async with AsyncBusRepository(Database(tmp_path / "errors.sqlite3")) as repo:
+            route = await repo.add_route(Route(None, "AS4", "A", "B", datetime(2024, 12, 1, 8, 0), 2, 5.0))
+            with pytest.raises(SeatAvailabilityError):
+                await repo.add_booking(Booking(None, route.id, "Big", "+1234567890", 3, datetime(2024, 11, 1)))
+            with pytest.raises(RouteNotFoundError):
+                await repo.get_available_seats(route.id + 1)
+            # The failures left both threads usable.
+            await repo.add_booking(Booking(None, route.id, "Fits", "+1234567890", 2, datetime(2024, 11, 1)))
+            return await repo.get_available_seats(route.id)
+
+    assert asyncio.run(scenario()) == 0
@@ -0,0 +1,52 @@
+from benchmarks.datagen import assign_bookings, populate
+from benchmarks.suite import compare
+from bus_booking.database import Database
+from bus_booking.repository import BusRepository
+
+
+def test_synthetic_data_is_deterministic_and_skewed(tmp_path):
+    assignment = assign_bookings(routes=50, bookings=2000, seed=7)
+    assert assignment == assign_bookings(routes=50, bookings=2000, seed=7)
+    assert assignment.count(0) > 5 * assignment.count(49)
+
+    repository = BusRepository(Database(tmp_path / "gen.sqlite3"))
+    route_ids = populate(repository, routes=20, bookings=300, seed=7)
+    assert len(route_ids) == 20
+    assert sum(1 for _ in repository.iter_bookings()) == 300
+
+
+def test_compare_flags_throughput_regressions():
+    def run(ops_per_sec):
+        return {"results": [{"scenario": "list_routes", "routes": 1, "bookings": 2, "ops_per_sec": ops_per_sec}]}
+
+    [row] = compare(run(70.0), run(100.0), threshold=0.2)
+    assert row["regression"] and round(row["change"], 2) == -0.3
+    [row] = compare(run(85.0), run(100.0), threshold=0.2)
+    assert not row["regression"]
+
+
+def test_positional_decoding_matches_legacy_row_decoding(tmp_path):
+    from benchmarks.row_decoding import _legacy_booking, _legacy_route, create_legacy_copies
+
+    database = Database(tmp_path / "decode.sqlite3")
+    repository = BusRepository(database)
+    populate(repository, routes=10, bookings=100, seed=3)
+    conn = database.connect()
+    create_legacy_copies(conn)
+    legacy_routes = {
+        row["id"]: _legacy_route(row)
+        for row in conn.execute("SELECT *, total_seats - seats_booked AS seats_available FROM legacy_routes")
+    }
+    legacy_bookings = {row["id"]: _legacy_booking(row) for row in conn.execute("SELECT * FROM legacy_bookings")}
+    conn.close()
+    assert {route.route.id: route for route in repository.list_routes()} == legacy_routes
+    assert {booking.id: booking for booking in repository.list_bookings()} == legacy_bookings
+
+
+def test_headless_imports_skip_tkinter_and_asyncio():
+    from benchmarks.import_time import FORBIDDEN, measure
+
+    for module in ("bus_booking", "bus_booking.app"):
+        imported = measure(module)
+        assert module in imported
+        assert not [name for name in FORBIDDEN if name in imported]
@@ -0,0 +1,126 @@
+import time
+from datetime import datetime
+
+from bus_booking.cache import CachedBusRepository
+from bus_booking.database import Database
+from bus_booking.models import Booking, Route
+from bus_booking.repository import BusRepository
+
+
+def test_cache_hits_invalidates_on_own_writes_and_detects_external_writes(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cached = CachedBusRepository(Database(path), capacity=2)
+    other = BusRepository(Database(path))
+    routes = [
+        cached.add_route(Route(None, f"CA{i}", "A", "B", datetime(2024, 10, 1, 8 + i, 0), 10, 5.0))
+        for i in range(3)
+    ]
+    first = routes[0].id
+
+    assert cached.get_available_seats(first) == 10
+    assert cached.get_available_seats(first) == 10
+    assert (cached.stats.hits, cached.stats.misses) == (1, 1)
+
+    cached.add_booking(Booking(None, first, "Ann", "+1234567890", 3, datetime(2024, 9, 1, 8, 0)))
+    assert cached.get_available_seats(first) == 7
+    assert cached.stats.external_flushes == 0
+
+    other.add_booking(Booking(None, first, "Ben", "+1234567890", 2, datetime(2024, 9, 1, 9, 0)))
+    assert cached.get_available_seats(first) == 5
+    assert cached.stats.external_flushes == 0  # caught up from the change log
+
+    for i in range(3):
+        other.add_booking(Booking(None, first, "Cy", "+1234567890", 1, datetime(2024, 9, 1, 10, i)))
+    assert cached.get_available_seats(first) == 2
+    assert cached.stats.external_flushes == 1  # backlog longer than the capacity
+
+    assert len(cached.list_routes()) == 3
+    cached.list_routes()  # more routes than capacity: the listing itself is not kept
+    assert cached.stats.misses == 6
+
+    for route in routes:
+        cached.get_available_seats(route.id)
+    assert cached.stats.evictions == 1
+
+
+def test_cache_drops_only_routes_changed_by_other_processes(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cached = CachedBusRepository(Database(path), capacity=100)
+    other = BusRepository(Database(path))
+    first, second = (
+        cached.add_route(Route(None, f"CI{i}", "A", "B", datetime(2024, 10, 1, 8 + i, 0), 10, 5.0)) for i in range(2)
+    )
+    assert [cached.get_available_seats(route.id) for route in (first, second)] == [10, 10]
+
+    other.add_booking(Booking(None, first.id, "Ben", "+1234567890", 2, datetime(2024, 9, 1, 9, 0)))
+    hits = cached.stats.hits
+    assert cached.get_available_seats(second.id) == 10
+    assert cached.stats.hits == hits + 1
+    assert cached.get_available_seats(first.id) == 8
+    assert cached.stats.external_flushes == 0
+
+
+def test_cached_seat_counts_expire_with_seat_holds(tmp_path):
+    path = tmp_path / "holds.sqlite3"
+    cached = CachedBusRepository(Database(path))
+    plain = BusRepository(Database(path))
+    held, free = (
+        cached.add_route(Route(None, f"CH{i}", "A", "B", datetime(2024, 10, 1, 8 + i, 0), 10, 5.0))
+        for i in range(2)
+    )
+    hold = cached.hold_seats(held.id, 3, ttl=1)
+    assert [item.seats_available for item in cached.list_routes()] == [7, 10]
+    assert cached.get_available_seats(held.id) == 7
+
+    # The lapsed hold is not swept, so nothing is written to the database.
+    time.sleep(max(hold.expires_at.timestamp() - time.time(), 0) + 0.05)
+    assert cached.get_available_seats(free.id) == 10
+    hits = cached.stats.hits
+    assert cached.get_available_seats(held.id) == plain.get_available_seats(held.id) == 10
+    assert [item.seats_available for item in cached.list_routes()] == [10, 10]
+    assert [item.seats_available for item in plain.list_routes()] == [10, 10]
+    assert cached.stats.hits == hits
+
+
+def test_pooled_cache_tracks_every_connection(tmp_path):
+    import threading
+
+    path = tmp_path / "pooled.sqlite3"
+    cached = CachedBusRepository(Database(path, pool_size=3))
+    other = BusRepository(Database(path))
+    assert cached.database.pool.size == 3
+    route = cached.add_route(Route(None, "CP1", "A", "B", datetime(2024, 10, 1, 8, 0), 100, 5.0))
+    assert cached.get_available_seats(route.id) == 100
+
+    # While a second thread holds a pooled connection, this thread's
+    # connection is a new one that has not checked data_version yet.
+    held, release = threading.Event(), threading.Event()
+
+    def hold_connection():
+        with cached.database.connection():
+            held.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold_connection)
+    thread.start()
+    held.wait()
+    try:
+        other.add_booking(Booking(None, route.id, "Ann", "+1234567890", 4, datetime(2024, 9, 1, 8, 0)))
+        assert cached.get_available_seats(route.id) == 96
+    finally:
+        release.set()
+        thread.join()
+
+    def book(index):
+        for _ in range(10):
+            cached.add_booking(Booking(None, route.id, f"T{index}", "+1234567890", 1, datetime(2024, 9, 1, 9, 0)))
+            cached.get_available_seats(route.id)
+
+    threads = [threading.Thread(target=book, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cached.get_available_seats(route.id) == other.get_available_seats(route.id) == 56
+    assert cached.database.pool.opened > 1
+    cached.database.close()
@@ -0,0 +1,139 @@
+import threading
+import time
+from datetime import datetime
+
+from bus_booking.database import Database, StoragePragmas
+from bus_booking.models import Booking, Route
+from bus_booking.repository import BusRepository
+
+
+def test_pooled_connections_are_reused_and_configured(tmp_path):
+    database = Database(
+        tmp_path / "pool.sqlite3",
+        pool_size=2,
+        pragmas=StoragePragmas(cache_size=-4096),
+    )
+    with database.connection() as first:
+        with database.connection() as nested:
+            assert nested is first
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert first.execute("PRAGMA cache_size").fetchone()[0] == -4096
+    with database.connection() as second:
+        assert second is first
+    assert database.pool.opened == 1
+    database.close()
+
+
+def test_pool_is_bounded_across_threads(tmp_path):
+    database = Database(tmp_path / "pool.sqlite3", pool_size=2)
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        for _ in range(20):
+            with database.connection() as conn:
+                conn.execute("SELECT 1").fetchone()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert database.pool.opened <= 2
+    database.close()
+
+
+def test_migrations_upgrade_legacy_database_without_data_loss(tmp_path):
+    import sqlite3
+
+    from bus_booking.migrations import SCHEMA_VERSION, schema_version
+
+    path = tmp_path / "legacy.sqlite3"
+    legacy = sqlite3.connect(path)
+    legacy.executescript(
+        """
+        CREATE TABLE routes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bus_number TEXT NOT NULL UNIQUE,
+            origin TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            departure_time TEXT NOT NULL,
+            total_seats INTEGER NOT NULL CHECK(total_seats > 0),
+            price REAL NOT NULL CHECK(price >= 0)
+        );
+        CREATE TABLE bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            route_id INTEGER NOT NULL,
+            passenger_name TEXT NOT NULL,
+            passenger_contact TEXT NOT NULL,
+            seats_booked INTEGER NOT NULL CHECK(seats_booked > 0),
+            booked_at TEXT NOT NULL DEFAULT (datetime('now')),
+            FOREIGN KEY(route_id) REFERENCES routes(id) ON DELETE CASCADE
+        );
+        INSERT INTO routes VALUES (1, 'LG1', 'A', 'B', '2024-01-01T10:00', 10, 1.0);
+        INSERT INTO bookings VALUES (1, 1, 'Pat', '+1234567', 3, '2024-01-01T09:00');
+        """
+    )
+    legacy.close()
+
+    database = Database(path)
+    database.initialize_schema()
+    with database.connection() as conn:
+        assert schema_version(conn) == SCHEMA_VERSION
+        indexes = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        seats, seat_map = conn.execute("SELECT seats_booked, seat_map FROM routes WHERE id = 1").fetchone()
+        seat_numbers, booked_at = conn.execute("SELECT seat_numbers, booked_at FROM bookings WHERE id = 1").fetchone()
+        departure = conn.execute("SELECT departure_time FROM routes WHERE id = 1").fetchone()[0]
+    assert {"idx_bookings_route_id", "idx_bookings_booked_at", "idx_routes_departure_time"} <= indexes
+    assert seats == 3
+    assert (seat_map, seat_numbers) == (b"\x07\x00", "1,2,3")
+    assert (departure, booked_at) == (28401720, 28401660)  # epoch minutes of the legacy text
+    assert [booking.id for booking in BusRepository(database).find_bookings("pat 234-567")] == [1]
+    with database.connection() as conn:
+        columns = [row["name"] for row in conn.execute("PRAGMA table_info(bookings)")]
+        conn.execute(
+            "INSERT INTO bookings (route_id, passenger_name, passenger_contact, seats_booked)"
+            " VALUES (1, 'Lou', '+1234567', 1)"
+        )
+        defaulted = conn.execute("SELECT booked_at FROM bookings WHERE passenger_name = 'Lou'").fetchone()[0]
+    assert columns[5:] == ["booked_at", "seat_numbers"]
+    assert abs(defaulted - time.time() // 60) <= 1
+
+    statements = []
+    reopened = Database(path)
+    original_connect = reopened.connect
+
+    def traced_connect(**kwargs):
+        conn = original_connect(**kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    reopened.connect = traced_connect
+    reopened.initialize_schema()
+    assert statements == ["PRAGMA user_version"]
+
+
+def test_instrumentation_counts_transactions_and_times_statements(tmp_path, caplog):
+    from bus_booking.instrumentation import Instrumentation
+
+    instrumentation = Instrumentation(slow_query_threshold=0.0)
+    database = Database(tmp_path / "profiled.sqlite3", instrumentation=instrumentation)
+    database.initialize_schema()
+    with database.write_transaction() as conn:
+        conn.execute("INSERT INTO routes (bus_number, origin, destination, departure_time, total_seats, price)"
+                     " VALUES ('PR1', 'A', 'B', 28401720, 5, 1.0)")
+    try:
+        with database.connection() as conn:
+            conn.execute("SELECT * FROM routes WHERE id IN (?, ?, ?)", (1, 2, 3))
+            raise RuntimeError
+    except RuntimeError:
+        pass
+
+    summary = instrumentation.summary(limit=200)
+    assert summary["connections_opened"] == 3
+    assert summary["commits"] >= 2  # migrations + insert
+    statements = {row["sql"]: row for row in summary["statements"]}
+    assert statements["SELECT * FROM routes WHERE id IN (?, ...)"]["count"] == 1
+    assert "COMMIT" in statements
+    assert instrumentation.slow_queries == sum(row["count"] for row in statements.values())
+    assert any("bus_booking.sql.slow" == record.name for record in caplog.records)
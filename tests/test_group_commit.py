@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from bus_booking.database import Database
+from bus_booking.exceptions import SeatAvailabilityError
+from bus_booking.group_commit import GroupCommitQueue
+from bus_booking.models import Booking, Route
+from bus_booking.repository import BusRepository
+
+
+def test_group_commit_matches_serial_outcomes_in_one_batch(tmp_path):
+    repo = BusRepository(Database(tmp_path / "group.sqlite3"))
+    route = repo.add_route(Route(None, "GC1", "A", "B", datetime(2025, 1, 1, 8, 0), 5, 5.0))
+
+    with GroupCommitQueue(repo, max_delay=0.2) as group:
+        futures = [
+            group.submit(Booking(None, route.id, f"P{seats}", "+1234567890", seats, datetime(2024, 12, 1)))
+            for seats in (3, 3, 2, 1)
+        ]
+        outcomes = [future.exception() or future.result() for future in futures]
+        with pytest.raises(SeatAvailabilityError):
+            group.book(Booking(None, 999, "Nobody", "+1234567890", 1, datetime(2024, 12, 1)))
+
+    assert [isinstance(outcome, Booking) for outcome in outcomes] == [True, False, True, False]
+    assert isinstance(outcomes[1], SeatAvailabilityError)
+    assert group.stats.batches == 2 and group.stats.bookings == 5
+    assert repo.get_available_seats(route.id) == 0
+
+
+def test_group_commit_resolves_every_request_accepted_before_close(tmp_path):
+    import threading
+    import time
+
+    repo = BusRepository(Database(tmp_path / "close.sqlite3", pool_size=1))
+    route = repo.add_route(Route(None, "GC2", "A", "B", datetime(2025, 1, 1, 8, 0), 10_000, 5.0))
+    group = GroupCommitQueue(repo, max_delay=0)
+    accepted = []
+
+    def submit_until_closed():
+        while True:
+            try:
+                accepted.append(group.submit(Booking(None, route.id, "Lee", "+1234567890", 1, datetime(2024, 12, 1))))
+            except RuntimeError:
+                return
+
+    threads = [threading.Thread(target=submit_until_closed) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.02)
+    group.close()
+    for thread in threads:
+        thread.join()
+    assert accepted and all(future.done() for future in accepted)
+    assert repo.reconcile_seat_counts(repair=False) == {}
+    repo.database.close()
+
+
+def test_unexpected_error_fails_only_its_own_request(tmp_path):
+    repo = BusRepository(Database(tmp_path / "error.sqlite3"))
+    route = repo.add_route(Route(None, "GC3", "A", "B", datetime(2025, 1, 1, 8, 0), 3, 5.0))
+
+    with GroupCommitQueue(repo, max_delay=0.2) as group:
+        futures = [
+            group.submit(Booking(None, route.id, name, "+1234567890", 2, booked_at))
+            for name, booked_at in (("Bad", None), ("Good", datetime(2024, 12, 1)))
+        ]
+        assert isinstance(futures[0].exception(), AttributeError)
+        assert futures[1].result().seat_numbers == (1, 2)
+
+    assert repo.get_available_seats(route.id) == 1
+    assert repo.reconcile_seat_counts(repair=False) == {}
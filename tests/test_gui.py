@@ -0,0 +1,77 @@
+from bus_booking.gui import TreeSync
+
+
+class FakeTree:
+    """Minimal stand-in for ttk.Treeview that records every Tk operation."""
+
+    def __init__(self):
+        self.children = []
+        self.values = {}
+        self.operations = []
+        self.scheduled = []
+
+    def get_children(self):
+        return tuple(self.children)
+
+    def insert(self, parent, index, iid, values):
+        self.children.insert(index, iid)
+        self.values[iid] = values
+        self.operations.append(("insert", iid))
+
+    def move(self, iid, parent, index):
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+        self.operations.append(("move", iid))
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.children.remove(iid)
+            del self.values[iid]
+        self.operations.append(("delete",) + iids)
+
+    def item(self, iid, values):
+        self.values[iid] = values
+        self.operations.append(("update", iid))
+
+    def after(self, delay, callback, *args):
+        self.scheduled.append((callback, args))
+        return f"job{len(self.scheduled)}"
+
+    def after_cancel(self, job):
+        pass
+
+    def run_pending(self):
+        while self.scheduled:
+            callback, args = self.scheduled.pop(0)
+            callback(*args)
+
+
+def test_tree_sync_applies_only_the_difference():
+    tree = FakeTree()
+    sync = TreeSync(tree, render=lambda item: (item,), chunk_size=2)
+    sync.sync([(str(i), f"row {i}") for i in range(5)])
+    assert sync.pending
+    tree.run_pending()
+    assert tree.children == ["0", "1", "2", "3", "4"]
+
+    tree.operations.clear()
+    sync.sync([("0", "row 0"), ("9", "row 9"), ("1", "row 1*"), ("3", "row 3"), ("2", "row 2")])
+    tree.run_pending()
+    assert tree.children == ["0", "9", "1", "3", "2"]
+    assert tree.values["1"] == ("row 1*",)
+    assert sorted(tree.operations) == [("delete", "4"), ("insert", "9"), ("move", "3"), ("update", "1")]
+
+
+def test_tree_sync_reaches_any_order_with_one_operation_per_misplaced_row():
+    import random
+
+    generator = random.Random(8)
+    tree = FakeTree()
+    sync = TreeSync(tree, render=lambda item: (item,), chunk_size=7)
+    for _ in range(50):
+        keys = generator.sample(range(60), generator.randrange(1, 40))
+        tree.operations.clear()
+        sync.sync([(str(key), key) for key in keys])
+        tree.run_pending()
+        assert tree.children == [str(key) for key in keys]
+        assert sum(operation[0] in ("insert", "move") for operation in tree.operations) <= len(keys)
@@ -1,10 +1,11 @@
-from datetime import datetime
+import sqlite3
+from datetime import date, datetime
 
 import pytest
 
 from bus_booking.database import Database
-from bus_booking.exceptions import SeatAvailabilityError
-from bus_booking.models import Booking, Route
+from bus_booking.exceptions import HoldExpiredError, SeatAvailabilityError, ValidationError
+from bus_booking.models import Booking, ChangeKind, Occupancy, Route
 from bus_booking.repository import BusRepository
 
 
@@ -51,3 +52,362 @@ def test_route_creation_and_availability(tmp_path):
                 booked_at=datetime(2024, 4, 1, 9, 30),
             )
         )
+
+
+def test_concurrent_processes_never_overbook(tmp_path):
+    from benchmarks.booking_contention import run_contention
+
+    confirmed, booked, _ = run_contention(tmp_path / "stress.sqlite3", workers=4, seats=60)
+    assert confirmed == booked == 60
+
+
+def test_seat_counter_follows_booking_changes_and_reconciles(tmp_path):
+    repo = create_repository(tmp_path)
+    route = repo.add_route(
+        Route(None, "CC303", "City A", "City B", datetime(2024, 5, 1, 10, 0), 10, 5.0)
+    )
+    booking = repo.add_booking(
+        Booking(None, route.id, "Carol", "+1234567890", 4, datetime(2024, 4, 1, 9, 0))
+    )
+    with repo.database.connection() as conn:
+        conn.execute("UPDATE bookings SET seats_booked = 6 WHERE id = ?", (booking.id,))
+    assert repo.route_occupancy(route.id).seats_booked == 6
+    with repo.database.connection() as conn:
+        conn.execute("DELETE FROM bookings WHERE id = ?", (booking.id,))
+    assert repo.route_occupancy(route.id).seats_booked == 0
+
+    # The counters follow the delete, but the seat map keeps the deleted
+    # booking's seats taken until it is rebuilt from the bookings.
+    assert repo.get_available_seats(route.id) == repo.list_routes()[0].seats_available == 10
+    with pytest.raises(SeatAvailabilityError):
+        repo.add_booking(Booking(None, route.id, "Carol", "+1234567890", 8, datetime(2024, 4, 1, 9, 0)))
+    assert repo.reconcile_seat_counts(repair=False) == {route.id: (4, 0)}
+    assert repo.reconcile_seat_counts() == {route.id: (4, 0)}
+    assert repo.get_available_seats(route.id) == 10
+    repo.add_booking(Booking(None, route.id, "Carol", "+1234567890", 8, datetime(2024, 4, 1, 9, 0)))
+
+    with repo.database.connection() as conn:
+        conn.execute("UPDATE routes SET seats_booked = 7 WHERE id = ?", (route.id,))
+    assert repo.reconcile_seat_counts() == {route.id: (7, 8)}
+    assert repo.reconcile_seat_counts() == {}
+    assert repo.get_available_seats(route.id) == 2
+
+    repo.hold_seats(route.id, 1)
+    with repo.database.connection() as conn:
+        conn.execute("UPDATE routes SET seat_map = NULL, seats_held = 0 WHERE id = ?", (route.id,))
+    assert repo.reconcile_seat_counts() == {route.id: (0, 9)}
+    assert repo.get_seat_map(route.id).free_seats() == [10]
+    assert repo.reconcile_seat_counts(repair=False) == {}
+
+
+def test_seat_map_assigns_keeps_together_and_releases_seats(tmp_path):
+    repo = create_repository(tmp_path)
+    route = repo.add_route(
+        Route(None, "SM404", "City A", "City B", datetime(2024, 5, 1, 10, 0), 8, 5.0)
+    )
+
+    def book(seats, seat_numbers=()):
+        return repo.add_booking(
+            Booking(None, route.id, "Dee", "+1234567890", seats, datetime(2024, 4, 1, 9, 0), seat_numbers)
+        )
+
+    first = book(2, (2, 5))
+    assert first.seat_numbers == (2, 5)
+    assert book(3).seat_numbers == (6, 7, 8)
+    with pytest.raises(SeatAvailabilityError, match="Seat 5 already taken"):
+        book(1, (5,))
+    with pytest.raises(ValidationError):
+        book(2, (1,))
+    assert book(2).seat_numbers == (3, 4)
+    assert repo.get_seat_map(route.id).free_seats() == [1]
+    assert repo.get_available_seats(route.id) == 1
+
+    repo.cancel_booking(first.id)
+    assert repo.get_seat_map(route.id).free_seats() == [1, 2, 5]
+    assert repo.get_available_seats(route.id) == 3
+
+    result = repo.add_bookings_bulk(
+        [{"route_id": route.id, "passenger_name": "Eve", "passenger_contact": "+1234567890", "seats_booked": 2}]
+    )
+    assert result.inserted == 1
+    assert repo.list_bookings()[0].seat_numbers == (1, 2)
+
+
+def test_failed_batch_requests_leave_the_seat_map_untouched(tmp_path):
+    repo = create_repository(tmp_path)
+    route = repo.add_route(Route(None, "SB1", "City A", "City B", datetime(2024, 5, 1, 10, 0), 10, 5.0))
+
+    def request(seats, name="Dee"):
+        return Booking(None, route.id, name, "+1234567890", seats, datetime(2024, 4, 1, 9, 0))
+
+    outcomes = repo.add_booking_batch([request(-1), request(3, name=None), request(2)])
+    assert isinstance(outcomes[0], ValidationError)
+    assert isinstance(outcomes[1], sqlite3.IntegrityError)
+    assert outcomes[2].seat_numbers == (1, 2)
+    assert repo.get_seat_map(route.id).free_seats() == list(range(3, 11))
+    assert repo.get_available_seats(route.id) == 8
+
+
+def test_keyset_pages_and_streams_cover_every_row_once(tmp_path):
+    repo = create_repository(tmp_path)
+    departure = datetime(2024, 6, 1, 8, 0)
+    for index in range(7):
+        # Two routes per departure slot exercise the id tie-breaker.
+        route = repo.add_route(
+            Route(None, f"PG{index}", "A", "B", departure.replace(hour=8 + index // 2), 50, 1.0)
+        )
+        repo.add_booking(
+            Booking(None, route.id, f"P{index}", "+1234567890", 1, datetime(2024, 5, 1, 9, index // 2))
+        )
+
+    pages, cursor = [], None
+    while True:
+        page = repo.list_routes_page(limit=3, cursor=cursor)
+        pages.append([item.route.id for item in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == [item.route.id for item in repo.list_routes()]
+
+    assert [b.id for b in repo.iter_bookings(batch_size=2)] == [b.id for b in repo.list_bookings()]
+    assert [r.route.id for r in repo.iter_routes(batch_size=4)] == sum(pages, [])
+
+
+def test_bulk_import_reports_row_errors_without_aborting(tmp_path):
+    repo = create_repository(tmp_path)
+    routes = repo.add_routes_bulk(
+        [
+            {"bus_number": "BK1", "origin": "A", "destination": "B",
+             "departure_time": "2024-07-01 08:00", "total_seats": "3", "price": "9.5"},
+            {"bus_number": "BK1", "origin": "A", "destination": "B",
+             "departure_time": "2024-07-01 09:00", "total_seats": "3", "price": "9.5"},
+            {"bus_number": "BK2", "origin": "A", "destination": "B",
+             "departure_time": "tomorrow", "total_seats": "3", "price": "9.5"},
+        ],
+        batch_size=2,
+    )
+    assert routes.inserted == 1
+    assert [error.row_number for error in routes.errors] == [2, 3]
+
+    route_id = repo.list_routes()[0].route.id
+    bookings = repo.add_bookings_bulk(
+        [
+            {"route_id": route_id, "passenger_name": "Ann", "passenger_contact": "+1234567890", "seats_booked": 2},
+            {"route_id": route_id, "passenger_name": "Ben", "passenger_contact": "+1234567890", "seats_booked": 2},
+            {"route_id": 999, "passenger_name": "Cy", "passenger_contact": "+1234567890", "seats_booked": 1},
+            {"route_id": route_id, "passenger_name": "Di", "passenger_contact": "+1234567890", "seats_booked": 1},
+        ]
+    )
+    assert bookings.inserted == 2
+    assert [error.row_number for error in bookings.errors] == [2, 3]
+    assert repo.get_available_seats(route_id) == 0
+
+
+def test_export_streams_filtered_bookings(tmp_path):
+    import csv
+    import gzip
+
+    from bus_booking.export import open_output, write_rows
+    from bus_booking.repository import BOOKING_EXPORT_COLUMNS
+
+    repo = create_repository(tmp_path)
+    for day in (1, 2, 3):
+        route = repo.add_route(
+            Route(None, f"EX{day}", "A", "B", datetime(2024, 8, day, 10, 0), 10, 12.5)
+        )
+        repo.add_booking(
+            Booking(None, route.id, f"P{day}", "+1234567890", 2, datetime(2024, 7, 1, 9, 0))
+        )
+
+    output = tmp_path / "bookings.csv.gz"
+    rows = repo.export_bookings(departure_from=date(2024, 8, 2), departure_to=date(2024, 8, 3), batch_size=1)
+    with open_output(output, compress=True) as handle:
+        assert write_rows(rows, BOOKING_EXPORT_COLUMNS, handle, "csv") == 2
+    with gzip.open(output, "rt", newline="") as handle:
+        exported = list(csv.DictReader(handle))
+    assert [row["bus_number"] for row in exported] == ["EX2", "EX3"]
+    assert exported[0]["amount"] == "25.0"
+
+    [route] = repo.export_route_availability(route_id=route.id)
+    assert route["seats_available"] == 8
+
+
+def test_search_routes_by_city_prefix_window_and_seats(tmp_path):
+    repo = create_repository(tmp_path)
+    for bus, origin, destination, hour, seats in (
+        ("SR1", "New York", "Boston", 8, 10),
+        ("SR2", "Newark", "Boston", 9, 10),
+        ("SR3", "new haven", "Albany", 10, 2),
+        ("SR4", "Chicago", "Boston", 11, 10),
+    ):
+        repo.add_route(Route(None, bus, origin, destination, datetime(2024, 9, 1, hour, 0), seats, 5.0))
+
+    def buses(**filters):
+        return [match.route.bus_number for match in repo.search_routes(**filters)]
+
+    assert buses(origin="new") == ["SR1", "SR2", "SR3"]
+    assert buses(origin="NEW Y") == ["SR1"]
+    assert buses(origin="new", destination="bo") == ["SR1", "SR2"]
+    assert buses(depart_after=datetime(2024, 9, 1, 9, 0), depart_before=datetime(2024, 9, 1, 11, 0)) == ["SR2", "SR3"]
+    assert buses(min_seats=5, destination="%") == []
+    assert buses(min_seats=5) == ["SR1", "SR2", "SR4"]
+
+
+def test_occupancy_rollups_follow_writes_and_match_rebuild(tmp_path):
+    repo = create_repository(tmp_path)
+    first = repo.add_route(Route(None, "RU1", "A", "B", datetime(2024, 9, 1, 8, 0), 10, 12.5))
+    second = repo.add_route(Route(None, "RU2", "A", "B", datetime(2024, 9, 1, 18, 0), 20, 10.0))
+    third = repo.add_route(Route(None, "RU3", "B", "C", datetime(2024, 9, 2, 8, 0), 4, 3.0))
+    for route, seats in ((first, 4), (second, 5), (third, 4)):
+        booking = repo.add_booking(Booking(None, route.id, "Gus", "+1234567890", seats, datetime(2024, 8, 1)))
+    repo.cancel_booking(booking.id)
+    repo.add_bookings_bulk([{"route_id": third.id, "passenger_name": "Hal", "passenger_contact": "+1234567890", "seats_booked": 1}])
+    with repo.database.connection() as conn:
+        conn.execute("UPDATE routes SET price = 4.0, departure_time = departure_time + 1440 WHERE id = ?", (third.id,))
+
+    def snapshot():
+        return repo.daily_occupancy(date(2024, 9, 1), date(2024, 9, 30)), repo.top_pairs()
+
+    daily, pairs = snapshot()
+    assert daily[date(2024, 9, 1)] == Occupancy(2, 30, 9, 100.0)
+    assert list(daily) == [date(2024, 9, 1), date(2024, 9, 3)]
+    assert daily[date(2024, 9, 3)].load_factor == 0.25
+    assert pairs == [("A", "B", Occupancy(2, 30, 9, 100.0)), ("B", "C", Occupancy(1, 4, 1, 4.0))]
+    assert repo.pair_occupancy("A", "B") == pairs[0][2]
+    assert repo.route_occupancy(first.id) == Occupancy(1, 10, 4, 50.0)
+
+    with repo.database.connection() as conn:
+        conn.execute("DELETE FROM daily_rollups")
+    repo.rebuild_rollups()
+    assert snapshot() == (daily, pairs)
+
+
+def test_seat_holds_count_until_confirmed_released_or_expired(tmp_path):
+    repo = create_repository(tmp_path)
+    route = repo.add_route(Route(None, "HD1", "A", "B", datetime(2024, 9, 1, 8, 0), 6, 10.0))
+
+    hold = repo.hold_seats(route.id, 2, seat_numbers=(5, 6))
+    assert repo.get_available_seats(route.id) == 4
+    assert repo.list_routes()[0].seats_available == 4
+    with pytest.raises(SeatAvailabilityError):
+        repo.add_booking(Booking(None, route.id, "Ivy", "+1234567890", 1, datetime(2024, 8, 1), (5,)))
+
+    booking = repo.confirm_hold(hold.id, "Ivy", "+1234567890")
+    assert booking.seat_numbers == (5, 6)
+    assert repo.get_available_seats(route.id) == 4
+    with pytest.raises(HoldExpiredError):
+        repo.confirm_hold(hold.id, "Ivy", "+1234567890")
+
+    released = repo.hold_seats(route.id, 1)
+    repo.release_hold(released.id)
+    assert repo.get_available_seats(route.id) == 4
+
+    others = [repo.add_route(Route(None, f"HD{n}", "A", "B", datetime(2024, 9, n, 8, 0), 6, 10.0)) for n in (2, 3)]
+    lapsed = [repo.hold_seats(item.id, 1, ttl=-1) for item in (route, *others)]
+    assert repo.get_available_seats(route.id) == 4
+    assert [item.seats_available for item in repo.list_routes()] == [4, 6, 6]
+    assert len(repo.search_routes(min_seats=6)) == 2
+    with pytest.raises(HoldExpiredError):
+        repo.confirm_hold(lapsed[0].id, "Jo", "+1234567890")
+    assert repo.expire_holds(batch_size=2) == 3
+    assert [item.seats_available for item in repo.list_routes()] == [4, 6, 6]
+    assert repo.get_seat_map(route.id).free_seats() == [1, 2, 3, 4]
+
+    # A lapsed hold on the route is released before a booking claims seats.
+    repo.hold_seats(route.id, 4, ttl=-1)
+    repo.add_booking(Booking(None, route.id, "Kit", "+1234567890", 4, datetime(2024, 8, 1)))
+    assert repo.get_available_seats(route.id) == 0
+    assert repo.reconcile_seat_counts(repair=False) == {}
+
+
+def test_find_bookings_matches_name_substrings_and_phone_digits(tmp_path):
+    repo = create_repository(tmp_path)
+    route = repo.add_route(Route(None, "FT1", "A", "B", datetime(2024, 9, 1, 8, 0), 10, 10.0))
+    ann = repo.add_booking(Booking(None, route.id, "Ann Lee", "+1 555 0100", 1, datetime(2024, 8, 1)))
+    bo = repo.add_booking(Booking(None, route.id, "Bo Leeds", "+44 20-7946-0958", 1, datetime(2024, 8, 2)))
+    zed = repo.add_booking(Booking(None, route.id, "Zed Quinn", "5550100999", 1, datetime(2024, 8, 3)))
+
+    def found(query):
+        return [booking.id for booking in repo.find_bookings(query)]
+
+    assert found("lee") == [bo.id, ann.id]
+    assert found("555-0100") == [zed.id, ann.id]
+    assert found("ann 0100") == [ann.id]
+    assert found("7946 0958") == [bo.id]
+    assert found("an") == found("zzz") == []
+
+    # Contacts hold only the separators the index strips, so stored and
+    # searched digits are normalized the same way.
+    from bus_booking.validators import validate_contact
+
+    for contact in ("+1\u00a0555\u00a00100", "\u0661\u0662\u0663\u0664\u0665\u0666\u0667"):
+        with pytest.raises(ValidationError):
+            validate_contact(contact)
+    tab = repo.add_booking(Booking(None, route.id, "Tab", "+1\t777-0100", 1, datetime(2024, 8, 4)))
+    assert found("17770100") == [tab.id]
+    repo.cancel_booking(tab.id)
+
+    repo.cancel_booking(zed.id)
+    with repo.database.connection() as conn:
+        conn.execute("UPDATE bookings SET passenger_name = 'Ann Park' WHERE id = ?", (ann.id,))
+    assert found("555 0100") == [ann.id]
+    assert found("lee") == [bo.id]
+    assert found("park") == [ann.id]
+
+
+def test_change_feed_publishes_own_writes_and_catches_up_on_others(tmp_path):
+    repo = create_repository(tmp_path)
+    other = BusRepository(Database(tmp_path / "test.sqlite3"))
+    seen = []
+    unsubscribe = repo.subscribe(seen.append)
+    start = repo.current_version()
+
+    route = repo.add_route(Route(None, "CF1", "A", "B", datetime(2024, 9, 1, 8, 0), 10, 10.0))
+    assert [(event.kind, event.route_id) for event in seen] == [(ChangeKind.ROUTE_ADDED, route.id)]
+    booking = repo.add_booking(Booking(None, route.id, "Ann", "+1234567890", 2, datetime(2024, 8, 1)))
+    assert {(event.kind, event.booking_id) for event in seen[1:]} == {
+        (ChangeKind.BOOKING_ADDED, booking.id),
+        (ChangeKind.AVAILABILITY_CHANGED, None),
+    }
+
+    del seen[:]
+    other.cancel_booking(booking.id)
+    assert seen == []
+    assert {event.kind for event in repo.poll_changes()} == {ChangeKind.BOOKING_REMOVED, ChangeKind.AVAILABILITY_CHANGED}
+    assert len(seen) == 2
+    assert repo.get_routes([route.id, 999])[0].seats_available == 10
+    assert repo.get_bookings([booking.id]) == []
+
+    changes = repo.changes_since(start)
+    assert changes.complete and changes.version == repo.current_version()
+    assert [event.version for event in changes.events] == list(range(start + 1, changes.version + 1))
+    assert repo.changes_since(start, limit=1).events == changes.events[:1]
+
+    unsubscribe()
+    other.add_route(Route(None, "CF2", "A", "B", datetime(2024, 9, 2, 8, 0), 10, 10.0))
+    assert repo.prune_changes(keep=1) == len(changes.events)
+    assert not repo.changes_since(start).complete
+    assert [event.kind for event in repo.changes_since(repo.current_version() - 1).events] == [ChangeKind.ROUTE_ADDED]
+    repo.subscribe(seen.append)
+    assert repo.poll_changes() == []
+
+
+def test_change_log_is_pruned_as_it_grows(tmp_path):
+    from bus_booking.migrations import CHANGE_LOG_KEEP, CHANGE_LOG_PRUNE_EVERY
+
+    repo = create_repository(tmp_path)
+    route = repo.add_route(Route(None, "CL1", "A", "B", datetime(2024, 9, 1, 8, 0), 10, 10.0))
+    with repo.database.connection() as conn:
+        conn.execute(
+            """
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+            INSERT INTO change_log (kind, route_id) SELECT 'route_changed', ? FROM n
+            """,
+            (CHANGE_LOG_KEEP + 2 * CHANGE_LOG_PRUNE_EVERY, route.id),
+        )
+        oldest, rows = conn.execute("SELECT MIN(version), COUNT(*) FROM change_log").fetchone()
+    assert rows <= CHANGE_LOG_KEEP + CHANGE_LOG_PRUNE_EVERY
+    assert oldest > CHANGE_LOG_PRUNE_EVERY
+    assert not repo.changes_since(0).complete
+    assert repo.changes_since(repo.current_version() - 5).events[-1].version == repo.current_version()
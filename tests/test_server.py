@@ -0,0 +1,125 @@
+import asyncio
+import json
+from datetime import datetime
+
+from bus_booking.database import Database
+from bus_booking.models import Route
+from bus_booking.repository import BusRepository
+from bus_booking.server import BookingServer
+
+
+async def request(port, method, path, body=None, content_length=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = json.dumps(body).encode() if body is not None else b""
+    length = len(payload) if content_length is None else content_length
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+        f"Content-Length: {length}\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_http_api_lists_searches_and_books(tmp_path):
+    repo = BusRepository(Database(tmp_path / "api.sqlite3", pool_size=2))
+    route = repo.add_route(Route(None, "API1", "Oslo", "Bergen", datetime(2024, 11, 1, 8, 0), 3, 20.0))
+
+    async def scenario():
+        server = BookingServer(repo, port=0, workers=2)
+        await server.start()
+        try:
+            port = server.port
+            status, listing = await request(port, "GET", "/routes?limit=10")
+            assert status == 200 and listing["routes"][0]["bus_number"] == "API1"
+            status, found = await request(port, "GET", "/routes/search?origin=os")
+            assert [item["id"] for item in found["routes"]] == [route.id]
+
+            booking = {"route_id": route.id, "passenger_name": "Ola", "passenger_contact": "+4712345678", "seats_booked": 2}
+            status, created = await request(port, "POST", "/bookings", booking)
+            assert status == 201 and created["id"] is not None
+            status, _ = await request(port, "POST", "/bookings", booking)
+            assert status == 409
+            status, _ = await request(port, "POST", "/bookings", {**booking, "passenger_contact": "x"})
+            assert status == 400
+
+            status, availability = await request(port, "GET", f"/routes/{route.id}/availability")
+            assert (status, availability["seats_available"]) == (200, 1)
+            status, _ = await request(port, "GET", "/routes/999/availability")
+            assert status == 404
+            status, _ = await request(port, "POST", "/bookings", {**booking, "route_id": 999})
+            assert status == 404
+            status, _ = await request(port, "POST", "/holds", {"route_id": 999, "seats": 1})
+            assert status == 404
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
+    repo.database.close()
+
+
+def test_bad_content_length_is_rejected_with_400(tmp_path):
+    from bus_booking.server import MAX_BODY_BYTES
+
+    repo = BusRepository(Database(tmp_path / "length.sqlite3", pool_size=1))
+    route = repo.add_route(Route(None, "API2", "Oslo", "Bergen", datetime(2024, 11, 1, 8, 0), 3, 20.0))
+    booking = {"route_id": route.id, "passenger_name": "Ola", "passenger_contact": "+4712345678", "seats_booked": 1}
+
+    async def scenario():
+        server = BookingServer(repo, port=0, workers=1)
+        await server.start()
+        try:
+            for length in ("abc", "-5", "+3", "1e3", "\u0663"):
+                status, error = await request(server.port, "POST", "/bookings", booking, content_length=length)
+                assert (status, error["error"]) == (400, "Invalid Content-Length header.")
+            status, _ = await request(server.port, "POST", "/bookings", booking, content_length=MAX_BODY_BYTES + 1)
+            assert status == 413
+            status, _ = await request(server.port, "POST", "/bookings", booking)
+            assert status == 201
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
+    repo.database.close()
+
+
+def test_stalled_database_calls_answer_504_then_503(tmp_path):
+    import threading
+
+    repo = BusRepository(Database(tmp_path / "stall.sqlite3", pool_size=1))
+    route = repo.add_route(Route(None, "API3", "Oslo", "Bergen", datetime(2024, 11, 1, 8, 0), 3, 20.0))
+    unblock = threading.Event()
+    get_available_seats = repo.get_available_seats
+
+    def stalled(route_id):
+        unblock.wait(5)
+        return get_available_seats(route_id)
+
+    repo.get_available_seats = stalled
+
+    async def scenario():
+        server = BookingServer(repo, port=0, workers=2, max_pending=1, request_timeout=0.1)
+        await server.start()
+        path = f"/routes/{route.id}/availability"
+        try:
+            status, error = await request(server.port, "GET", path)
+            assert (status, error["error"]) == (504, "Database did not respond in time.")
+            # The timed-out call still occupies its slot until its thread ends.
+            status, error = await request(server.port, "GET", "/routes?limit=5")
+            assert (status, error["error"]) == (503, "Server busy, retry shortly.")
+            unblock.set()
+            for _ in range(100):
+                _, health = await request(server.port, "GET", "/health")
+                if health["pending"] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            status, availability = await request(server.port, "GET", path)
+            assert (status, availability["seats_available"]) == (200, 3)
+        finally:
+            unblock.set()
+            await server.close()
+
+    asyncio.run(scenario())
+    repo.database.close()
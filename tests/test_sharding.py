@@ -0,0 +1,119 @@
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from bus_booking.database import Database
+from bus_booking.exceptions import BookingError, SeatAvailabilityError
+from bus_booking.models import Booking, Route
+from bus_booking.repository import BusRepository
+from bus_booking.sharding import SHARD_ID_SPAN, ShardedRepository, shard_of
+
+
+def booking(route_id, seats=1):
+    return Booking(None, route_id, "Lee", "+1234567890", seats, datetime(2024, 8, 1, 9, 0))
+
+
+@pytest.mark.parametrize("partition", ["route", "month"])
+def test_sharded_repository_routes_point_operations_and_merges_listings(tmp_path, partition):
+    single = BusRepository(Database(tmp_path / "single.sqlite3"))
+    with ShardedRepository.open(tmp_path / "sharded.sqlite3", 3, partition=partition) as sharded:
+        for number, day in enumerate((5, 1, 20, 1, 9, 14)):
+            for month in (6, 7):
+                route = Route(None, f"S{month}-{number}", "A", "B", datetime(2024, month, day, 8, 0), 4, 10.0)
+                single.add_route(route)
+                sharded.add_route(route)
+        routes = sharded.list_routes()
+        if partition == "month":
+            assert len({shard_of(item.route.id) for item in routes if item.route.departure_time.month == 6}) == 1
+        else:
+            assert {shard_of(item.route.id) for item in routes} == {0, 1, 2}
+
+        def departures(items):
+            return [item.route.departure_time for item in items]
+
+        assert departures(routes) == departures(single.list_routes())
+        assert departures(sharded.iter_routes(batch_size=2)) == departures(routes)
+        paged, cursor = [], None
+        while True:
+            page = sharded.list_routes_page(5, cursor)
+            paged.extend(page.items)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        assert paged == routes
+        assert departures(sharded.search_routes(depart_after=datetime(2024, 7, 1), limit=3)) == [
+            datetime(2024, 7, 1, 8, 0)
+        ] * 2 + [datetime(2024, 7, 5, 8, 0)]
+
+        last = routes[-1].route
+        created = sharded.add_booking(booking(last.id, 3))
+        assert shard_of(created.id) == shard_of(last.id)
+        assert sharded.get_available_seats(last.id) == 1
+        outcomes = sharded.add_booking_batch([booking(item.route.id, 2) for item in routes[:3]] + [booking(last.id, 2)])
+        assert [type(outcome) for outcome in outcomes] == [Booking] * 3 + [SeatAvailabilityError]
+        assert [b.id for b in sharded.list_bookings()] == [b.id for b in sharded.iter_bookings(batch_size=1)]
+
+        hold = sharded.hold_seats(last.id, 1)
+        confirmed = sharded.confirm_hold(hold.id, "Lee", "+1234567890")
+        assert sharded.get_available_seats(last.id) == 0
+        sharded.cancel_booking(confirmed.id)
+        with pytest.raises(BookingError):
+            sharded.cancel_booking(confirmed.id)
+        with pytest.raises(SeatAvailabilityError):
+            sharded.get_available_seats(7 * SHARD_ID_SPAN)
+
+        daily = sharded.daily_occupancy(date(2024, 6, 1), date(2024, 7, 31))
+        assert daily[date(2024, 6, 1)].routes == 2
+        assert sum(occupancy.seats_booked for occupancy in daily.values()) == 9
+        assert sharded.top_pairs() == [("A", "B", sharded.pair_occupancy("A", "B"))]
+        assert sharded.pair_occupancy("A", "B").revenue == 90.0
+
+
+def test_sharded_bulk_import_renumbers_row_errors(tmp_path):
+    with ShardedRepository.open(tmp_path / "bulk.sqlite3", 2) as sharded:
+        result = sharded.add_routes_bulk(
+            [
+                {"bus_number": f"B{n}", "origin": "A", "destination": "B",
+                 "departure_time": "2024-06-01 08:00", "total_seats": 2, "price": 5}
+                for n in range(4)
+            ]
+            + [{"bus_number": "B9", "origin": "A", "destination": "B", "departure_time": "soon"}],
+            batch_size=3,
+        )
+        assert result.inserted == 4
+        assert [error.row_number for error in result.errors] == [5]
+        route_ids = [item.route.id for item in sharded.list_routes()]
+        result = sharded.add_bookings_bulk(
+            [
+                {"route_id": route_id, "passenger_name": "Mo", "passenger_contact": "+1234567890", "seats_booked": 2}
+                for route_id in route_ids + route_ids[:1]
+            ]
+        )
+        assert result.inserted == 4
+        assert [error.row_number for error in result.errors] == [5]
+
+
+def test_sharded_bus_numbers_stay_unique_and_search_merges_by_booking_time(tmp_path):
+    with ShardedRepository.open(tmp_path / "unique.sqlite3", 2, partition="month") as sharded:
+        june = sharded.add_route(Route(None, "U1", "A", "B", datetime(2024, 6, 1, 8, 0), 4, 10.0))
+        july = sharded.add_route(Route(None, "U2", "A", "B", datetime(2024, 7, 1, 8, 0), 4, 10.0))
+        assert shard_of(june.id) != shard_of(july.id)
+        with pytest.raises(sqlite3.IntegrityError):
+            sharded.add_route(Route(None, "U1", "A", "B", datetime(2024, 7, 2, 8, 0), 4, 10.0))
+        result = sharded.add_routes_bulk(
+            [
+                {"bus_number": number, "origin": "A", "destination": "B",
+                 "departure_time": f"2024-{month:02d}-03 08:00", "total_seats": 2, "price": 5}
+                for number, month in (("U2", 6), ("U3", 6), ("U3", 7))
+            ]
+        )
+        assert result.inserted == 1
+        assert [error.row_number for error in result.errors] == [1, 3]
+        assert sorted(item.route.bus_number for item in sharded.list_routes()) == ["U1", "U2", "U3"]
+
+        # Ids run in booking order within a shard but booked_at does not.
+        for route, day in ((june, 20), (june, 10), (july, 15)):
+            sharded.add_booking(Booking(None, route.id, "Pat Lee", "+1234567890", 1, datetime(2024, 5, day, 9, 0)))
+        found = sharded.find_bookings("pat", limit=2)
+        assert [booking.booked_at.day for booking in found] == [20, 15]
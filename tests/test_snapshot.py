@@ -0,0 +1,43 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from bus_booking.database import Database, StoragePragmas
+from bus_booking.models import Booking, Route
+from bus_booking.repository import BusRepository
+from bus_booking.snapshot import BackupScheduler, take_snapshot
+
+
+@pytest.mark.parametrize("in_memory", [False, True])
+def test_snapshot_is_point_in_time_and_read_only(tmp_path, in_memory):
+    repo = BusRepository(Database(tmp_path / "live.sqlite3", pool_size=2, pragmas=StoragePragmas()))
+    route = repo.add_route(Route(None, "SN1", "A", "B", datetime(2024, 5, 1, 10, 0), 10, 2.0))
+    repo.add_booking(Booking(None, route.id, "Ann", "+1234567", 2, datetime(2024, 4, 1, 9, 0)))
+
+    with take_snapshot(repo.database, in_memory=in_memory, directory=tmp_path, pages=1) as snapshot:
+        repo.add_booking(Booking(None, route.id, "Bo", "+1234567", 3, datetime(2024, 4, 1, 9, 5)))
+        assert [booking.passenger_name for booking in snapshot.repository.list_bookings()] == ["Ann"]
+        assert snapshot.repository.get_available_seats(route.id) == 8
+        assert [row["passenger_name"] for row in snapshot.repository.export_bookings()] == ["Ann"]
+        with pytest.raises(sqlite3.OperationalError):
+            snapshot.repository.add_route(Route(None, "SN2", "A", "B", datetime(2024, 5, 1), 5, 1.0))
+        path = snapshot.path
+    assert repo.get_available_seats(route.id) == 5
+    assert path is None or not path.exists()
+
+
+def test_scheduled_backup_replaces_target_with_complete_copy(tmp_path):
+    repo = BusRepository(Database(tmp_path / "live.sqlite3", pragmas=StoragePragmas()))
+    repo.add_route(Route(None, "BK1", "A", "B", datetime(2024, 5, 1, 10, 0), 10, 2.0))
+    target = tmp_path / "backups" / "bus.sqlite3"
+
+    scheduler = BackupScheduler(repo.database, target, interval=60)
+    with scheduler:
+        scheduler.stop(timeout=5)
+    repo.add_route(Route(None, "BK2", "A", "B", datetime(2024, 5, 1, 11, 0), 10, 2.0))
+    scheduler.backup_now()
+
+    assert scheduler.stats.backups == 2 and scheduler.stats.failures == 0
+    assert [route.route.bus_number for route in BusRepository(Database(target)).list_routes()] == ["BK1", "BK2"]
+    assert list(target.parent.iterdir()) == [target]
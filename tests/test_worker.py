@@ -0,0 +1,25 @@
+import threading
+
+from bus_booking.worker import BackgroundWorker
+
+
+def test_worker_runs_in_order_coalesces_and_delivers_on_drain():
+    worker = BackgroundWorker()
+    gate = threading.Event()
+    results, errors = [], []
+    try:
+        worker.submit(gate.wait, results.append)
+        worker.submit(lambda: "first refresh", results.append, key="refresh")
+        worker.submit(lambda: "second refresh", results.append, key="refresh")
+        worker.submit(lambda: 1 / 0, results.append, errors.append)
+        assert worker.busy
+        assert results == []
+
+        gate.set()
+        worker.stop(timeout=5)
+        assert worker.drain() == 3
+        assert results == [True, "second refresh"]
+        assert isinstance(errors[0], ZeroDivisionError)
+        assert not worker.busy
+    finally:
+        gate.set()